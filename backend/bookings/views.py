@@ -11,6 +11,7 @@ class BookingViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, viewsets.Ge
     search_fields = ("full_name", "email", "phone", "property__title")
     ordering_fields = ("created_at", "preferred_date", "status")
     ordering = ("-created_at",)
+    query_budget = {"list": 8, "create": 4}
 
     def get_permissions(self):
         if self.action == "list":
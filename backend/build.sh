@@ -4,4 +4,5 @@ set -e
 pip install -r requirements.txt
 python manage.py collectstatic --noinput
 python manage.py migrate --noinput
+python manage.py createcachetable
 python manage.py ensure_admin
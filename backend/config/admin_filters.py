@@ -0,0 +1,84 @@
+"""
+Query-string filters shared by the lora_admin list pages and the exports
+(config/exports.py, ``manage.py export_records``), so an export always holds
+exactly the rows the list shows. ``params`` is request.GET or a plain dict.
+"""
+from __future__ import annotations
+
+from rest_framework.filters import search_smart_split
+
+from bookings.models import Booking
+from inquiries.models import Inquiry
+from locations.models import Location
+from properties.models import Property
+from properties.search import search_properties
+
+# ?sort= values for properties; each has a matching (published or not) index in Property.Meta.
+PROPERTY_SORTS = {
+    "created_at": "Oldest",
+    "-created_at": "Newest",
+    "price": "Price ↑",
+    "-price": "Price ↓",
+    "title": "Title A-Z",
+    "-title": "Title Z-A",
+}
+_FLAGS = {"1": True, "0": False}
+
+
+def property_sort(params) -> str:
+    sort = params.get("sort", "")
+    return sort if sort in PROPERTY_SORTS else "-created_at"
+
+
+def filter_properties(params):
+    """
+    (queryset, active filters) for ?type, property_type, status, featured,
+    published, location and search. Ordering is left to the caller.
+    """
+    properties = Property.objects.all()
+    active = {
+        "property_type": params.get("property_type", ""),
+        "status": params.get("status", ""),
+        "featured": params.get("featured", ""),
+        "published": params.get("published", ""),
+        "search": params.get("search", "").strip(),
+        "location": None,
+    }
+    listing_type = params.get("type")
+    if listing_type == "rent":
+        properties = properties.filter(listing_type="rent")
+    elif listing_type == "sale":
+        properties = properties.filter(listing_type="sale")
+    if active["property_type"] in Property.PropertyType.values:
+        properties = properties.filter(property_type=active["property_type"])
+    if active["status"] in Property.Availability.values:
+        properties = properties.filter(availability=active["status"])
+    if active["featured"] in _FLAGS:
+        properties = properties.filter(featured=_FLAGS[active["featured"]])
+    if active["published"] in _FLAGS:
+        properties = properties.filter(published=_FLAGS[active["published"]])
+    location_id = params.get("location")
+    if location_id:
+        try:
+            active["location"] = Location.objects.get(pk=location_id)
+            properties = properties.filter(location=active["location"])
+        except (Location.DoesNotExist, ValueError):
+            pass
+    if active["search"]:
+        # Split like the API's ?search= (quoted phrases stay together).
+        properties = search_properties(properties, search_smart_split(active["search"]))
+    return properties, active
+
+
+def filter_bookings(params):
+    """(queryset, status filter) for ?status."""
+    bookings = Booking.objects.all()
+    status_filter = (params.get("status") or "").strip()
+    if status_filter and status_filter in dict(Booking.Status.choices):
+        bookings = bookings.filter(status=status_filter)
+    return bookings, status_filter
+
+
+def filter_inquiries(params):
+    """All inquiries (the list has no filters)."""
+    return Inquiry.objects.all()
@@ -0,0 +1,108 @@
+"""
+Aggregate statistics for the lora_admin dashboard and locations page.
+
+Every figure comes from a single annotated or aggregate query (conditional
+Count(..., filter=Q(...))), never from a count per row, and is cached for
+ADMIN_STATS_CACHE_TTL seconds. Property and location figures are also keyed
+by the catalog version (properties.cache), so they refresh as soon as a
+listing changes; booking and inquiry figures just expire.
+"""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from bookings.models import Booking
+from inquiries.models import Inquiry
+from locations.models import Location
+from properties.cache import get_catalog_version
+from properties.models import Property
+
+KEY_PREFIX = "lora:admin-stats"
+# Inquiry windows shown on the dashboard: label -> age
+RECENT_WINDOWS = (("today", timedelta(days=1)), ("week", timedelta(days=7)), ("month", timedelta(days=30)))
+
+
+def _cached(name: str, compute, *, catalog: bool = False):
+    key = f"{KEY_PREFIX}:{name}"
+    if catalog:
+        key = f"{key}:{get_catalog_version()}"
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, settings.ADMIN_STATS_CACHE_TTL)
+    return value
+
+
+def _location_stats() -> list[dict]:
+    return list(
+        Location.objects.values("id", "name", "city")
+        .annotate(
+            total=Count("properties"),
+            published=Count("properties", filter=Q(properties__published=True)),
+            rent=Count("properties", filter=Q(properties__listing_type=Property.ListingType.RENT)),
+            sale=Count("properties", filter=Q(properties__listing_type=Property.ListingType.SALE)),
+            available=Count("properties", filter=Q(properties__availability=Property.Availability.AVAILABLE)),
+        )
+        .order_by("city", "name")
+    )
+
+
+def _property_stats() -> dict:
+    filters = {
+        "total": Q(),
+        "published": Q(published=True),
+        "drafts": Q(published=False),
+        "featured": Q(featured=True),
+        "rent": Q(listing_type=Property.ListingType.RENT),
+        "sale": Q(listing_type=Property.ListingType.SALE),
+        "available": Q(availability=Property.Availability.AVAILABLE),
+        "media_pending": ~Q(media_status=Property.MediaStatus.READY),
+    }
+    # Aliases can't shadow field names (published, featured), hence the prefix.
+    counts = Property.objects.aggregate(**{f"n_{name}": Count("id", filter=q) for name, q in filters.items()})
+    return {name: counts[f"n_{name}"] for name in filters}
+
+
+def _booking_stats() -> dict:
+    counts = Booking.objects.aggregate(
+        total=Count("id"),
+        **{value: Count("id", filter=Q(status=value)) for value in Booking.Status.values},
+    )
+    return {
+        "total": counts["total"],
+        "by_status": [
+            {"status": value, "label": label, "count": counts[value]} for value, label in Booking.Status.choices
+        ],
+    }
+
+
+def _inquiry_stats() -> dict:
+    now = timezone.now()
+    return Inquiry.objects.aggregate(
+        total=Count("id"),
+        **{label: Count("id", filter=Q(created_at__gte=now - age)) for label, age in RECENT_WINDOWS},
+    )
+
+
+def location_stats() -> list[dict]:
+    """Per location: id, name, city and total/published/rent/sale/available property counts."""
+    return _cached("locations", _location_stats, catalog=True)
+
+
+def property_stats() -> dict:
+    return _cached("properties", _property_stats, catalog=True)
+
+
+def booking_stats() -> dict:
+    """Total plus ``by_status``: [{"status", "label", "count"}] in Booking.Status order."""
+    return _cached("bookings", _booking_stats)
+
+
+def inquiry_stats() -> dict:
+    """Total plus counts received in the last day/week/month (keys from RECENT_WINDOWS)."""
+    return _cached("inquiries", _inquiry_stats)
@@ -2,19 +2,29 @@
 Custom Lora Real Estate Admin Dashboard - Modern SaaS-style admin.
 Replaces default Django admin UI with custom views and templates.
 """
+from functools import wraps
+
 from django.contrib.auth import authenticate, login, logout
-from django.db.models import Q
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q, prefetch_related_objects
 from django import forms
 from django.forms import ModelForm, Textarea, TextInput
-from django.http import HttpResponseRedirect
+from django.http import Http404, HttpResponseRedirect, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.contrib import messages
+from django.template.defaultfilters import filesizeformat
+from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.views import View
 from django.views.generic import CreateView, DeleteView, DetailView, ListView, UpdateView
 
 from bookings.models import Booking
+from config import admin_stats
+from config.admin_filters import PROPERTY_SORTS, filter_bookings, filter_inquiries, filter_properties, property_sort
+from config.exports import EXPORTS, FORMATS, stream_export
+from config.query_budget import query_budget
 from inquiries.models import Inquiry
 from locations.models import Location
 
@@ -30,8 +40,9 @@ class LocationForm(ModelForm):
 
 
 from locations.models import Location
-from properties.models import Property, PropertyImage
-from properties.services import delete_property_media, destroy_cloudinary_asset, upload_property_media
+from properties.models import Property
+from properties.pagination import Keyset, decode_cursor, encode_cursor
+from properties.services import destroy_media_assets, edit_gallery, save_property_media
 
 
 def _get_or_create_location(name: str, city: str) -> Location:
@@ -49,6 +60,7 @@ def _get_or_create_location(name: str, city: str) -> Location:
 
 
 def staff_required(view_func):
+    @wraps(view_func)
     def wrapper(request, *args, **kwargs):
         if not request.user.is_authenticated:
             return redirect(reverse("lora_admin:login"))
@@ -133,11 +145,13 @@ class AdminMixin:
 # --- Views ---
 
 
+@query_budget(6)
 def admin_logout(request):
     logout(request)
     return redirect(reverse("lora_admin:login"))
 
 
+@query_budget(8)
 def admin_login(request):
     if request.user.is_authenticated and request.user.is_staff:
         return redirect(reverse("lora_admin:dashboard"))
@@ -157,6 +171,7 @@ def admin_login(request):
     return render(request, "lora_admin/login.html", {"error": error})
 
 
+@query_budget(12)
 @staff_required
 def dashboard(request):
     rental = Property.objects.filter(listing_type="rent").select_related("location").order_by("-created_at")[:20]
@@ -167,34 +182,94 @@ def dashboard(request):
         {
             "rental_properties": rental,
             "buy_properties": buy,
+            "property_stats": admin_stats.property_stats(),
+            "booking_stats": admin_stats.booking_stats(),
+            "inquiry_stats": admin_stats.inquiry_stats(),
             "page_title": "Dashboard",
         },
     )
 
 
+ADMIN_PAGE_SIZE = 50
+ADMIN_LIST_FIELDS = (
+    "title", "listing_type", "property_type", "currency", "price", "featured", "published",
+    "availability", "media_status", "created_at", "location__name", "location__city",
+)
+
+
+def _list_url(request, **params) -> str:
+    """The property list URL with the current query string, ``params`` replaced and the cursor dropped."""
+    query = request.GET.copy()
+    query.pop("cursor", None)
+    for key, value in params.items():
+        query.pop(key, None)
+        if value:
+            query[key] = value
+    qs = query.urlencode()
+    return reverse("lora_admin:property_list") + ("?" + qs if qs else "")
+
+
+@query_budget(8)
 @staff_required
 def property_list(request):
-    properties = Property.objects.select_related("location").order_by("-created_at")
-    listing_type = request.GET.get("type")
-    location_id = request.GET.get("location")
-    location_filter = None
-    if listing_type == "rent":
-        properties = properties.filter(listing_type="rent")
-    elif listing_type == "sale":
-        properties = properties.filter(listing_type="sale")
-    if location_id:
+    """
+    Server-side filtered, searched and sorted list, one keyset page at a time
+    (see properties.pagination), so render time does not grow with the catalog.
+    """
+    properties, active = filter_properties(request.GET)
+    properties = properties.select_related("location").only(*ADMIN_LIST_FIELDS)
+    sort = property_sort(request.GET)
+    keyset = Keyset([sort])
+    values, backwards = None, False
+    if request.GET.get("cursor"):
         try:
-            location_filter = Location.objects.get(pk=location_id)
-            properties = properties.filter(location=location_filter)
-        except (Location.DoesNotExist, ValueError):
+            values, backwards = decode_cursor(request.GET["cursor"])
+        except ValueError:
             pass
+        if values is not None and len(values) != len(keyset.fields):
+            values, backwards = None, False
+    try:
+        rows, has_more = keyset.page(properties, ADMIN_PAGE_SIZE, values, backwards)
+    except (ValueError, TypeError, ValidationError):
+        # A cursor that does not fit the sort columns: start from the top.
+        values, backwards = None, False
+        rows, has_more = keyset.page(properties, ADMIN_PAGE_SIZE)
+
+    next_url = previous_url = None
+    if rows:
+        if has_more or backwards:
+            next_url = _list_url(request, cursor=encode_cursor(keyset.values_for(rows[-1])))
+        if values is not None and (has_more or not backwards):
+            previous_url = _list_url(request, cursor=encode_cursor(keyset.values_for(rows[0]), backwards=True))
+    # Column headers toggle between ascending and descending.
+    sort_links = {
+        field: _list_url(request, sort=field if sort == "-" + field else "-" + field)
+        for field in ("title", "price")
+    }
     return render(
         request,
         "lora_admin/property_list.html",
-        {"properties": properties, "page_title": "Properties", "location_filter": location_filter},
+        {
+            "properties": rows,
+            "page_title": "Properties",
+            "location_filter": active["location"],
+            "search": active["search"],
+            "sort": sort,
+            "sort_choices": PROPERTY_SORTS.items(),
+            "sort_links": sort_links,
+            "property_type_filter": active["property_type"],
+            "status_filter": active["status"],
+            "featured_filter": active["featured"],
+            "published_filter": active["published"],
+            "property_type_choices": Property.PropertyType.choices,
+            "status_choices": Property.Availability.choices,
+            "next_url": next_url,
+            "previous_url": previous_url,
+        },
     )
 
 
+@query_budget(40)
 @staff_required
 def property_add(request):
     form = PropertyForm(
@@ -222,12 +297,18 @@ def property_add(request):
         video_file = request.FILES.get("video_upload") if request.FILES else None
         gallery_files = request.FILES.getlist("gallery_uploads") if request.FILES else []
         try:
-            upload_property_media(
+            result = save_property_media(
                 prop,
                 main_image_file=main_image_file,
                 gallery_files=gallery_files if gallery_files else None,
                 video_file=video_file,
             )
+            if result.queued:
+                messages.info(request, "Property saved. Media is uploading in the background.")
+            if result.optimized:
+                messages.info(request, f"Images optimized: {filesizeformat(result.bytes_saved)} saved.")
+            if not result.ok:
+                messages.warning(request, f"Property saved, but some media failed to upload: {result.error_message()}")
         except ValueError as e:
             messages.warning(request, f"Property saved, but media upload failed: {e}")
         return redirect(reverse("lora_admin:property_detail", args=[prop.pk]))
@@ -238,9 +319,10 @@ def property_add(request):
     )
 
 
+@query_budget(9)
 @staff_required
 def property_detail(request, pk):
-    prop = get_object_or_404(Property.objects.select_related("location").prefetch_related("gallery_images"), pk=pk)
+    prop = get_object_or_404(Property.objects.select_related("location").with_visible_gallery(), pk=pk)
     return render(
         request,
         "lora_admin/property_detail.html",
@@ -248,9 +330,10 @@ def property_detail(request, pk):
     )
 
 
+@query_budget(40)
 @staff_required
 def property_edit(request, pk):
-    prop = get_object_or_404(Property, pk=pk)
+    prop = get_object_or_404(Property.objects.select_related("location"), pk=pk)
     initial_location = (
         {"location_name": prop.location.name, "location_city": prop.location.city}
         if prop.location
@@ -286,69 +369,40 @@ def property_edit(request, pk):
         gallery_delete_ids = [x.strip() for x in (post.get("gallery_delete_ids") or "").split(",") if x.strip()]
 
         if main_image_delete:
-            if prop.main_image_public_id:
-                destroy_cloudinary_asset(prop.main_image_public_id, "image")
-            prop.main_image = ""
-            prop.main_image_public_id = ""
-            prop.save(update_fields=["main_image", "main_image_public_id", "updated_at"])
-
-        for img_id in gallery_delete_ids:
-            try:
-                img = PropertyImage.objects.get(pk=int(img_id), property=prop)
-                if img.public_id:
-                    destroy_cloudinary_asset(img.public_id, "image")
-                img.delete()
-            except (PropertyImage.DoesNotExist, ValueError):
-                pass
-
-        if main_image_file and not main_image_delete:
-            try:
-                upload_property_media(prop, main_image_file=main_image_file)
-            except ValueError as e:
-                form.add_error(None, str(e))
-                return render(request, "lora_admin/property_form.html", {"form": form, "page_title": "Edit Property", "property": prop})
-
-        if gallery_files:
+            # One transaction: the asset is only released (and destroyed after
+            # commit) together with the field that pointed at it.
+            with transaction.atomic():
+                if prop.main_image_public_id:
+                    destroy_media_assets([(prop.main_image_public_id, "image")])
+                prop.main_image = ""
+                prop.main_image_public_id = ""
+                prop.save(update_fields=["main_image", "main_image_public_id", "updated_at"])
+
+        edit_gallery(prop, **_gallery_edit_from_post(post, gallery_delete_ids))
+
+        if (main_image_file and not main_image_delete) or gallery_files or video_file:
+            # One call so the main image, gallery and video upload concurrently.
             try:
-                upload_property_media(
+                result = save_property_media(
                     prop,
-                    gallery_files=gallery_files,
+                    main_image_file=main_image_file if not main_image_delete else None,
+                    gallery_files=gallery_files or None,
                     append_gallery=True,
+                    video_file=video_file,
                 )
             except ValueError as e:
                 form.add_error(None, str(e))
                 return render(request, "lora_admin/property_form.html", {"form": form, "page_title": "Edit Property", "property": prop})
-
-        if video_file:
-            try:
-                upload_property_media(prop, video_file=video_file)
-            except ValueError as e:
-                form.add_error(None, str(e))
-                return render(request, "lora_admin/property_form.html", {"form": form, "page_title": "Edit Property", "property": prop})
-
-        for key, val in post.items():
-            if key.startswith("gallery_order_") and key != "gallery_order_main":
-                try:
-                    img_id = key.replace("gallery_order_", "")
-                    if img_id.startswith("new_"):
-                        continue
-                    img = PropertyImage.objects.get(pk=int(img_id), property=prop)
-                    img.sort_order = int(val)
-                    img.save()
-                except (PropertyImage.DoesNotExist, ValueError):
-                    pass
-            if key.startswith("gallery_visible_"):
-                try:
-                    img_id = key.replace("gallery_visible_", "")
-                    if img_id == "main":
-                        continue
-                    img = PropertyImage.objects.get(pk=int(img_id), property=prop)
-                    img.visible = val == "on"
-                    img.save()
-                except (PropertyImage.DoesNotExist, ValueError):
-                    pass
+            if result.queued:
+                messages.info(request, "Media is uploading in the background.")
+            if result.optimized:
+                messages.info(request, f"Images optimized: {filesizeformat(result.bytes_saved)} saved.")
+            if not result.ok:
+                messages.warning(request, f"Some media failed to upload: {result.error_message()}")
 
         return redirect(reverse("lora_admin:property_detail", args=[prop.pk]))
+    # The form lists every gallery image (hidden ones too) twice; fetch them once.
+    prefetch_related_objects([prop], "gallery_images")
     return render(
         request,
         "lora_admin/property_form.html",
@@ -356,12 +410,33 @@ def property_edit(request, pk):
     )
 
 
+def _gallery_edit_from_post(post, delete_ids) -> dict:
+    """edit_gallery() arguments from the form's gallery_order_<id> / gallery_visible_<id> fields."""
+    order, visible = {}, {}
+    for key, val in post.items():
+        try:
+            if key.startswith("gallery_order_"):
+                order[int(key.removeprefix("gallery_order_"))] = int(val)
+            elif key.startswith("gallery_visible_"):
+                visible[int(key.removeprefix("gallery_visible_"))] = val == "on"
+        except ValueError:
+            pass  # "main", "new_<n>" (rows still uploading) or a bad number
+    delete = set()
+    for img_id in delete_ids:
+        try:
+            delete.add(int(img_id))
+        except ValueError:
+            pass
+    return {"order": order, "visible": visible, "delete": delete}
+
+
 def _property_list_redirect(request):
     base = reverse("lora_admin:property_list")
     qs = request.GET.urlencode()
     return redirect(base + ("?" + qs if qs else ""))
 
 
+@query_budget(9)
 @staff_required
 def property_toggle_status(request, pk):
     """Toggle featured or published from property list dropdown."""
@@ -390,27 +465,27 @@ def property_toggle_status(request, pk):
     return _property_list_redirect(request)
 
 
+@query_budget(18)
 @staff_required
 def property_delete(request, pk):
     prop = get_object_or_404(Property, pk=pk)
     if request.method == "POST":
-        delete_property_media(prop)
-        prop.delete()
+        prop.delete()  # pre_delete releases the media (properties/signals.py)
         return redirect(reverse("lora_admin:dashboard"))
     return render(request, "lora_admin/property_confirm_delete.html", {"property": prop, "page_title": "Delete Property"})
 
 
+@query_budget(10)
 @staff_required
 def locations_list(request):
-    locations = Location.objects.order_by("city", "name")
-    locations_with_count = [(loc, loc.properties.count()) for loc in locations]
     return render(
         request,
         "lora_admin/locations.html",
-        {"locations_with_count": locations_with_count, "page_title": "Locations"},
+        {"locations": admin_stats.location_stats(), "page_title": "Locations"},
     )
 
 
+@query_budget(8)
 @staff_required
 def location_edit(request, pk):
     loc = get_object_or_404(Location, pk=pk)
@@ -421,6 +496,7 @@ def location_edit(request, pk):
     return render(request, "lora_admin/location_form.html", {"form": form, "location": loc, "page_title": "Edit Location"})
 
 
+@query_budget(10)
 @staff_required
 def location_delete(request, pk):
     loc = get_object_or_404(Location, pk=pk)
@@ -432,13 +508,11 @@ def location_delete(request, pk):
     return render(request, "lora_admin/location_confirm_delete.html", {"location": loc, "page_title": "Delete Location", "has_properties": loc.properties.exists()})
 
 
+@query_budget(8)
 @staff_required
 def bookings_list(request):
-    qs = Booking.objects.select_related("property").order_by("-created_at")
-    status_filter = (request.GET.get("status") or "").strip()
-    if status_filter and status_filter in dict(Booking.Status.choices):
-        qs = qs.filter(status=status_filter)
-    bookings = list(qs[:50])
+    qs, status_filter = filter_bookings(request.GET)
+    bookings = list(qs.select_related("property").order_by("-created_at")[:50])
     return render(
         request,
         "lora_admin/bookings.html",
@@ -451,9 +525,10 @@ def bookings_list(request):
     )
 
 
+@query_budget(8)
 @staff_required
 def inquiries_list(request):
-    inquiries = Inquiry.objects.select_related("property").order_by("-created_at")[:50]
+    inquiries = filter_inquiries(request.GET).select_related("property").order_by("-created_at")[:50]
     return render(
         request,
         "lora_admin/inquiries.html",
@@ -461,12 +536,28 @@ def inquiries_list(request):
     )
 
 
+@query_budget(6)
+@staff_required
+def export_records(request, kind):
+    """Stream properties/bookings/inquiries as CSV or JSONL (?format=), filtered like the list page."""
+    if kind not in EXPORTS:
+        raise Http404
+    fmt = request.GET.get("format", "csv")
+    if fmt not in FORMATS:
+        fmt = "csv"
+    # The rows are queried while the body streams, after the query budget is counted.
+    response = StreamingHttpResponse(stream_export(kind, request.GET, fmt), content_type=FORMATS[fmt])
+    response["Content-Disposition"] = f'attachment; filename="{kind}-{timezone.now():%Y%m%d-%H%M}.{fmt}"'
+    return response
+
+
 def _bookings_redirect(request):
     base = reverse("lora_admin:bookings")
     status = request.POST.get("next_status_filter") or request.GET.get("status", "")
     return redirect(base + ("?status=" + status if status else ""))
 
 
+@query_budget(9)
 @staff_required
 def booking_update_status(request, pk):
     """Update booking status from list view dropdown."""
@@ -480,6 +571,7 @@ def booking_update_status(request, pk):
     return _bookings_redirect(request)
 
 
+@query_budget(8)
 @staff_required
 def booking_delete(request, pk):
     booking = get_object_or_404(Booking.objects.select_related("property"), pk=pk)
@@ -495,6 +587,7 @@ def booking_delete(request, pk):
     )
 
 
+@query_budget(8)
 @staff_required
 def inquiry_delete(request, pk):
     inquiry = get_object_or_404(Inquiry, pk=pk)
@@ -505,6 +598,7 @@ def inquiry_delete(request, pk):
     return render(request, "lora_admin/inquiry_confirm_delete.html", {"inquiry": inquiry, "page_title": "Delete Inquiry"})
 
 
+@query_budget(8)
 @staff_required
 def booking_detail(request, pk):
     booking = get_object_or_404(Booking.objects.select_related("property"), pk=pk)
@@ -0,0 +1,72 @@
+"""
+Conditional GET (ETag / Last-Modified / 304) for read-only API actions.
+
+Validators come from one cheap aggregate over the filtered queryset:
+MAX(updated_at) plus COUNT(*). The count catches deletions, which never move
+MAX(updated_at) forward. When the client's validators still match, the view
+returns 304 without serializing anything.
+"""
+from __future__ import annotations
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+class ConditionalGetMixin:
+    """
+    Wrap a viewset action with conditional GET handling:
+
+        def list(self, request, *args, **kwargs):
+            return self.conditional_response(super().list, request, *args, **kwargs)
+    """
+
+    conditional_actions = ("list", "retrieve")
+    # Extra MAX() columns whose changes alter the representation
+    # (e.g. a related location's updated_at).
+    conditional_max_fields = ("updated_at",)
+
+    def get_conditional_queryset(self, request, *args, **kwargs):
+        qs = self.filter_queryset(self.get_queryset())
+        if self.action == "retrieve":
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            qs = qs.filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+        return qs
+
+    def compute_validators(self, request, *args, **kwargs):
+        """Return (etag, last_modified datetime or None) for this request."""
+        qs = self.get_conditional_queryset(request, *args, **kwargs)
+        aggregates = {f"max_{i}": Max(f) for i, f in enumerate(self.conditional_max_fields)}
+        row = qs.order_by().aggregate(count=Count("pk"), **aggregates)
+        stamps = [row[k] for k in aggregates if row[k] is not None]
+        last_modified = max(stamps) if stamps else None
+        # The query string is part of the tag: pages and orderings of the same
+        # rows are different representations.
+        raw = "|".join(
+            [self.action, request.get_full_path(), str(row["count"])]
+            + [row[k].isoformat() if row[k] else "" for k in aggregates]
+        )
+        etag = 'W/"%s"' % hashlib.md5(raw.encode("utf-8")).hexdigest()
+        return etag, last_modified
+
+    def get_validators(self, request, *args, **kwargs):
+        return self.compute_validators(request, *args, **kwargs)
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD") or self.action not in self.conditional_actions:
+            return handler(request, *args, **kwargs)
+
+        etag, last_modified = self.get_validators(request, *args, **kwargs)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if timestamp is not None:
+                response["Last-Modified"] = http_date(timestamp)
+            # Let browsers keep the body but revalidate it on every use.
+            response["Cache-Control"] = "no-cache"
+        return response
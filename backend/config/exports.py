@@ -0,0 +1,147 @@
+"""
+Streaming CSV / JSONL exports of properties, bookings and inquiries.
+
+Rows are read with values_list(...).iterator(chunk_size=CHUNK_SIZE) (a
+server-side cursor on Postgres) and written out one chunk at a time, so
+memory stays flat however many rows there are. The CSV header is yielded
+before the query runs, so the first byte goes out straight away. Used by
+the lora_admin ``export`` view (StreamingHttpResponse) and
+``manage.py export_records``; filters are the list pages' (config.admin_filters).
+"""
+from __future__ import annotations
+
+import csv
+import datetime
+import re
+from dataclasses import dataclass
+from typing import Callable
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from config.admin_filters import filter_bookings, filter_inquiries, filter_properties, property_sort
+
+CHUNK_SIZE = 2000
+# Text starting with these is a formula to spreadsheet apps (CSV injection);
+# such cells get a leading apostrophe, which they display as plain text.
+# Numbers and phone numbers ("+255 712 345 678", "-5") are left alone so
+# they survive an export / import_properties round trip.
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+_PLAIN_NUMBER_RE = re.compile(r"[+-]?[\d(][\d\s().-]*")
+FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+
+
+@dataclass(frozen=True)
+class Export:
+    # (column name, field path for values_list)
+    columns: tuple[tuple[str, str], ...]
+    queryset: Callable  # params -> ordered queryset
+
+
+def _properties(params):
+    sort = property_sort(params)
+    return filter_properties(params)[0].order_by(sort, "-id" if sort.startswith("-") else "id")
+
+
+EXPORTS = {
+    # Column names match import_properties, so an export can be imported elsewhere.
+    "properties": Export(
+        columns=(
+            ("id", "id"),
+            ("title", "title"),
+            ("description", "description"),
+            ("property_type", "property_type"),
+            ("listing_type", "listing_type"),
+            ("price", "price"),
+            ("currency", "currency"),
+            ("location_name", "location__name"),
+            ("location_city", "location__city"),
+            ("bedrooms", "bedrooms"),
+            ("bathrooms", "bathrooms"),
+            ("area_size", "area_size"),
+            ("featured", "featured"),
+            ("published", "published"),
+            ("availability", "availability"),
+            ("media_status", "media_status"),
+            ("contact_phone", "contact_phone"),
+            ("contact_whatsapp", "contact_whatsapp"),
+            ("main_image", "main_image"),
+            ("video_url", "video_url"),
+            ("created_at", "created_at"),
+            ("updated_at", "updated_at"),
+        ),
+        queryset=_properties,
+    ),
+    "bookings": Export(
+        columns=(
+            ("id", "id"),
+            ("property_id", "property_id"),
+            ("property_title", "property__title"),
+            ("full_name", "full_name"),
+            ("email", "email"),
+            ("phone", "phone"),
+            ("preferred_date", "preferred_date"),
+            ("preferred_time", "preferred_time"),
+            ("status", "status"),
+            ("message", "message"),
+            ("created_at", "created_at"),
+        ),
+        queryset=lambda params: filter_bookings(params)[0].order_by("-created_at", "-id"),
+    ),
+    "inquiries": Export(
+        columns=(
+            ("id", "id"),
+            ("property_id", "property_id"),
+            ("property_title", "property__title"),
+            ("full_name", "full_name"),
+            ("email", "email"),
+            ("phone", "phone"),
+            ("message", "message"),
+            ("created_at", "created_at"),
+        ),
+        queryset=lambda params: filter_inquiries(params).order_by("-created_at", "-id"),
+    ),
+}
+
+
+class _Line:
+    """File-like object for csv.writer that hands back what it was given."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime.date, datetime.time)):  # datetimes included
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES) and not _PLAIN_NUMBER_RE.fullmatch(value):
+        return "'" + value
+    return value
+
+
+def stream_export(name: str, params, fmt: str = "csv"):
+    """Yield the export as text chunks of up to CHUNK_SIZE rows."""
+    export = EXPORTS[name]
+    headers = [column for column, _ in export.columns]
+    fields = [field for _, field in export.columns]
+    rows = export.queryset(params).values_list(*fields).iterator(chunk_size=CHUNK_SIZE)
+    if fmt == "csv":
+        writer = csv.writer(_Line())
+        yield writer.writerow(headers)
+
+        def encode(row):
+            return writer.writerow([_csv_value(v) for v in row])
+    else:
+        encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+        def encode(row):
+            return encoder.encode(dict(zip(headers, row))) + "\n"
+    chunk = []
+    for row in rows:
+        chunk.append(encode(row))
+        if len(chunk) >= CHUNK_SIZE:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
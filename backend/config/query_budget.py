@@ -0,0 +1,105 @@
+"""
+Per-view SQL query budgets.
+
+A view declares the most queries one request may run:
+
+- function views: ``@query_budget(8)`` (outermost decorator)
+- DRF views/viewsets: ``query_budget = 5`` or ``{"list": 4, "retrieve": 4}``
+- views we don't own (Django admin, admindocs): ``settings.QUERY_BUDGETS``,
+  keyed by URL name, with fnmatch patterns such as ``"admin:*"``
+
+QueryBudgetMiddleware counts every query a request runs (sessions and auth
+included) and logs a warning when the budget is exceeded, or raises
+QueryBudgetExceeded when ``settings.QUERY_BUDGET_STRICT`` is on (tests).
+"""
+from __future__ import annotations
+
+import fnmatch
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger("django")
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_budget(limit):
+    """Declare the query budget of a view (int, or {action: int} for viewsets)."""
+
+    def decorator(view):
+        view.query_budget = limit
+        return view
+
+    return decorator
+
+
+def get_budget(resolver_match, method: str = "GET") -> int | None:
+    """Budget for a resolved URL, or None when nothing is declared."""
+    if resolver_match is None:
+        return None
+    func = resolver_match.func
+    view_class = getattr(func, "cls", None) or getattr(func, "view_class", None)
+    budget = getattr(func, "query_budget", None)
+    if budget is None and view_class is not None:
+        budget = getattr(view_class, "query_budget", None)
+
+    if isinstance(budget, dict):
+        actions = getattr(func, "actions", None) or {}
+        action = actions.get(method.lower())
+        budget = budget.get(action) if action else None
+
+    if budget is None:
+        budget = _settings_budget(resolver_match.view_name)
+    return budget
+
+
+def _settings_budget(view_name: str) -> int | None:
+    budgets = getattr(settings, "QUERY_BUDGETS", {}) or {}
+    if view_name in budgets:
+        return budgets[view_name]
+    for pattern, limit in budgets.items():
+        if fnmatch.fnmatchcase(view_name or "", pattern):
+            return limit
+    return None
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class QueryBudgetMiddleware:
+    """Count queries per request and enforce the view's query budget."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+
+        request.query_count = counter.count
+        budget = get_budget(getattr(request, "resolver_match", None), request.method)
+        if settings.DEBUG or getattr(settings, "QUERY_BUDGET_STRICT", False):
+            response["X-Query-Count"] = str(counter.count)
+        if budget is not None and counter.count > budget:
+            message = (
+                f"Query budget exceeded: {request.method} {request.path} ran "
+                f"{counter.count} queries (budget {budget})"
+            )
+            if getattr(settings, "QUERY_BUDGET_STRICT", False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
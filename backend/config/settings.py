@@ -70,6 +70,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'config.query_budget.QueryBudgetMiddleware',
     'config.middleware.Log500Middleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -187,7 +188,89 @@ if _cors_origins:
 else:
     # Public read + public inquiry/booking POSTs are allowed from any origin.
     # Admin-only endpoints are protected by JWT and not by CORS.
-    CORS_ALLOW_ALL_ORIGINS = True# DRF / JWT
+    CORS_ALLOW_ALL_ORIGINS = True
+
+# Cache: local memory (per process) by default. Set CACHE_BACKEND=db to share the
+# cache between gunicorn workers (run `python manage.py createcachetable` once).
+_cache_backend = os.environ.get("CACHE_BACKEND", "locmem").strip().lower()
+if _cache_backend == "db":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "lora_cache",
+            "OPTIONS": {"MAX_ENTRIES": 5000},
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "lora",
+            "OPTIONS": {"MAX_ENTRIES": 2000},
+        }
+    }
+
+# Public property API response cache (seconds); entries are also invalidated on
+# every catalog change via the catalog version counter.
+CATALOG_CACHE_TIMEOUT = int(os.environ.get("CATALOG_CACHE_TIMEOUT", "300"))
+
+# Dashboard/locations statistics cache (seconds; see config/admin_stats.py). Property
+# figures also refresh on every catalog change; booking/inquiry counts lag by up to this.
+ADMIN_STATS_CACHE_TTL = int(os.environ.get("ADMIN_STATS_CACHE_TTL", "60"))
+
+# Full-text search backend for /api/properties/?search= (dotted path). Empty picks
+# Postgres tsvector or SQLite FTS5 from the database vendor.
+PROPERTY_SEARCH_BACKEND = os.environ.get("PROPERTY_SEARCH_BACKEND", "").strip()
+
+# SQL query budgets per request (see config/query_budget.py). Our own views declare
+# theirs in code; these cover views we don't own, keyed by URL name (fnmatch).
+# Over-budget requests log a warning, or raise when QUERY_BUDGET_STRICT is on.
+QUERY_BUDGET_STRICT = os.environ.get("QUERY_BUDGET_STRICT", "0").lower() in ("1", "true", "yes", "on")
+QUERY_BUDGETS = {
+    "api-root": 1,
+    "token_obtain_pair": 3,
+    "token_refresh": 3,
+    "admin_password_reset": 6,
+    "admin:*": 14,
+    "django-admindocs-*": 8,
+}
+
+# Media storage backend (properties/backends.py): "cloudinary", "local" (files
+# in MEDIA_ROOT served at MEDIA_BASE_URL + MEDIA_URL by this app), or a dotted
+# path such as properties.bench.FakeMediaBackend for offline benchmarks.
+MEDIA_BACKEND = os.environ.get("MEDIA_BACKEND", "cloudinary").strip() or "cloudinary"
+MEDIA_ROOT = os.environ.get("MEDIA_ROOT", "").strip() or str(BASE_DIR / "media")
+MEDIA_URL = "/media/"
+MEDIA_BASE_URL = os.environ.get("MEDIA_BASE_URL", "http://127.0.0.1:8000").strip()
+# Media uploads: gallery files upload concurrently on this many threads.
+MEDIA_UPLOAD_WORKERS = max(1, int(os.environ.get("MEDIA_UPLOAD_WORKERS", "4")))
+# Pre-upload image optimization (properties/optimize.py, needs Pillow): fit
+# within MEDIA_IMAGE_MAX_DIMENSION px, re-encode as webp/jpeg, drop metadata.
+MEDIA_OPTIMIZE_IMAGES = os.environ.get("MEDIA_OPTIMIZE_IMAGES", "0").lower() in ("1", "true", "yes", "on")
+MEDIA_IMAGE_MAX_DIMENSION = int(os.environ.get("MEDIA_IMAGE_MAX_DIMENSION", "2560"))
+MEDIA_IMAGE_QUALITY = int(os.environ.get("MEDIA_IMAGE_QUALITY", "82"))
+MEDIA_IMAGE_FORMAT = "jpeg" if os.environ.get("MEDIA_IMAGE_FORMAT", "webp").lower() in ("jpg", "jpeg") else "webp"
+MEDIA_OPTIMIZE_PROCESSES = int(os.environ.get("MEDIA_OPTIMIZE_PROCESSES", "2"))
+# Widths (px) of the resized image URLs the API returns as srcset
+# (see properties/images.py).
+IMAGE_VARIANT_WIDTHS = sorted(
+    int(w) for w in os.environ.get("IMAGE_VARIANT_WIDTHS", "320,640,960,1280,1920").split(",") if w.strip()
+)
+# Videos larger than the threshold upload in resumable chunks (Cloudinary
+# requires chunks of at least 5 MB, except the last one).
+MEDIA_CHUNKED_UPLOAD_THRESHOLD = int(os.environ.get("MEDIA_CHUNKED_UPLOAD_THRESHOLD", str(20 * 1024 * 1024)))
+MEDIA_UPLOAD_CHUNK_SIZE = max(5 * 1024 * 1024, int(os.environ.get("MEDIA_UPLOAD_CHUNK_SIZE", str(6 * 1024 * 1024))))
+MEDIA_CHUNK_RETRIES = 3
+
+# Background media jobs: with MEDIA_ASYNC on, admin saves spool files to
+# MEDIA_SPOOL_DIR and `python manage.py run_media_worker` uploads/deletes them.
+MEDIA_ASYNC = os.environ.get("MEDIA_ASYNC", "0").lower() in ("1", "true", "yes", "on")
+MEDIA_SPOOL_DIR = os.environ.get("MEDIA_SPOOL_DIR", "").strip() or str(BASE_DIR / "media_spool")
+MEDIA_JOB_MAX_ATTEMPTS = int(os.environ.get("MEDIA_JOB_MAX_ATTEMPTS", "5"))
+MEDIA_JOB_BACKOFF_SECONDS = int(os.environ.get("MEDIA_JOB_BACKOFF_SECONDS", "30"))
+MEDIA_JOB_LOCK_TIMEOUT = 15 * 60  # a running job older than this is retried (worker died)
+
+# DRF / JWT
 # Cloudinary (images/videos → URLs) – optional; admin uploads fail gracefully if not set
 try:
     _CLOUDINARY_URL = os.environ.get("CLOUDINARY_URL", "").strip()
@@ -0,0 +1,365 @@
+"""
+Query-budget regression tests: every route in config/urls.py must declare a
+query budget (see config/query_budget.py) and stay within it, and list pages
+must cost the same number of queries however many rows they show. Also the
+streamed CSV / JSONL exports (config/exports.py) and the lora_admin property
+list's filters, search and keyset pages (config/admin_filters.py).
+"""
+import csv
+import datetime
+import io
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from bookings.models import Booking
+from config.admin_filters import filter_properties
+from config.query_budget import get_budget
+from inquiries.models import Inquiry
+from locations.models import Location
+from properties.models import Property, PropertyImage
+
+User = get_user_model()
+
+
+def seed(n: int, prefix: str = "Seed") -> list[Property]:
+    props = []
+    for i in range(n):
+        loc, _ = Location.objects.get_or_create(name=f"{prefix} Area {i % 3}", city="Dar es Salaam")
+        prop = Property.objects.create(
+            title=f"{prefix} villa {i}",
+            description="Sea view villa with garden",
+            property_type="house",
+            listing_type="rent" if i % 2 else "sale",
+            price=1000 + i,
+            location=loc,
+            featured=i % 3 == 0,
+        )
+        for j in range(3):
+            PropertyImage.objects.create(property=prop, url=f"https://example.com/{prop.pk}/{j}.jpg", sort_order=j)
+        Booking.objects.create(
+            property=prop,
+            full_name=f"Guest {i}",
+            email="guest@example.com",
+            preferred_date=datetime.date(2026, 1, 1),
+            preferred_time=datetime.time(10, 0),
+        )
+        Inquiry.objects.create(property=prop, full_name=f"Lead {i}", email="lead@example.com", message="Hi")
+        props.append(prop)
+    return props
+
+
+def iter_patterns(patterns, namespace=""):
+    for p in patterns:
+        if isinstance(p, URLResolver):
+            ns = f"{namespace}:{p.namespace}" if namespace and p.namespace else (p.namespace or namespace)
+            yield from iter_patterns(p.url_patterns, ns)
+        elif isinstance(p, URLPattern):
+            yield p, namespace
+
+
+class _Match:
+    """Minimal stand-in for ResolverMatch (func + view_name) used by get_budget."""
+
+    def __init__(self, func, view_name):
+        self.func = func
+        self.view_name = view_name
+
+
+class RouteBudgetsDeclaredTests(TestCase):
+    def test_every_route_has_a_budget(self):
+        missing = []
+        for pattern, namespace in iter_patterns(get_resolver().url_patterns):
+            func = pattern.callback
+            name = pattern.name or f"{func.__module__}.{func.__qualname__}"
+            view_name = f"{namespace}:{name}" if namespace else name
+            methods = list((getattr(func, "actions", None) or {"get": None}).keys())
+            for method in methods:
+                if get_budget(_Match(func, view_name), method) is None:
+                    missing.append(f"{method.upper()} {pattern.pattern} ({view_name})")
+        self.assertEqual(missing, [], "Routes without a query budget")
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class QueryBudgetTests(TestCase):
+    """Hit every route; QueryBudgetMiddleware raises when a budget is exceeded."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.props = seed(4)
+        cls.prop = cls.props[0]
+        cls.booking = Booking.objects.first()
+        cls.inquiry = Inquiry.objects.first()
+        cls.staff = User.objects.create_superuser("budget", "budget@example.com", "budget-pass-123")
+
+    def setUp(self):
+        cache.clear()
+
+    def assertWithinBudget(self, method, url, data=None, **extra):
+        response = getattr(self.client, method)(url, data or {}, **extra)
+        self.assertLess(response.status_code, 500, url)
+        return response
+
+    def test_public_api(self):
+        p = self.prop
+        for url in (
+            "/",
+            "/api/",
+            "/api/properties/",
+            "/api/properties/?listing_type=rent&ordering=price",
+            "/api/properties/?pagination=cursor",
+            "/api/properties/?search=villa",
+            "/api/properties/?location=area",
+            f"/api/properties/{p.pk}/",
+            "/api/locations/",
+            "/api/suggest/?q=seed",
+        ):
+            self.assertWithinBudget("get", url)
+
+        booking = {
+            "property": p.pk,
+            "full_name": "Budget Guest",
+            "email": "g@example.com",
+            "preferred_date": "2026-02-01",
+            "preferred_time": "10:00",
+        }
+        self.assertWithinBudget("post", "/api/bookings/", booking, content_type="application/json")
+        inquiry = {"property": p.pk, "full_name": "Budget Lead", "email": "l@example.com", "message": "Hello"}
+        self.assertWithinBudget("post", "/api/inquiries/", inquiry, content_type="application/json")
+
+    def test_auth_api(self):
+        creds = {"username": "budget", "password": "budget-pass-123"}
+        response = self.assertWithinBudget("post", "/api/auth/token/", creds, content_type="application/json")
+        refresh = response.json()["refresh"]
+        self.assertWithinBudget("post", "/api/auth/token/refresh/", {"refresh": refresh}, content_type="application/json")
+
+    def test_staff_api(self):
+        self.client.force_login(self.staff)
+        self.assertWithinBudget("get", "/api/bookings/")
+        self.assertWithinBudget("get", "/api/properties/cache-stats/")
+        first, second, third = self.prop.gallery_images.values_list("pk", flat=True)[:3]
+        edit = {"images": [{"id": first, "sort_order": 2}, {"id": second, "visible": False}], "delete": [third]}
+        response = self.assertWithinBudget(
+            "patch", f"/api/properties/{self.prop.pk}/gallery/", json.dumps(edit), content_type="application/json"
+        )
+        self.assertEqual((response.json()["updated"], response.json()["deleted"]), (2, 1))
+
+    def test_deletes_with_a_large_gallery(self):
+        # The cascade must not cost a query per image (properties/signals.py).
+        big = seed(2, prefix="Big")
+        for prop in big:
+            PropertyImage.objects.bulk_create(
+                PropertyImage(property=prop, url=f"https://example.com/{prop.pk}/x{j}.jpg", sort_order=3 + j)
+                for j in range(30)
+            )
+        self.client.force_login(self.staff)
+        self.assertWithinBudget("post", f"/admin/properties/{big[0].pk}/delete/")
+        self.assertWithinBudget("delete", f"/api/properties/{big[1].pk}/")
+        self.assertFalse(Property.objects.filter(pk__in=[p.pk for p in big]).exists())
+
+    def test_lora_admin(self):
+        p, b, i = self.prop, self.booking, self.inquiry
+        self.assertWithinBudget("get", "/admin/login/")
+        self.client.force_login(self.staff)
+        for url in (
+            "/admin/",
+            "/admin/properties/",
+            "/admin/properties/?type=rent",
+            "/admin/properties/add/",
+            f"/admin/properties/{p.pk}/",
+            f"/admin/properties/{p.pk}/edit/",
+            f"/admin/properties/{p.pk}/delete/",
+            "/admin/locations/",
+            f"/admin/locations/{p.location_id}/edit/",
+            f"/admin/locations/{p.location_id}/delete/",
+            "/admin/bookings/",
+            f"/admin/bookings/{b.pk}/",
+            f"/admin/bookings/{b.pk}/delete/",
+            "/admin/inquiries/",
+            f"/admin/inquiries/{i.pk}/delete/",
+        ):
+            self.assertWithinBudget("get", url)
+        for url in (
+            "/admin/export/properties/?type=rent",
+            "/admin/export/bookings/?status=pending&format=jsonl",
+            "/admin/export/inquiries/",
+        ):
+            response = self.assertWithinBudget("get", url)
+            self.assertTrue(b"".join(response.streaming_content), url)
+        self.assertWithinBudget("post", f"/admin/properties/{p.pk}/toggle-status/", {"field": "featured"})
+        self.assertWithinBudget("post", f"/admin/bookings/{b.pk}/status/", {"status": "confirmed"})
+        self.assertWithinBudget("get", "/admin/logout/")
+
+    def test_django_admin(self):
+        self.client.force_login(self.staff)
+        for url in (
+            "/django-admin/",
+            "/django-admin/properties/property/",
+            f"/django-admin/properties/property/{self.prop.pk}/change/",
+            "/django-admin/locations/location/",
+            "/django-admin/bookings/booking/",
+            "/django-admin/inquiries/inquiry/",
+            "/admin/doc/",
+        ):
+            self.assertWithinBudget("get", url)
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.props = seed(4, prefix="Export")
+        cls.staff = User.objects.create_superuser("export", "export@example.com", "export-pass-123")
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def export(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, b"".join(response.streaming_content).decode("utf-8")
+
+    def test_properties_csv(self):
+        response, body = self.export("/admin/export/properties/?type=rent&sort=price")
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn("attachment;", response["Content-Disposition"])
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(list(rows[0])[:3], ["id", "title", "description"])
+        rent = sorted((p for p in self.props if p.listing_type == "rent"), key=lambda p: p.price)
+        self.assertEqual([int(r["id"]) for r in rows], [p.pk for p in rent])
+        self.assertEqual(rows[0]["location_name"], rent[0].location.name)
+        self.assertEqual(rows[0]["featured"], str(rent[0].featured))
+
+    def test_csv_formulas_are_escaped(self):
+        Property.objects.filter(pk=self.props[0].pk).update(title="=HYPERLINK(\"http://x\")", description="-1+1")
+        _, body = self.export("/admin/export/properties/")
+        row = next(r for r in csv.DictReader(io.StringIO(body)) if int(r["id"]) == self.props[0].pk)
+        self.assertEqual(row["title"], "'=HYPERLINK(\"http://x\")")
+        self.assertEqual(row["description"], "'-1+1")
+
+    def test_phone_numbers_are_not_escaped(self):
+        Property.objects.filter(pk=self.props[0].pk).update(contact_phone="+255 712 345 678")
+        Booking.objects.filter(property=self.props[0]).update(phone="+255712345678")
+        _, body = self.export("/admin/export/properties/")
+        row = next(r for r in csv.DictReader(io.StringIO(body)) if int(r["id"]) == self.props[0].pk)
+        self.assertEqual(row["contact_phone"], "+255 712 345 678")
+        _, body = self.export("/admin/export/bookings/")
+        row = next(r for r in csv.DictReader(io.StringIO(body)) if int(r["property_id"]) == self.props[0].pk)
+        self.assertEqual(row["phone"], "+255712345678")
+        self.assertEqual(row["full_name"], "Guest 0")
+
+    def test_bookings_jsonl(self):
+        Booking.objects.filter(property=self.props[1]).update(status="confirmed")
+        response, body = self.export("/admin/export/bookings/?status=pending&format=jsonl")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual({r["status"] for r in rows}, {"pending"})
+        self.assertNotIn(self.props[1].pk, [r["property_id"] for r in rows])
+        self.assertEqual(rows[0]["preferred_date"], "2026-01-01")
+
+
+class AdminPropertyListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Odd i rent, i % 3 == 0 featured, location "List Area <i % 3>", price 1000 + i.
+        cls.props = seed(6, prefix="List")
+        cls.staff = User.objects.create_superuser("lister", "lister@example.com", "lister-pass-123")
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def listed(self, query: str = "") -> set[int]:
+        response = self.client.get(f"/admin/properties/{query}")
+        self.assertEqual(response.status_code, 200)
+        return {p.pk for p in response.context["properties"]}
+
+    def pks(self, *indexes) -> set[int]:
+        return {self.props[i].pk for i in indexes}
+
+    def test_filters(self):
+        self.assertEqual(self.listed("?type=rent"), self.pks(1, 3, 5))
+        self.assertEqual(self.listed("?featured=1"), self.pks(0, 3))
+        self.assertEqual(self.listed("?type=rent&featured=1"), self.pks(3))
+        self.assertEqual(self.listed(f"?location={self.props[1].location_id}"), self.pks(1, 4))
+        self.assertEqual(self.listed("?published=0"), set())
+        self.assertEqual(self.listed("?status=available&property_type=house"), self.pks(*range(6)))
+        # Unknown values are ignored rather than emptying the list.
+        self.assertEqual(self.listed("?location=nope&featured=maybe&type=lease"), self.pks(*range(6)))
+
+    def test_search(self):
+        Property.objects.filter(pk=self.props[2].pk).update(title="Oyster Bay penthouse")
+        self.assertEqual(self.listed("?search=oyster"), self.pks(2))
+        self.assertEqual(self.listed("?search=%22Area+1%22&type=sale"), self.pks(4))
+        # The exports filter through the same function.
+        properties, active = filter_properties({"search": " oyster "})
+        self.assertEqual(active["search"], "oyster")
+        self.assertEqual({p.pk for p in properties}, self.pks(2))
+
+    @override_settings(PROPERTY_SEARCH_BACKEND="properties.search.IContainsSearchBackend")
+    def test_search_without_the_full_text_index(self):
+        self.assertEqual(self.listed("?search=%22Area+1%22"), self.pks(1, 4))
+        self.assertEqual(self.listed("?search=villa+5"), self.pks(5))
+
+    @mock.patch("config.admin_views.ADMIN_PAGE_SIZE", 4)
+    def test_keyset_pages(self):
+        first = self.client.get("/admin/properties/?sort=price")
+        self.assertEqual([p.pk for p in first.context["properties"]], [p.pk for p in self.props[:4]])
+        self.assertIsNone(first.context["previous_url"])
+
+        second = self.client.get(first.context["next_url"])
+        self.assertEqual([p.pk for p in second.context["properties"]], [p.pk for p in self.props[4:]])
+        self.assertIsNone(second.context["next_url"])
+        self.assertIn("sort=price", second.context["previous_url"])
+
+        back = self.client.get(second.context["previous_url"])
+        self.assertEqual([p.pk for p in back.context["properties"]], [p.pk for p in self.props[:4]])
+        # A cursor that does not decode starts from the top.
+        broken = self.client.get("/admin/properties/?sort=price&cursor=garbage")
+        self.assertEqual([p.pk for p in broken.context["properties"]], [p.pk for p in self.props[:4]])
+
+
+class NoNPlusOneTests(TestCase):
+    """List pages must not issue per-row queries."""
+
+    maxDiff = None
+
+    LIST_URLS = (
+        ("/api/properties/", False),
+        ("/api/properties/?pagination=cursor", False),
+        ("/api/locations/", False),
+        ("/api/bookings/", True),
+        ("/admin/", True),
+        ("/admin/properties/", True),
+        ("/admin/locations/", True),
+        ("/admin/bookings/", True),
+        ("/admin/inquiries/", True),
+        ("/django-admin/properties/property/", True),
+        ("/django-admin/locations/location/", True),
+        ("/django-admin/bookings/booking/", True),
+        ("/django-admin/inquiries/inquiry/", True),
+    )
+
+    def _counts(self, staff):
+        counts = {}
+        for url, needs_login in self.LIST_URLS:
+            cache.clear()
+            if needs_login:
+                self.client.force_login(staff)
+            else:
+                self.client.logout()
+            response = self.client.get(url)
+            self.assertLess(response.status_code, 400, url)
+            counts[url] = response.wsgi_request.query_count
+        return counts
+
+    def test_query_count_is_independent_of_row_count(self):
+        staff = User.objects.create_superuser("nplus", "nplus@example.com", "nplus-pass-123")
+        seed(2, prefix="Small")
+        small = self._counts(staff)
+        seed(10, prefix="Large")
+        large = self._counts(staff)
+        self.assertEqual(small, large)
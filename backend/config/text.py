@@ -0,0 +1,14 @@
+"""
+Text normalization shared by the in-memory lookup indexes.
+"""
+import re
+import unicodedata
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def fold(value) -> str:
+    """Case- and accent-folded form for matching ("Café  Déjà" -> "cafe deja")."""
+    decomposed = unicodedata.normalize("NFKD", str(value or ""))
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _SPACE_RE.sub(" ", stripped.casefold()).strip()
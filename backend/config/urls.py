@@ -2,6 +2,7 @@
 URL configuration for config project.
 Lora Admin: /admin/  Login: lora / lora@25
 """
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth import views as auth_views
 from django.http import JsonResponse
@@ -15,6 +16,7 @@ from config.admin_views import (
     booking_update_status,
     bookings_list,
     dashboard,
+    export_records,
     inquiry_delete,
     inquiries_list,
     location_delete,
@@ -27,13 +29,14 @@ from config.admin_views import (
     property_list,
     property_toggle_status,
 )
+from config.query_budget import query_budget
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 from bookings.views import BookingViewSet
 from inquiries.views import InquiryViewSet
 from locations.views import LocationViewSet
-from properties.views import PropertyViewSet
+from properties.views import PropertyViewSet, SuggestView, local_media
 
 # Unregister default admin models we don't need
 from django.contrib.auth.models import Group, User
@@ -47,6 +50,7 @@ admin.site.index_title = "Dashboard"
 admin.site.site_url = "/"
 
 
+@query_budget(0)
 def health(request):
     return JsonResponse({"status": "ok", "admin": "/admin/", "api": "/api/"})
 
@@ -76,6 +80,7 @@ lora_admin_urls = ([
     path("bookings/<int:pk>/", booking_detail, name="booking_detail"),
     path("inquiries/", inquiries_list, name="inquiries"),
     path("inquiries/<int:pk>/delete/", inquiry_delete, name="inquiry_delete"),
+    path("export/<slug:kind>/", export_records, name="export"),
 ], "lora_admin")
 
 urlpatterns = [
@@ -89,7 +94,11 @@ urlpatterns = [
             path("", include(lora_admin_urls)),
         ]),
     ),
+    path("api/suggest/", SuggestView.as_view(), name="suggest"),
     path("api/", include(router.urls)),
     path("api/auth/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/auth/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
 ]
+
+if settings.MEDIA_BACKEND == "local":
+    urlpatterns.append(path(f"{settings.MEDIA_URL.strip('/')}/<path:path>", local_media, name="local_media"))
@@ -6,6 +6,7 @@ from .models import Inquiry
 @admin.register(Inquiry)
 class InquiryAdmin(admin.ModelAdmin):
     list_display = ("id", "property", "full_name", "email", "phone", "created_at")
+    list_select_related = ("property",)
     list_filter = ("created_at",)
     search_fields = ("full_name", "email", "phone", "message", "property__title")
     ordering = ("-created_at",)
@@ -9,3 +9,4 @@ class InquiryViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
     queryset = Inquiry.objects.select_related("property").all()
     serializer_class = InquiryCreateSerializer
     permission_classes = (AllowAny,)
+    query_budget = {"create": 4}
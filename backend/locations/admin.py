@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import Count
 
 from .models import Location
 
@@ -11,7 +12,9 @@ class LocationAdmin(admin.ModelAdmin):
     ordering = ("city", "name")
     list_per_page = 25
 
-    def properties_count(self, obj):
-        return obj.properties.count()
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(properties_count=Count("properties"))
 
-    properties_count.short_description = "Properties"
+    @admin.display(description="Properties", ordering="properties_count")
+    def properties_count(self, obj):
+        return obj.properties_count
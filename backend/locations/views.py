@@ -1,12 +1,18 @@
 from rest_framework import mixins, viewsets
 from rest_framework.permissions import AllowAny
 
+from config.conditional import ConditionalGetMixin
+
 from .models import Location
 from .serializers import LocationSerializer
 
 
-class LocationViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+class LocationViewSet(ConditionalGetMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
     queryset = Location.objects.all()
     serializer_class = LocationSerializer
     permission_classes = (AllowAny,)
     pagination_class = None  # Return all locations for filter dropdowns
+    query_budget = {"list": 3}
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
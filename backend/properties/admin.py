@@ -1,10 +1,13 @@
 from django import forms
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.db import transaction
+from django.utils import timezone
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 
-from .models import Property, PropertyImage
-from .services import upload_property_media
+from .cache import bump_catalog_version
+from .models import MediaAsset, MediaDeletion, MediaJob, Property, PropertyImage
+from .services import save_property_media
 
 
 class PropertyImageInlineForm(forms.ModelForm):
@@ -68,8 +71,8 @@ class PropertyAdmin(admin.ModelAdmin):
     form = PropertyAdminForm
     inlines = (PropertyImageInline,)
 
-    list_display = ("thumbnail", "title", "listing_type", "property_type", "price_display", "location", "featured", "published", "created_at")
-    list_filter = ("listing_type", "property_type", "featured", "published", "location__city")
+    list_display = ("thumbnail", "title", "listing_type", "property_type", "price_display", "location", "featured", "published", "media_status", "created_at")
+    list_filter = ("listing_type", "property_type", "featured", "published", "media_status", "location__city")
     list_editable = ("featured", "published")
     search_fields = ("title", "location__name", "location__city")
     ordering = ("-created_at",)
@@ -82,12 +85,12 @@ class PropertyAdmin(admin.ModelAdmin):
         ("2. Basic", {"fields": ("title", "description")}),
         ("3. Price & location", {"fields": ("price", "currency", "location")}),
         ("4. Details", {"fields": ("bedrooms", "bathrooms", "area_size")}),
-        ("5. Images & video", {"fields": ("main_image", "video_url", "main_image_upload", "gallery_uploads", "video_upload")}),
+        ("5. Images & video", {"fields": ("main_image", "video_url", "media_status", "main_image_upload", "gallery_uploads", "video_upload")}),
         ("6. Contact", {"fields": ("contact_phone", "contact_whatsapp")}),
         ("7. Visibility", {"fields": ("featured", "published", "availability")}),
     )
 
-    readonly_fields = ("main_image", "video_url")
+    readonly_fields = ("main_image", "video_url", "media_status")
 
     def price_display(self, obj: Property):
         return f"{obj.currency} {obj.price:,.0f}" if obj.price else "-"
@@ -104,25 +107,37 @@ class PropertyAdmin(admin.ModelAdmin):
 
     @admin.action(description=_("Publish selected"))
     def make_published(self, request, queryset):
-        updated = queryset.update(published=True)
+        updated = queryset.update(published=True, updated_at=timezone.now())
+        # queryset.update() skips auto_now and post_save: set updated_at (the
+        # API's ETag / Last-Modified) and bump the catalog version on commit.
+        transaction.on_commit(bump_catalog_version)
         self.message_user(request, _("%(count)d property(ies) published.") % {"count": updated})
 
     @admin.action(description=_("Unpublish selected"))
     def make_unpublished(self, request, queryset):
-        updated = queryset.update(published=False)
+        updated = queryset.update(published=False, updated_at=timezone.now())
+        transaction.on_commit(bump_catalog_version)
         self.message_user(request, _("%(count)d property(ies) unpublished.") % {"count": updated})
 
     @admin.action(description=_("Feature selected"))
     def make_featured(self, request, queryset):
-        updated = queryset.update(featured=True)
+        updated = queryset.update(featured=True, updated_at=timezone.now())
+        transaction.on_commit(bump_catalog_version)
         self.message_user(request, _("%(count)d property(ies) featured.") % {"count": updated})
 
     @admin.action(description=_("Remove from featured"))
     def make_unfeatured(self, request, queryset):
-        updated = queryset.update(featured=False)
+        updated = queryset.update(featured=False, updated_at=timezone.now())
+        transaction.on_commit(bump_catalog_version)
         self.message_user(request, _("%(count)d property(ies) removed from featured.") % {"count": updated})
 
     def save_model(self, request, obj: Property, form: PropertyAdminForm, change: bool):
+        """
+        The admin saves inside transaction.atomic(); upload_property_media's
+        worker threads use their own connections, which would wait on that
+        open write transaction (SQLite: "database is locked"). So the media is
+        saved once the admin's transaction has committed.
+        """
         super().save_model(request, obj, form, change)
 
         main_image_file = form.cleaned_data.get("main_image_upload")
@@ -133,11 +148,56 @@ class PropertyAdmin(admin.ModelAdmin):
         if "gallery_uploads" not in request.FILES and "gallery_uploads" not in request.POST:
             gallery_files = None
 
-        upload_property_media(
-            obj,
-            main_image_file=main_image_file,
-            gallery_files=gallery_files,
-            video_file=video_file,
-        )
-
-
+        if main_image_file or gallery_files is not None or video_file:
+            transaction.on_commit(
+                lambda: self._save_media(
+                    request, obj, main_image_file=main_image_file, gallery_files=gallery_files, video_file=video_file
+                )
+            )
+
+    def _save_media(self, request, obj: Property, **files):
+        try:
+            result = save_property_media(obj, **files)
+        except ValueError as e:
+            self.message_user(
+                request, _("Property saved, but media upload failed: %(error)s") % {"error": e}, level=messages.WARNING
+            )
+            return
+        if result.queued:
+            self.message_user(request, _("Media is uploading in the background."), level=messages.INFO)
+        if not result.ok:
+            self.message_user(
+                request,
+                _("Some media failed to upload: %(errors)s") % {"errors": result.error_message()},
+                level=messages.WARNING,
+            )
+
+
+@admin.register(MediaJob)
+class MediaJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "status", "property", "attempts", "run_after", "last_error", "updated_at")
+    list_filter = ("status",)
+    list_select_related = ("property",)
+    ordering = ("-id",)
+    list_per_page = 50
+    readonly_fields = ("kind", "property", "payload", "attempts", "locked_at", "last_error", "created_at", "updated_at")
+
+
+@admin.register(MediaAsset)
+class MediaAssetAdmin(admin.ModelAdmin):
+    list_display = ("public_id", "resource_type", "ref_count", "bytes", "sha256", "created_at")
+    list_filter = ("resource_type",)
+    search_fields = ("public_id", "sha256")
+    ordering = ("-id",)
+    list_per_page = 50
+    readonly_fields = ("sha256", "resource_type", "public_id", "secure_url", "bytes", "width", "height", "placeholder", "created_at")
+
+
+@admin.register(MediaDeletion)
+class MediaDeletionAdmin(admin.ModelAdmin):
+    list_display = ("public_id", "resource_type", "status", "attempts", "run_after", "last_error", "created_at")
+    list_filter = ("status", "resource_type")
+    search_fields = ("public_id",)
+    ordering = ("-id",)
+    list_per_page = 50
+    readonly_fields = ("public_id", "resource_type", "attempts", "locked_at", "last_error", "created_at")
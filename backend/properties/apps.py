@@ -1,4 +1,18 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def _ensure_search_index(sender, using="default", **kwargs):
+    from django.db import connections
+    from django.db.migrations.recorder import MigrationRecorder
+
+    from .search import install_search_index
+
+    connection = connections[using]
+    applied = MigrationRecorder(connection).applied_migrations()
+    # SQLite drops table triggers when a migration rebuilds the table.
+    if ("properties", "0007_property_search_index") in applied:
+        install_search_index(connection)
 
 
 class PropertiesConfig(AppConfig):
@@ -6,3 +20,5 @@ class PropertiesConfig(AppConfig):
 
     def ready(self):
         from . import signals  # noqa: F401
+
+        post_migrate.connect(_ensure_search_index, sender=self)
@@ -0,0 +1,124 @@
+"""
+Content-addressed media asset registry (MediaAsset).
+
+upload_property_media hashes every incoming file (sha256, streamed in
+chunks) before optimizing or uploading it; a file whose hash is registered
+reuses that Cloudinary asset and is not uploaded again. Newly uploaded files
+are registered afterwards.
+
+Each stored reference (Property.main_image_public_id / video_public_id,
+PropertyImage.public_id) counts: attach_property_media acquires references
+and destroy_media_assets releases them, so an asset shared by several
+listings is only destroyed when the last one lets go. A reused asset is
+locked (lock_assets) until its reference is acquired, so a concurrent
+release cannot destroy it in between. Direct uploads are registered by
+direct_upload.register_uploaded_assets under a key derived from their
+public_id (there are no bytes to hash). Assets uploaded before the registry existed are not registered
+and are destroyed as before.
+"""
+from __future__ import annotations
+
+import hashlib
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import MediaAsset
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(f) -> str:
+    """sha256 of a file's contents, read in chunks; leaves the file at position 0."""
+    digest = hashlib.sha256()
+    if hasattr(f, "chunks"):
+        for chunk in f.chunks(HASH_CHUNK_SIZE):  # File.chunks() starts from 0
+            digest.update(chunk)
+    else:
+        f.seek(0)
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    f.seek(0)
+    return digest.hexdigest()
+
+
+def find_assets(keys) -> dict[tuple[str, str], MediaAsset]:
+    """Registered assets for ``[(sha256, resource_type), ...]``, keyed the same way."""
+    keys = set(keys)
+    if not keys:
+        return {}
+    rows = MediaAsset.objects.filter(sha256__in={sha for sha, _ in keys})
+    return {(a.sha256, a.resource_type): a for a in rows if (a.sha256, a.resource_type) in keys}
+
+
+def register_asset(sha256: str, resource_type: str, response: dict) -> MediaAsset:
+    """
+    Record a fresh upload. If the same content was registered concurrently,
+    the existing asset is returned (compare its public_id to the response's).
+    """
+    try:
+        with transaction.atomic():
+            return MediaAsset.objects.create(
+                sha256=sha256,
+                resource_type=resource_type,
+                public_id=response.get("public_id", ""),
+                secure_url=response.get("secure_url", ""),
+                bytes=response.get("bytes") or 0,
+                width=response.get("width"),
+                height=response.get("height"),
+                placeholder=response.get("placeholder", ""),
+            )
+    except IntegrityError:
+        return MediaAsset.objects.get(sha256=sha256, resource_type=resource_type)
+
+
+def acquire(public_ids) -> None:
+    """Count one more reference per occurrence of each registered public_id."""
+    by_count: dict[int, list[str]] = {}
+    for public_id, n in Counter(p for p in public_ids if p).items():
+        by_count.setdefault(n, []).append(public_id)
+    for n, ids in by_count.items():
+        MediaAsset.objects.filter(public_id__in=ids).update(ref_count=F("ref_count") + n)
+
+
+def lock_assets(public_ids) -> set[str]:
+    """
+    Lock the registered assets among ``public_ids`` (select_for_update) and
+    return those that are no longer registered. Call inside a transaction.
+    """
+    ids = {p for p in public_ids if p}
+    if not ids:
+        return set()
+    found = MediaAsset.objects.select_for_update().filter(public_id__in=ids).order_by("pk")
+    return ids - set(found.values_list("public_id", flat=True))
+
+
+def release(assets) -> list[tuple[str, str]]:
+    """
+    Drop one reference per occurrence of ``[(public_id, resource_type), ...]``
+    and return the assets nothing refers to any more (unregistered ones
+    included), which the caller should destroy. Call inside a transaction.
+    """
+    counts = Counter(a for a in assets if a[0])
+    if not counts:
+        return []
+    registered = {
+        a.public_id: a
+        for a in MediaAsset.objects.select_for_update().filter(public_id__in={p for p, _ in counts})
+    }
+    orphaned, gone, by_count = [], [], {}
+    for (public_id, resource_type), n in counts.items():
+        asset = registered.get(public_id)
+        if asset is None:
+            orphaned.append((public_id, resource_type))
+        elif asset.ref_count > n:
+            by_count.setdefault(n, []).append(asset.pk)
+        else:
+            gone.append(asset.pk)
+            orphaned.append((public_id, resource_type))
+    for n, pks in by_count.items():
+        MediaAsset.objects.filter(pk__in=pks).update(ref_count=F("ref_count") - n)
+    if gone:
+        MediaAsset.objects.filter(pk__in=gone).delete()
+    return orphaned
@@ -0,0 +1,306 @@
+"""
+Media storage backends.
+
+Everything that stores, deletes or links to media files goes through the
+backend selected by settings.MEDIA_BACKEND: "cloudinary" (default), "local",
+or a dotted path to a MediaBackend subclass (e.g. properties.bench.FakeMediaBackend).
+
+Responses from upload()/upload_large() are shaped like Cloudinary upload
+responses (secure_url, public_id, resource_type, bytes), which is what
+attach_property_media and the asset registry store.
+
+LocalMediaBackend writes under MEDIA_ROOT and is served by the
+``local_media`` view (FileResponse, so the server can sendfile it), which
+also renders width variants on first request. It makes upload, delete and
+variant timings measurable on one machine without Cloudinary.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import time
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import cloudinary
+import cloudinary.api
+import cloudinary.uploader
+import cloudinary.utils
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .models import UploadSession
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - Pillow not installed
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+CLOUDINARY_UPLOAD_SEGMENT = "/image/upload/"
+
+
+class MediaBackend(ABC):
+    """Interface (and defaults) for media storage."""
+
+    not_configured_message = "Media backend is not configured."
+
+    def is_configured(self) -> bool:
+        return True
+
+    @abstractmethod
+    def upload(self, file, *, resource_type: str, folder: str) -> dict:
+        """Store ``file``; returns a Cloudinary-shaped upload response."""
+
+    def upload_large(self, file, *, resource_type: str, folder: str, key: str = "") -> dict:
+        """Upload a large file; ``key`` names a resumable attempt where supported."""
+        return self.upload(file, resource_type=resource_type, folder=folder)
+
+    @abstractmethod
+    def destroy(self, public_id: str, resource_type: str) -> None:
+        """Delete one asset; one that is already gone is not an error."""
+
+    def bulk_destroy(self, public_ids: list[str], resource_type: str) -> set[str]:
+        """Delete several assets; returns the public_ids confirmed gone."""
+        gone = set()
+        for public_id in public_ids:
+            try:
+                self.destroy(public_id, resource_type)
+            except Exception as e:
+                logger.warning("Delete of %s failed: %s", public_id, e)
+                continue
+            gone.add(public_id)
+        return gone
+
+    def variant_url(self, url: str, public_id: str, width: int) -> str:
+        """URL of the image resized to ``width`` px (never upscaled); "" when unavailable."""
+        return cloudinary_variant_url(url, width)
+
+
+def _file_size(f) -> int:
+    size = getattr(f, "size", None)
+    if size is None:
+        pos = f.tell()
+        size = f.seek(0, os.SEEK_END)
+        f.seek(pos)
+    return size
+
+
+def cloudinary_variant_url(url: str, width: int) -> str:
+    """Insert c_limit,w_<width>,f_auto,q_auto into a stored Cloudinary secure_url."""
+    if CLOUDINARY_UPLOAD_SEGMENT in url and "res.cloudinary.com" in url:
+        head, tail = url.split(CLOUDINARY_UPLOAD_SEGMENT, 1)
+        return f"{head}{CLOUDINARY_UPLOAD_SEGMENT}c_limit,w_{width},f_auto,q_auto/{tail}"
+    return ""
+
+
+def chunked_upload(file, *, resource_type: str, folder: str, part_uploader, key: str = "") -> dict:
+    """
+    Upload ``file`` in fixed MEDIA_UPLOAD_CHUNK_SIZE chunks (Cloudinary's
+    chunked upload: Content-Range + X-Unique-Upload-Id), reading one chunk at a
+    time. Progress is kept in an UploadSession: a failed chunk is retried
+    (MEDIA_CHUNK_RETRIES) from the last confirmed byte, and calling again with
+    the same ``key`` resumes an earlier attempt (or returns its result if it
+    had finished) instead of starting over.
+    """
+    total = _file_size(file)
+    name = os.path.basename(getattr(file, "name", "") or "upload")
+
+    session = UploadSession.objects.filter(key=key).first() if key else None
+    if session is not None and session.total_size != total:
+        session.delete()
+        session = None
+    if session is None:
+        session = UploadSession.objects.create(
+            key=key or uuid.uuid4().hex,
+            upload_id=uuid.uuid4().hex,
+            resource_type=resource_type,
+            folder=folder,
+            filename=name,
+            total_size=total,
+            chunk_size=settings.MEDIA_UPLOAD_CHUNK_SIZE,
+        )
+    elif session.status == UploadSession.Status.COMPLETE:
+        return session.response
+
+    failures = 0
+    while True:
+        file.seek(session.offset)
+        chunk = file.read(session.chunk_size)
+        end = session.offset + len(chunk) - 1
+        options = {"resource_type": resource_type, "folder": folder}
+        if session.public_id:
+            options["public_id"] = session.public_id
+        try:
+            response = part_uploader(
+                (name, chunk),
+                http_headers={
+                    "Content-Range": f"bytes {session.offset}-{end}/{total}",
+                    "X-Unique-Upload-Id": session.upload_id,
+                },
+                **options,
+            )
+        except Exception as e:
+            failures += 1
+            session.last_error = str(e) or e.__class__.__name__
+            session.save(update_fields=["last_error", "updated_at"])
+            if failures > settings.MEDIA_CHUNK_RETRIES:
+                if not key:
+                    session.delete()  # Nothing can resume it.
+                raise
+            logger.warning("Chunk %s-%s of %s failed (%s), retrying", session.offset, end, name, e)
+            time.sleep(min(2 ** (failures - 1), 30))
+            continue
+
+        failures = 0
+        session.offset = end + 1
+        session.public_id = session.public_id or response.get("public_id", "")
+        session.last_error = ""
+        if session.offset >= total:
+            if not key:
+                session.delete()  # Nothing can resume it; keyed sessions are kept for retries.
+                return response
+            session.status = UploadSession.Status.COMPLETE
+            session.response = response
+            session.save(update_fields=["offset", "public_id", "last_error", "status", "response", "updated_at"])
+            return response
+        session.save(update_fields=["offset", "public_id", "last_error", "updated_at"])
+
+
+class CloudinaryBackend(MediaBackend):
+    not_configured_message = (
+        "Cloudinary not configured. Set CLOUDINARY_URL or CLOUDINARY_CLOUD_NAME, API_KEY, API_SECRET."
+    )
+
+    def is_configured(self) -> bool:
+        config = cloudinary.config()
+        return bool(config.cloud_name and config.api_key and config.api_secret)
+
+    def upload(self, file, *, resource_type: str, folder: str) -> dict:
+        return cloudinary.uploader.upload(file, resource_type=resource_type, folder=folder)
+
+    def upload_large(self, file, *, resource_type: str, folder: str, key: str = "") -> dict:
+        return chunked_upload(
+            file, resource_type=resource_type, folder=folder, part_uploader=self.upload_large_part, key=key
+        )
+
+    def upload_large_part(self, file, http_headers=None, **options) -> dict:
+        return cloudinary.uploader.upload_large_part(file, http_headers=http_headers, **options)
+
+    def destroy(self, public_id: str, resource_type: str) -> None:
+        cloudinary.uploader.destroy(public_id, resource_type=resource_type, invalidate=True)
+
+    def bulk_destroy(self, public_ids: list[str], resource_type: str) -> set[str]:
+        # delete_resources takes up to 100 public_ids per call (outbox.BULK_DELETE_LIMIT).
+        response = cloudinary.api.delete_resources(public_ids, resource_type=resource_type, invalidate=True)
+        deleted = response.get("deleted", {}) or {}
+        return {public_id for public_id, state in deleted.items() if state in ("deleted", "not_found")}
+
+    def variant_url(self, url: str, public_id: str, width: int) -> str:
+        # The stored secure_url keeps its version, so replaced assets are never
+        # served stale from the CDN; build from public_id only without one.
+        rewritten = cloudinary_variant_url(url, width)
+        if rewritten or not (public_id and cloudinary.config().cloud_name):
+            return rewritten
+        built, _ = cloudinary.utils.cloudinary_url(
+            public_id, width=width, crop="limit", fetch_format="auto", quality="auto", secure=True
+        )
+        return built
+
+
+class LocalMediaBackend(MediaBackend):
+    """Files under MEDIA_ROOT/<public_id>.<ext>, served at MEDIA_BASE_URL + MEDIA_URL."""
+
+    @property
+    def root(self) -> Path:
+        return Path(settings.MEDIA_ROOT)
+
+    @property
+    def base_url(self) -> str:
+        return settings.MEDIA_BASE_URL.rstrip("/") + settings.MEDIA_URL
+
+    def _path(self, public_id: str) -> Path | None:
+        matches = sorted(self.root.glob(f"{public_id}.*"))
+        return matches[0] if matches else None
+
+    def upload(self, file, *, resource_type: str, folder: str) -> dict:
+        ext = Path(getattr(file, "name", "") or "").suffix.lower() or (".mp4" if resource_type == "video" else ".jpg")
+        public_id = f"{folder}/{uuid.uuid4().hex[:20]}"
+        path = self.root / f"{public_id}{ext}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        file.seek(0)
+        with open(path, "wb") as out:
+            if hasattr(file, "chunks"):
+                for chunk in file.chunks():
+                    out.write(chunk)
+            else:
+                shutil.copyfileobj(file, out, 1024 * 1024)
+        file.seek(0)
+        return {
+            "public_id": public_id,
+            "secure_url": f"{self.base_url}{public_id}{ext}",
+            "resource_type": resource_type,
+            "format": ext.lstrip("."),
+            "bytes": path.stat().st_size,
+        }
+
+    def destroy(self, public_id: str, resource_type: str) -> None:
+        path = self._path(public_id)
+        if path is None:
+            return  # already gone, like Cloudinary's not_found
+        relative = path.relative_to(self.root)
+        path.unlink(missing_ok=True)
+        for variant in self.root.glob(f"{LOCAL_VARIANT_DIR}/*/{relative}"):
+            variant.unlink(missing_ok=True)
+
+    def variant_url(self, url: str, public_id: str, width: int) -> str:
+        if url.startswith(self.base_url):
+            return f"{url}?w={width}"
+        return cloudinary_variant_url(url, width)
+
+
+# Rendered width variants live in MEDIA_ROOT/<LOCAL_VARIANT_DIR>/w<width>/.
+LOCAL_VARIANT_DIR = ".variants"
+
+
+def render_local_variant(source: str, width: int) -> str:
+    """
+    Path of ``source`` fit within ``width`` px (rendered once; the original
+    without Pillow). ValueError if ``source`` is not a readable image.
+    """
+    if Image is None:
+        return source
+    root = Path(settings.MEDIA_ROOT)
+    target = root / LOCAL_VARIANT_DIR / f"w{width}" / Path(source).relative_to(root)
+    if not target.exists():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{uuid.uuid4().hex}{target.suffix}")
+        try:
+            with Image.open(source) as img:
+                fmt = img.format
+                img = ImageOps.exif_transpose(img)
+                img.thumbnail((width, width * 10))
+                img.save(tmp, format=fmt)
+        except (OSError, ValueError, Image.DecompressionBombError) as e:  # UnidentifiedImageError is an OSError
+            tmp.unlink(missing_ok=True)
+            raise ValueError(f"Cannot render {source}: {e}") from e
+        os.replace(tmp, target)  # concurrent renders of one variant are harmless
+    return str(target)
+
+
+BACKENDS = {"cloudinary": CloudinaryBackend, "local": LocalMediaBackend}
+
+_backend: tuple[str, MediaBackend] | None = None
+
+
+def get_media_backend() -> MediaBackend:
+    """The backend named by settings.MEDIA_BACKEND (instantiated once per setting value)."""
+    global _backend
+    name = getattr(settings, "MEDIA_BACKEND", "") or "cloudinary"
+    if _backend is None or _backend[0] != name:
+        backend_class = BACKENDS.get(name) or import_string(name)
+        _backend = (name, backend_class())
+    return _backend[1]
@@ -0,0 +1,170 @@
+"""
+Helpers shared by the benchmark management commands (bench_*).
+
+Benchmarks seed throwaway rows inside a transaction that is rolled back at
+the end, so they can be pointed at a development copy of the database.
+"""
+from __future__ import annotations
+
+import contextlib
+import random
+import re
+import statistics
+import threading
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+from locations.models import Location
+
+from .backends import CloudinaryBackend
+from .models import Property
+
+
+class Rollback(Exception):
+    """Raised at the end of a benchmark to roll back everything it created."""
+
+
+@contextlib.contextmanager
+def explicit_timestamps(*models):
+    """Let bulk_create keep the created_at values we set (skip auto_now_add)."""
+    fields = [m._meta.get_field("created_at") for m in models]
+    saved = [f.auto_now_add for f in fields]
+    for f in fields:
+        f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, value in zip(fields, saved):
+            f.auto_now_add = value
+
+
+def seed_catalog(properties: int, locations: int = 200, seed: int = 1, batch_size: int = 2000) -> None:
+    """Bulk-create ``locations`` locations and ``properties`` properties."""
+    rng = random.Random(seed)
+    now = timezone.now()
+
+    Location.objects.bulk_create(
+        [Location(name=f"Bench Area {i}", city=f"Bench City {i % 12}") for i in range(locations)],
+        batch_size=batch_size,
+    )
+    location_ids = list(Location.objects.filter(name__startswith="Bench Area ").values_list("id", flat=True))
+
+    property_types = [c for c, _ in Property.PropertyType.choices]
+    availabilities = [c for c, _ in Property.Availability.choices]
+    with explicit_timestamps(Property):
+        batch = []
+        for i in range(properties):
+            listing_type = "rent" if rng.random() < 0.6 else "sale"
+            currency = "USD" if rng.random() < 0.3 else "TZS"
+            base = 500 if currency == "USD" else 1_000_000
+            if listing_type == "sale":
+                base *= 150
+            batch.append(
+                Property(
+                    title=f"Bench property {i}",
+                    description="Spacious listing with parking and garden.",
+                    property_type=rng.choice(property_types),
+                    listing_type=listing_type,
+                    price=Decimal(int(base * rng.lognormvariate(0, 0.6))),
+                    currency=currency,
+                    location_id=rng.choice(location_ids),
+                    bedrooms=rng.randint(1, 6),
+                    bathrooms=rng.randint(1, 4),
+                    featured=rng.random() < 0.05,
+                    published=rng.random() < 0.9,
+                    availability=rng.choice(availabilities),
+                    created_at=now - timedelta(minutes=rng.randint(0, 60 * 24 * 730)),
+                )
+            )
+            if len(batch) >= batch_size:
+                Property.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Property.objects.bulk_create(batch)
+
+
+class FakeMediaBackend(CloudinaryBackend):
+    """
+    Offline stand-in for the Cloudinary backend: upload() reads the file, sleeps
+    ``latency`` seconds (+/- ``jitter``) and returns a Cloudinary-shaped response;
+    large videos go through the real chunked_upload with simulated parts.
+    Every ``fail_every``-th call raises, to exercise partial-failure handling.
+    Deletes always succeed. Select it with MEDIA_BACKEND=properties.bench.FakeMediaBackend.
+    """
+
+    def __init__(self, latency: float = 0.25, jitter: float = 0.05, fail_every: int = 0, seed: int = 1):
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_every = fail_every
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def is_configured(self) -> bool:
+        return True
+
+    def upload(self, file, *, resource_type="image", folder=""):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+        size = len(file.read()) if hasattr(file, "read") else 0
+        time.sleep(delay)
+        if self.fail_every and call % self.fail_every == 0:
+            raise RuntimeError("Simulated upload failure")
+        return self._response(resource_type, folder, size)
+
+    def upload_large_part(self, file, http_headers=None, resource_type="image", folder="", public_id=None, **options):
+        """Chunk upload (file is (name, bytes)); the final chunk returns the full response."""
+        _, chunk = file
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        time.sleep(self.latency * len(chunk) / (6 * 1024 * 1024))
+        if self.fail_every and call % self.fail_every == 0:
+            raise RuntimeError("Simulated chunk failure")
+        start_end, total = http_headers["Content-Range"].split(" ")[1].split("/")
+        response = self._response(resource_type, folder, int(total), public_id)
+        response["done"] = int(start_end.split("-")[1]) + 1 >= int(total)
+        return response
+
+    def destroy(self, public_id, resource_type):
+        pass
+
+    def bulk_destroy(self, public_ids, resource_type):
+        return set(public_ids)
+
+    @staticmethod
+    def _response(resource_type, folder, size, public_id=None):
+        public_id = public_id or f"{folder}/fake-{uuid.uuid4().hex[:12]}".lstrip("/")
+        return {
+            "public_id": public_id,
+            "secure_url": f"https://res.cloudinary.com/fake/{resource_type}/upload/{public_id}",
+            "resource_type": resource_type,
+            "bytes": size,
+        }
+
+
+def timed(fn, repeat: int = 5) -> float:
+    """Median wall time of ``fn()`` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def plan_summary(queryset) -> str:
+    """One-line summary of the query plan (scans and indexes used)."""
+    # SQLite prefixes each EXPLAIN QUERY PLAN row with "id parent notused".
+    lines = [re.sub(r"^\d+ \d+ \d+ ", "", line.strip()) for line in queryset.explain().splitlines() if line.strip()]
+    keep = [
+        line for line in lines
+        if any(word in line.upper() for word in ("SCAN", "SEARCH", "INDEX", "SORT", "B-TREE"))
+    ]
+    return " | ".join(keep or lines)[:200]
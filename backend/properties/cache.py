@@ -0,0 +1,188 @@
+"""
+Versioned response cache for the public property API.
+
+Every cached response is keyed by the current *catalog version*. Saving or
+deleting a Property, PropertyImage or Location bumps the version (see
+signals.py), which makes every older entry unreachable at once; stale entries
+simply expire through the cache timeout. Works with any Django cache backend,
+so local-memory (per process) and database (shared) caches both work.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+VERSION_KEY = "lora:catalog:version"
+HITS_KEY = "lora:catalog:hits"
+MISSES_KEY = "lora:catalog:misses"
+
+
+def _cache():
+    return caches[getattr(settings, "CATALOG_CACHE_ALIAS", "default")]
+
+
+def _new_epoch() -> int:
+    # Start from a timestamp instead of 1, so a version key that was evicted
+    # (or a restarted local-memory cache) never reuses an old version number.
+    return int(time.time() * 1000)
+
+
+def get_catalog_version() -> int:
+    cache = _cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, _new_epoch(), timeout=None)
+        version = cache.get(VERSION_KEY, 0)
+    return int(version)
+
+
+def bump_catalog_version() -> int:
+    cache = _cache()
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        version = _new_epoch()
+        cache.set(VERSION_KEY, version, timeout=None)
+        return version
+
+
+def _count(key: str) -> None:
+    cache = _cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+def cache_stats() -> dict:
+    cache = _cache()
+    hits = int(cache.get(HITS_KEY) or 0)
+    misses = int(cache.get(MISSES_KEY) or 0)
+    total = hits + misses
+    return {
+        "version": get_catalog_version(),
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 4) if total else None,
+    }
+
+
+def reset_cache_stats() -> None:
+    _cache().delete_many([HITS_KEY, MISSES_KEY])
+
+
+class CatalogLocal:
+    """
+    A per-process value (e.g. an in-memory index) rebuilt lazily when the
+    catalog version moves. The version is read at most every
+    ``check_seconds``, so most calls touch neither the cache nor the database;
+    ``max_age`` bounds staleness when another worker changed the catalog under
+    a local-memory cache (whose version bump this process never sees).
+    """
+
+    def __init__(self, build, check_seconds: float = 2, max_age: float | None = None):
+        self._build = build
+        self._check_seconds = check_seconds
+        self._max_age = max_age
+        self._lock = threading.Lock()
+        self._value = None
+        self._version = None
+        self._built_at = 0.0
+        self._checked_at = 0.0
+
+    def get(self):
+        now = time.monotonic()
+        if self._value is not None and now - self._checked_at < self._check_seconds:
+            return self._value
+        max_age = self._max_age
+        if max_age is None:
+            max_age = getattr(settings, "CATALOG_CACHE_TIMEOUT", 300)
+        with self._lock:
+            version = get_catalog_version()
+            self._checked_at = now
+            if self._value is None or version != self._version or now - self._built_at >= max_age:
+                self._value = self._build()
+                self._version = version
+                self._built_at = now
+            return self._value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._value = None
+
+
+def normalized_query(request) -> str:
+    """Query string with empty values dropped and keys/values sorted."""
+    pairs = sorted(
+        (k, v)
+        for k, values in request.query_params.lists()
+        for v in values
+        if v != ""
+    )
+    return "&".join(f"{k}={v}" for k, v in pairs)
+
+
+def response_cache_key(request, action: str, lookup: str = "") -> str:
+    # Host and scheme are part of the key because paginated responses embed
+    # absolute next/previous links.
+    raw = "|".join(
+        (request.scheme, request.get_host(), action, lookup, normalized_query(request))
+    )
+    digest = hashlib.md5(raw.encode("utf-8")).hexdigest()
+    return f"lora:catalog:{get_catalog_version()}:{digest}"
+
+
+class CatalogCacheMixin:
+    """
+    Cache the serialized output of list/retrieve for anonymous-safe GETs.
+
+    The cached value is ``response.data`` (not rendered bytes), so content
+    negotiation still works and JSON/browsable API responses share entries.
+    """
+
+    cached_actions = ("list", "retrieve")
+
+    def _cache_lookup(self, kwargs) -> str:
+        return str(kwargs.get(self.lookup_url_kwarg or self.lookup_field, ""))
+
+    def cached_for_version(self, request, label: str, compute, **kwargs):
+        """Memoize ``compute()`` for this request's cache key until the next catalog change."""
+        key = response_cache_key(request, f"{label}:{self.action}", self._cache_lookup(kwargs))
+        cache = _cache()
+        value = cache.get(key)
+        if value is None:
+            value = compute()
+            cache.set(key, value, timeout=getattr(settings, "CATALOG_CACHE_TIMEOUT", 300))
+        return value
+
+    def _cached_response(self, handler, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD") or self.action not in self.cached_actions:
+            return handler(request, *args, **kwargs)
+
+        key = response_cache_key(request, self.action, self._cache_lookup(kwargs))
+        cache = _cache()
+        data = cache.get(key)
+        if data is not None:
+            _count(HITS_KEY)
+            response = Response(data)
+            response["X-Cache"] = "HIT"
+            return response
+
+        _count(MISSES_KEY)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            timeout = getattr(settings, "CATALOG_CACHE_TIMEOUT", 300)
+            cache.set(key, response.data, timeout=timeout)
+        response["X-Cache"] = "MISS"
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(super().retrieve, request, *args, **kwargs)
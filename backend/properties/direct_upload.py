@@ -0,0 +1,117 @@
+"""
+Signed direct-to-Cloudinary uploads.
+
+The admin client asks for signed upload parameters for one media slot
+(main/gallery/video), posts the file straight to Cloudinary, then sends the
+upload responses back to be attached. Django never handles the bytes: it
+signs the parameters (folder and allowed formats are part of the signature)
+and, on attach, checks Cloudinary's response signature before recording the
+asset with attach_property_media(). Attached assets are registered in the
+asset registry (assets.py) like uploaded ones, so their references are
+counted; Django never sees the bytes, so the registry key is derived from
+the public_id instead of the content hash.
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+
+import cloudinary
+import cloudinary.utils
+
+from .backends import CloudinaryBackend, get_media_backend
+from .models import MediaAsset
+from .services import MEDIA_FOLDERS
+
+ALLOWED_FORMATS = {"image": ("jpg", "png", "webp"), "video": ("mp4",)}
+
+# Cloudinary accepts a signed request for an hour after its timestamp; assets
+# uploaded longer ago than that cannot be attached either.
+MAX_UPLOAD_AGE = 60 * 60
+
+
+class DirectUploadError(ValueError):
+    pass
+
+
+def _require_config():
+    backend = get_media_backend()
+    if not isinstance(backend, CloudinaryBackend):
+        raise DirectUploadError("Direct uploads need MEDIA_BACKEND=cloudinary.")
+    if not backend.is_configured():
+        raise DirectUploadError(backend.not_configured_message)
+    return cloudinary.config()
+
+
+def signed_upload_params(kind: str) -> dict:
+    """Form fields (and URL) for a browser upload into the folder of ``kind``."""
+    config = _require_config()
+    resource_type, folder = MEDIA_FOLDERS[kind]
+    params = {
+        "timestamp": int(time.time()),
+        "folder": folder,
+        "allowed_formats": ",".join(ALLOWED_FORMATS[resource_type]),
+    }
+    params["signature"] = cloudinary.utils.api_sign_request(
+        params, config.api_secret, config.signature_algorithm or "sha1"
+    )
+    params["api_key"] = config.api_key
+    return {
+        "upload_url": f"https://api.cloudinary.com/v1_1/{config.cloud_name}/{resource_type}/upload",
+        "resource_type": resource_type,
+        "expires_at": params["timestamp"] + MAX_UPLOAD_AGE,
+        "params": params,
+    }
+
+
+def verify_uploaded_asset(kind: str, asset: dict) -> dict:
+    """
+    Check a Cloudinary upload response (public_id, version, signature, format)
+    and return {"secure_url", "public_id"} built from the verified fields, plus
+    the reported width/height (no placeholder: backfill_image_placeholders
+    computes those).
+    """
+    _require_config()
+    resource_type, folder = MEDIA_FOLDERS[kind]
+    public_id, version, fmt = asset["public_id"], int(asset["version"]), asset["format"].lower()
+
+    if not cloudinary.utils.verify_api_response_signature(public_id, version, asset["signature"]):
+        raise DirectUploadError(f"{public_id}: signature does not match.")
+    # The exact folder: lora/properties/gallery/... is not a main image.
+    if public_id.rpartition("/")[0] != folder:
+        raise DirectUploadError(f"{public_id}: not in {folder}/.")
+    if fmt not in ALLOWED_FORMATS[resource_type]:
+        raise DirectUploadError(f"{public_id}: format {fmt} is not allowed.")
+    # version is the upload's Unix time.
+    if time.time() - version > MAX_UPLOAD_AGE:
+        raise DirectUploadError(f"{public_id}: upload is too old to attach.")
+
+    url, _ = cloudinary.utils.cloudinary_url(
+        public_id, resource_type=resource_type, version=version, format=fmt, secure=True
+    )
+    verified = {"secure_url": url, "public_id": public_id}
+    verified.update({key: asset[key] for key in ("width", "height") if asset.get(key)})
+    return verified
+
+
+def register_uploaded_assets(kind: str, verified: list[dict]) -> None:
+    """
+    Add verified direct uploads to the asset registry, so attach_property_media
+    counts their references. One insert for the lot; public_ids registered
+    already (or concurrently) are left alone.
+    """
+    resource_type, _ = MEDIA_FOLDERS[kind]
+    MediaAsset.objects.bulk_create(
+        [
+            MediaAsset(
+                sha256=hashlib.sha256(f"direct:{response['public_id']}".encode("utf-8")).hexdigest(),
+                resource_type=resource_type,
+                public_id=response["public_id"],
+                secure_url=response["secure_url"],
+                width=response.get("width"),
+                height=response.get("height"),
+            )
+            for response in verified
+        ],
+        ignore_conflicts=True,
+    )
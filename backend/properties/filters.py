@@ -1,5 +1,6 @@
 import django_filters
 
+from .location_index import filter_by_location
 from .models import Property
 
 
@@ -29,5 +30,5 @@ class PropertyFilter(django_filters.FilterSet):
         v = (value or "").strip()
         if not v:
             return qs
-        return qs.filter(location__city__icontains=v) | qs.filter(location__name__icontains=v)
+        return filter_by_location(qs, v)
 
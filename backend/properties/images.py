@@ -0,0 +1,41 @@
+"""
+Responsive image variants.
+
+Cloudinary resizes and re-encodes on the fly, so a card that shows a 300px
+thumbnail does not need the full-resolution original. image_variants() maps
+each width in settings.IMAGE_VARIANT_WIDTHS to a delivery URL with
+``c_limit,w_<width>,f_auto,q_auto`` (never upscaled, format and quality
+chosen per browser); build_srcset() turns that into an <img srcset> value.
+
+URLs come from the media backend (backends.py): for Cloudinary the
+transformation is inserted into the stored secure_url (which keeps its
+version, so replaced assets are never served stale from the CDN); the local
+backend serves ``?w=<width>`` renditions. Images hosted elsewhere get no
+variants.
+"""
+from __future__ import annotations
+
+from django.conf import settings
+
+from .backends import get_media_backend
+
+
+def variant_url(url: str, public_id: str, width: int) -> str:
+    return get_media_backend().variant_url(url, public_id, width)
+
+
+def image_variants(url: str, public_id: str = "") -> dict[str, str]:
+    """{"<width>": url} for each configured width; empty when no variants can be built."""
+    if not url and not public_id:
+        return {}
+    variants = {}
+    for width in settings.IMAGE_VARIANT_WIDTHS:
+        built = variant_url(url or "", public_id or "", width)
+        if not built:
+            return {}
+        variants[str(width)] = built
+    return variants
+
+
+def build_srcset(variants: dict[str, str]) -> str:
+    return ", ".join(f"{url} {width}w" for width, url in variants.items())
@@ -0,0 +1,255 @@
+"""
+Database-backed media job queue (settings.MEDIA_ASYNC).
+
+Requests spool uploaded files to settings.MEDIA_SPOOL_DIR and enqueue a
+MediaJob; ``manage.py run_media_worker`` claims jobs one at a time, runs them
+with upload_property_media, and retries failures with exponential backoff
+(files that are not valid images are dropped, not retried; asset deletes go
+through the outbox in outbox.py, which the worker drains). Property.media_status
+is pending while a property has unfinished upload jobs, failed when one gives
+up, and ready otherwise.
+
+The worker must see the same spool directory as the web process (same
+machine/disk, or a shared volume).
+"""
+from __future__ import annotations
+
+import logging
+import os
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import MediaJob, Property, UploadSession
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidMediaError(ValueError):
+    """Every file left in the job is invalid (e.g. not an image): retrying cannot help."""
+
+
+def spool_dir() -> Path:
+    path = Path(settings.MEDIA_SPOOL_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _spool(f) -> dict:
+    name = os.path.basename(getattr(f, "name", "") or "upload")
+    path = spool_dir() / f"{uuid.uuid4().hex}{Path(name).suffix.lower()}"
+    with open(path, "wb") as out:
+        if hasattr(f, "chunks"):
+            for chunk in f.chunks():
+                out.write(chunk)
+        else:
+            out.write(f.read())
+    return {"path": path.name, "name": name}
+
+
+def _spool_entries(payload: dict) -> list[dict]:
+    entries = [payload.get("main"), payload.get("video"), *(payload.get("gallery") or [])]
+    return [e for e in entries if e]
+
+
+def _remove_spooled(entries) -> None:
+    for entry in entries:
+        try:
+            (spool_dir() / entry["path"]).unlink()
+        except FileNotFoundError:
+            pass
+
+
+def enqueue_media_upload(
+    prop: Property,
+    *,
+    main_image_file=None,
+    gallery_files=None,
+    video_file=None,
+    append_gallery: bool = False,
+) -> MediaJob | None:
+    """Spool the files and queue one upload job; marks the property pending."""
+    payload = {
+        "main": _spool(main_image_file) if main_image_file else None,
+        "gallery": [_spool(f) for f in gallery_files] if gallery_files is not None else None,
+        "video": _spool(video_file) if video_file else None,
+        "append_gallery": append_gallery,
+    }
+    if payload["gallery"] is None and not payload["main"] and not payload["video"]:
+        return None
+    try:
+        with transaction.atomic():
+            job = MediaJob.objects.create(
+                kind=MediaJob.Kind.UPLOAD,
+                property=prop,
+                payload=payload,
+                run_after=timezone.now(),
+                max_attempts=settings.MEDIA_JOB_MAX_ATTEMPTS,
+            )
+            _set_media_status(prop, Property.MediaStatus.PENDING)
+    except Exception:
+        _remove_spooled(_spool_entries(payload))
+        raise
+    return job
+
+
+def _set_media_status(prop: Property, status: str) -> None:
+    if prop.media_status != status:
+        prop.media_status = status
+        prop.save(update_fields=["media_status", "updated_at"])
+
+
+# --- Worker ---
+
+
+def claim_job() -> MediaJob | None:
+    """Lock and mark running the next due job (or one abandoned by a dead worker)."""
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.MEDIA_JOB_LOCK_TIMEOUT)
+    with transaction.atomic():
+        job = (
+            MediaJob.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=MediaJob.Status.PENDING, run_after__lte=now)
+                | Q(status=MediaJob.Status.RUNNING, locked_at__lt=stale)
+            )
+            .order_by("run_after", "id")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = MediaJob.Status.RUNNING
+        job.attempts += 1
+        job.locked_at = now
+        job.save(update_fields=["status", "attempts", "locked_at", "updated_at"])
+    return job
+
+
+def backoff(attempts: int) -> timedelta:
+    base = settings.MEDIA_JOB_BACKOFF_SECONDS
+    return timedelta(seconds=min(base * 2 ** max(attempts - 1, 0), 3600))
+
+
+def run_job(job: MediaJob) -> bool:
+    """Run a claimed job; returns True when it finished (done), False otherwise."""
+    try:
+        _run_upload(job)
+    except Exception as e:
+        _job_failed(job, e)
+        return False
+
+    job.status = MediaJob.Status.DONE
+    job.last_error = ""
+    job.locked_at = None
+    job.save(update_fields=["status", "last_error", "locked_at", "payload", "updated_at"])
+    _remove_spooled(_spool_entries(job.payload))
+    UploadSession.objects.filter(key__in=[e["path"] for e in _spool_entries(job.payload)]).delete()
+    _refresh_media_status(job.property_id)
+    return True
+
+
+def run_pending(limit: int | None = None) -> int:
+    """Run due jobs until none are left (or ``limit`` ran); returns how many ran."""
+    ran = 0
+    while limit is None or ran < limit:
+        job = claim_job()
+        if job is None:
+            break
+        run_job(job)
+        ran += 1
+    return ran
+
+
+def _open(entry: dict) -> File:
+    # Named after the (unique) spool file so failures map back to entries;
+    # the same name lets a chunked video upload resume (UploadSession.key).
+    f = File(open(spool_dir() / entry["path"], "rb"), name=entry["path"])
+    f.resume_key = entry["path"]
+    return f
+
+
+def _run_upload(job: MediaJob) -> None:
+    from .services import upload_property_media
+
+    payload = job.payload
+    prop = Property.objects.filter(pk=job.property_id).first()
+    if prop is None:
+        return  # Property deleted while queued; spool is cleaned up on completion.
+
+    files = []
+
+    def opened(entry):
+        files.append(_open(entry))
+        return files[-1]
+
+    try:
+        main = opened(payload["main"]) if payload.get("main") else None
+        gallery = [opened(e) for e in payload["gallery"]] if payload.get("gallery") is not None else None
+        video = opened(payload["video"]) if payload.get("video") else None
+        result = upload_property_media(
+            prop,
+            main_image_file=main,
+            gallery_files=gallery,
+            video_file=video,
+            append_gallery=payload.get("append_gallery", False),
+        )
+    finally:
+        for f in files:
+            f.close()
+
+    if not result.ok:
+        # Retry only what failed and may succeed next time (not invalid
+        # files); gallery files that did upload already replaced the old
+        # gallery, so the rest are appended.
+        failed = dict(result.failed)
+        retry = failed.keys() - set(result.invalid)
+        entries = _spool_entries(payload)
+        _remove_spooled([e for e in entries if e["path"] not in retry])
+
+        def keep(entry):
+            return entry if entry and entry["path"] in retry else None
+
+        job.payload = {
+            "main": keep(payload.get("main")),
+            "gallery": [e for e in payload.get("gallery") or [] if keep(e)] or None,
+            "video": keep(payload.get("video")),
+            "append_gallery": payload.get("append_gallery", False) or bool(result.uploaded),
+        }
+        message = "; ".join(f"{e['name']}: {failed[e['path']]}" for e in entries if e["path"] in failed)
+        raise RuntimeError(message) if retry else InvalidMediaError(message)
+
+
+def _job_failed(job: MediaJob, error: Exception) -> None:
+    logger.warning("Media job %s failed (attempt %s/%s): %s", job.pk, job.attempts, job.max_attempts, error)
+    job.last_error = str(error) or error.__class__.__name__
+    job.locked_at = None
+    if job.attempts >= job.max_attempts or isinstance(error, InvalidMediaError):
+        job.status = MediaJob.Status.FAILED
+    else:
+        job.status = MediaJob.Status.PENDING
+        job.run_after = timezone.now() + backoff(job.attempts)
+    job.save(update_fields=["status", "last_error", "locked_at", "run_after", "payload", "updated_at"])
+    if job.status == MediaJob.Status.FAILED:
+        _remove_spooled(_spool_entries(job.payload))
+        UploadSession.objects.filter(key__in=[e["path"] for e in _spool_entries(job.payload)]).delete()
+        _refresh_media_status(job.property_id)
+
+
+def _refresh_media_status(property_id: int | None) -> None:
+    prop = Property.objects.filter(pk=property_id).first()
+    if prop is None:
+        return
+    jobs = MediaJob.objects.filter(property_id=property_id, kind=MediaJob.Kind.UPLOAD)
+    if jobs.filter(status__in=[MediaJob.Status.PENDING, MediaJob.Status.RUNNING]).exists():
+        status = Property.MediaStatus.PENDING
+    else:
+        # The most recently finished upload decides between ready and failed.
+        last = jobs.order_by("-updated_at", "-id").values_list("status", flat=True).first()
+        status = Property.MediaStatus.FAILED if last == MediaJob.Status.FAILED else Property.MediaStatus.READY
+    _set_media_status(prop, status)
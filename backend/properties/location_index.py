@@ -0,0 +1,67 @@
+"""
+Resolve free-text location filters to Location IDs in memory.
+
+PropertyFilter.filter_location used to OR two icontains lookups across the
+properties -> locations join. Instead, the value is matched against a
+per-process, case- and accent-folded copy of every location's name and city,
+and properties are filtered with a plain ``location_id IN (...)``.
+"""
+from __future__ import annotations
+
+from django.db.models import Q
+
+from config.text import fold
+from locations.models import Location
+
+from .cache import CatalogLocal
+
+# Above this many matches an IN (...) list stops being selective (and SQLite
+# caps bound parameters), so fall back to a subquery on locations (plain
+# icontains there, i.e. not accent-folded). Values the index does not know
+# use the same subquery.
+MAX_IN_IDS = 500
+_MEMO_SIZE = 512
+
+
+class LocationIndex:
+    def __init__(self, rows):
+        self._rows = [(loc_id, fold(name), fold(city)) for loc_id, name, city in rows]
+        self._memo: dict[str, frozenset[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def resolve(self, value: str) -> frozenset[int]:
+        """IDs of locations whose name or city contains ``value``."""
+        q = fold(value)
+        ids = self._memo.get(q)
+        if ids is None:
+            ids = frozenset(loc_id for loc_id, name, city in self._rows if q in name or q in city)
+            if len(self._memo) >= _MEMO_SIZE:
+                self._memo.clear()
+            self._memo[q] = ids
+        return ids
+
+
+def build_location_index() -> LocationIndex:
+    return LocationIndex(Location.objects.values_list("id", "name", "city"))
+
+
+_index = CatalogLocal(build_location_index)
+
+
+def resolve_location_ids(value: str) -> frozenset[int]:
+    return _index.get().resolve(value)
+
+
+def filter_by_location(qs, value: str):
+    """Filter a Property queryset to locations matching ``value``."""
+    ids = resolve_location_ids(value)
+    if ids and len(ids) <= MAX_IN_IDS:
+        return qs.filter(location_id__in=sorted(ids))
+    # No match may just mean this process's index predates the location
+    # (another process added it and the catalog version has not reached
+    # us yet), so ask the database rather than return nothing.
+    v = value.strip()
+    matching = Location.objects.filter(Q(name__icontains=v) | Q(city__icontains=v)).values("id")
+    return qs.filter(location_id__in=matching)
@@ -0,0 +1,76 @@
+"""
+Compute placeholders and dimensions for images stored before ingest did it
+(or attached by direct upload).
+Run: python manage.py backfill_image_placeholders [--batch-size 100] [--concurrency 4] [--force]
+
+Rows are processed in primary-key batches; each batch downloads its images on
+at most --concurrency threads and is saved with one bulk_update.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from properties.cache import bump_catalog_version
+from properties.models import Property, PropertyImage
+from properties.placeholders import fetch_and_describe
+
+# model, url field, placeholder/width/height fields
+TARGETS = (
+    (Property, "main_image", ("main_image_placeholder", "main_image_width", "main_image_height")),
+    (PropertyImage, "url", ("placeholder", "width", "height")),
+)
+
+
+class Command(BaseCommand):
+    help = "Backfill image placeholders (LQIP) and dimensions for existing properties and gallery images."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--concurrency", type=int, default=4, help="Concurrent image downloads")
+        parser.add_argument("--force", action="store_true", help="Recompute rows that already have a placeholder")
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options["batch_size"])
+        concurrency = max(1, options["concurrency"])
+        changed = 0
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for model, url_field, fields in TARGETS:
+                done, failed = self._backfill(pool, model, url_field, fields, batch_size, options["force"])
+                changed += done
+                self.stdout.write(f"{model.__name__}: {done} updated, {failed} failed.")
+        if changed:
+            transaction.on_commit(bump_catalog_version)  # bulk_update sends no signals
+
+    def _backfill(self, pool, model, url_field, fields, batch_size, force):
+        placeholder_field, width_field, height_field = fields
+        qs = model.objects.exclude(**{url_field: ""}).order_by("pk")
+        if not force:
+            qs = qs.filter(**{placeholder_field: ""})
+        done = failed = 0
+        last_pk = 0
+        while True:
+            # Keyset on pk: rows that fail keep an empty placeholder and are not refetched.
+            batch = list(qs.filter(pk__gt=last_pk).only("pk", url_field, *fields)[:batch_size])
+            if not batch:
+                return done, failed
+            last_pk = batch[-1].pk
+
+            def describe(row):
+                try:
+                    return fetch_and_describe(getattr(row, url_field))
+                except Exception as e:
+                    self.stderr.write(f"{model.__name__} {row.pk}: {e}")
+                    return {}
+
+            updated = []
+            for row, info in zip(batch, pool.map(describe, batch)):
+                if not info:
+                    failed += 1
+                    continue
+                setattr(row, placeholder_field, info["placeholder"])
+                setattr(row, width_field, info["width"])
+                setattr(row, height_field, info["height"])
+                updated.append(row)
+            model.objects.bulk_update(updated, fields)
+            done += len(updated)
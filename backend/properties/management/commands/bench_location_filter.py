@@ -0,0 +1,55 @@
+"""
+Compare ?location= filtering: OR'd icontains join vs. in-memory ID resolution.
+Run: python manage.py bench_location_filter --locations 5000 --properties 50000
+
+Seed rows are rolled back when it finishes.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from properties.bench import Rollback, seed_catalog, timed
+from properties.location_index import build_location_index, filter_by_location
+from properties.models import Property
+
+VALUES = ("Area 1234", "Area 12", "city 7", "no such place")
+
+
+def _old_filter(qs, v):
+    return qs.filter(location__city__icontains=v) | qs.filter(location__name__icontains=v)
+
+
+def _page(qs):
+    return list(qs.order_by("-created_at")[:12]), qs.count()
+
+
+class Command(BaseCommand):
+    help = "Benchmark PropertyFilter location filtering (icontains OR vs. resolved location IDs)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--locations", type=int, default=5000)
+        parser.add_argument("--properties", type=int, default=50000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        repeat = options["repeat"]
+        rows = []
+        try:
+            with transaction.atomic():
+                self.stdout.write(f"Seeding {options['locations']} locations, {options['properties']} properties...")
+                seed_catalog(options["properties"], options["locations"])
+                base = Property.objects.select_related("location").filter(published=True)
+
+                build_ms = timed(build_location_index, repeat)
+                for v in VALUES:
+                    old = timed(lambda: _page(_old_filter(base, v)), repeat)
+                    new = timed(lambda: _page(filter_by_location(base, v)), repeat)
+                    same = _page(_old_filter(base, v))[1] == _page(filter_by_location(base, v))[1]
+                    rows.append((v, old, new, same))
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(f"Location index build: {build_ms:.2f} ms (once per catalog version)\n")
+        self.stdout.write(f"{'value':<16} {'icontains ms':>13} {'resolver ms':>12} {'speedup':>8}  same count")
+        for v, old, new, same in rows:
+            self.stdout.write(f"{v:<16} {old:>13.2f} {new:>12.2f} {old / new if new else 0:>7.1f}x  {same}")
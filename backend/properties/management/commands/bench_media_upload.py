@@ -0,0 +1,57 @@
+"""
+Compare serial vs. thread-pool gallery uploads in upload_property_media, offline.
+Run: python manage.py bench_media_upload --files 15 --latency 0.3 --workers 1,4,8
+
+Uses properties.bench.FakeMediaBackend (no network); seed rows are rolled back.
+"""
+import time
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from locations.models import Location
+from properties.bench import FakeMediaBackend, Rollback
+from properties.models import Property
+from properties.services import upload_property_media
+
+
+class Command(BaseCommand):
+    help = "Benchmark upload_property_media with a fake media backend at several pool sizes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--files", type=int, default=15)
+        parser.add_argument("--size-kb", type=int, default=512)
+        parser.add_argument("--latency", type=float, default=0.3, help="Seconds per fake upload")
+        parser.add_argument("--workers", default="1,4,8", help="Comma-separated pool sizes (1 = serial)")
+        parser.add_argument("--fail-every", type=int, default=0, help="Fail every Nth upload")
+
+    def handle(self, *args, **options):
+        payload = b"\xff\xd8\xff" + b"\0" * (options["size_kb"] * 1024)
+        rows = []
+        try:
+            with transaction.atomic():
+                loc = Location.objects.create(name="Bench Upload Area", city="Bench City")
+                for workers in [int(w) for w in options["workers"].split(",") if w.strip()]:
+                    prop = Property.objects.create(title="Bench upload", location=loc, price=1)
+                    # Distinct contents, or the asset registry would dedupe every upload after the first.
+                    files = [
+                        SimpleUploadedFile(f"photo-{i}.jpg", payload + f"{workers}-{i}".encode())
+                        for i in range(options["files"])
+                    ]
+                    backend = FakeMediaBackend(latency=options["latency"], fail_every=options["fail_every"])
+                    start = time.perf_counter()
+                    result = upload_property_media(prop, gallery_files=files, backend=backend, workers=workers)
+                    elapsed = (time.perf_counter() - start) * 1000
+                    rows.append((workers, elapsed, len(result.uploaded), len(result.failed), prop.gallery_images.count()))
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(f"{options['files']} files x {options['latency'] * 1000:.0f} ms fake upload latency\n")
+        self.stdout.write(f"{'workers':>7} {'total ms':>10} {'speedup':>8} {'ok':>4} {'failed':>6} {'rows':>5}")
+        serial = rows[0][1] if rows else 0
+        for workers, elapsed, ok, failed, stored in rows:
+            self.stdout.write(
+                f"{workers:>7} {elapsed:>10.1f} {serial / elapsed if elapsed else 0:>7.1f}x {ok:>4} {failed:>6} {stored:>5}"
+            )
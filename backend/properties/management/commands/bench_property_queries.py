@@ -0,0 +1,75 @@
+"""
+Benchmark the public property queries with and without the Property indexes.
+Run: python manage.py bench_property_queries --properties 100000
+
+Everything (seed rows, dropped indexes) is rolled back when it finishes.
+"""
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from properties.bench import Rollback, plan_summary, seed_catalog, timed
+from properties.filters import PropertyFilter
+from properties.models import Property
+
+# (name, PropertyFilter params, ordering) - mirrors what the frontend sends.
+QUERIES = (
+    ("recent", {}, ("-created_at",)),
+    ("rent", {"listing_type": "rent"}, ("-created_at",)),
+    ("rent available", {"listing_type": "rent", "availability": "available"}, ("-created_at",)),
+    ("apartments", {"property_type": "apartment"}, ("-created_at",)),
+    ("sale USD by price", {"listing_type": "sale", "currency": "USD", "min_price": "50000", "max_price": "90000"}, ("price",)),
+    ("featured", {"featured": "true"}, ("-created_at",)),
+)
+
+
+def _page(params, ordering):
+    base = Property.objects.select_related("location").filter(published=True)
+    return PropertyFilter(params, queryset=base).qs.order_by(*ordering)[:12]
+
+
+class Command(BaseCommand):
+    help = "Seed a large catalog and compare query plans/timings before and after the Property indexes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--properties", type=int, default=50000)
+        parser.add_argument("--locations", type=int, default=200)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def _analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {connection.ops.quote_name(Property._meta.db_table)}")
+
+    def _measure(self, repeat):
+        results = {}
+        for name, params, ordering in QUERIES:
+            qs = _page(params, ordering)
+            results[name] = (timed(lambda: list(_page(params, ordering)), repeat), plan_summary(qs))
+        return results
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.stdout.write(f"Seeding {options['properties']} properties...")
+                seed_catalog(options["properties"], options["locations"])
+                self._analyze()
+                after = self._measure(options["repeat"])
+
+                with connection.cursor() as cursor:
+                    for index in Property._meta.indexes:
+                        cursor.execute(f"DROP INDEX {connection.ops.quote_name(index.name)}")
+                self._analyze()
+                before = self._measure(options["repeat"])
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(f"\n{'query':<20} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+        for name, _, _ in QUERIES:
+            b, a = before[name][0], after[name][0]
+            self.stdout.write(f"{name:<20} {b:>10.2f} {a:>10.2f} {b / a if a else 0:>7.1f}x")
+        self.stdout.write("\nQuery plans:")
+        for name, _, _ in QUERIES:
+            self.stdout.write(f"  {name}")
+            self.stdout.write(f"    before: {before[name][1]}")
+            self.stdout.write(f"    after:  {after[name][1]}")
+        self.stdout.write(self.style.SUCCESS("Done (seed data and index changes rolled back)."))
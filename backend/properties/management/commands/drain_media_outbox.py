@@ -0,0 +1,40 @@
+"""
+Destroy the Cloudinary assets queued in the deletion outbox (MediaDeletion).
+Run: python manage.py drain_media_outbox [--retry-failed]
+
+run_media_worker does this continuously; this is for cron or one-off cleanup.
+"""
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from properties.models import MediaDeletion
+from properties.outbox import drain_media_outbox
+
+
+class Command(BaseCommand):
+    help = "Bulk-delete Cloudinary assets recorded in the media deletion outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--retry-failed", action="store_true", help="Requeue rows that ran out of attempts")
+
+    def handle(self, *args, **options):
+        if options["retry_failed"]:
+            requeued = MediaDeletion.objects.filter(status=MediaDeletion.Status.FAILED).update(
+                status=MediaDeletion.Status.PENDING, attempts=0, run_after=timezone.now()
+            )
+            self.stdout.write(f"Requeued {requeued} failed row(s).")
+
+        total_deleted = total_failed = 0
+        while True:
+            deleted, failed = drain_media_outbox()
+            total_deleted += deleted
+            total_failed += failed
+            # Stop on a pass that deleted nothing: with a short backoff
+            # (MEDIA_JOB_BACKOFF_SECONDS=0) failed rows are due again at once,
+            # and retrying them here would spin until they run out of attempts.
+            if not deleted:
+                break
+        pending = MediaDeletion.objects.exclude(status=MediaDeletion.Status.FAILED).count()
+        self.stdout.write(
+            f"Deleted {total_deleted} asset(s); {total_failed} failed attempt(s); {pending} still queued."
+        )
@@ -0,0 +1,138 @@
+"""
+Bulk-import properties from a CSV or JSONL file.
+Run: python manage.py import_properties listings.csv [--batch-size 500] [--dry-run] [--errors errors.jsonl]
+
+Columns / keys are PropertyWriteSerializer's fields (title, description,
+property_type, listing_type, price, currency, bedrooms, bathrooms, area_size,
+featured, published, availability, contact_phone, contact_whatsapp) plus
+location_name and location_city (default "Dar es Salaam"); media is added
+afterwards in the dashboard.
+
+The file is read one row at a time and rows are written with bulk_create in
+--batch-size batches (one transaction each), so memory stays flat however
+long the file is. Locations are looked up in a cache filled once up front;
+a new one is created the first time it is seen (or only counted, with
+--dry-run). Rows that fail validation are reported, one JSON line each, to
+--errors or stderr and skipped.
+"""
+import csv
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from locations.models import Location
+from properties.cache import bump_catalog_version
+from properties.models import Property
+from properties.serializers import PropertyImportSerializer
+
+DEFAULT_CITY = "Dar es Salaam"
+
+
+def _read_rows(f, fmt):
+    """Yield (line number, dict) pairs; malformed JSON lines yield their error instead."""
+    if fmt == "csv":
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for number, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, {"__error__": f"Invalid JSON: {e.msg}"}
+            continue
+        yield number, row if isinstance(row, dict) else {"__error__": "Expected a JSON object."}
+
+
+class Command(BaseCommand):
+    help = "Import properties from a CSV or JSONL file, validated like the admin API, in batched inserts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=("csv", "jsonl"), help="Default: from the file extension")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--dry-run", action="store_true", help="Validate only; write nothing")
+        parser.add_argument("--errors", help="Write the per-row error report (JSON lines) here instead of stderr")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or ("jsonl" if path.lower().endswith((".jsonl", ".ndjson")) else "csv")
+        batch_size = max(1, options["batch_size"])
+        self.dry_run = options["dry_run"]
+        self.locations = {(loc.name, loc.city): loc.pk for loc in Location.objects.only("pk", "name", "city")}
+        self.new_locations = 0
+        # One instance validates every row: building a ModelSerializer's fields is the costly part.
+        self.serializer = PropertyImportSerializer()
+
+        read = imported = failed = 0
+        batch = []
+        started = time.monotonic()
+        try:
+            source = open(path, newline="", encoding="utf-8-sig")
+        except OSError as e:
+            raise CommandError(f"Cannot open {path}: {e}")
+        report = open(options["errors"], "w", encoding="utf-8") if options["errors"] else self.stderr
+        try:
+            with source:
+                for line, row in _read_rows(source, fmt):
+                    read += 1
+                    prop, errors = self._build(row)
+                    if errors:
+                        failed += 1
+                        report.write(json.dumps({"row": line, "errors": errors}) + "\n")
+                        continue
+                    batch.append(prop)
+                    if len(batch) >= batch_size:
+                        imported += self._flush(batch)
+                        batch = []
+                imported += self._flush(batch)
+        finally:
+            if report is not self.stderr:
+                report.close()
+        if imported and not self.dry_run:
+            transaction.on_commit(bump_catalog_version)  # bulk_create sends no signals
+
+        elapsed = time.monotonic() - started
+        rate = read / elapsed if elapsed else 0
+        verb = "would import" if self.dry_run else "imported"
+        self.stdout.write(
+            f"{read} rows read, {imported} {verb}, {failed} failed, "
+            f"{self.new_locations} new locations in {elapsed:.1f}s ({rate:.0f} rows/s)."
+        )
+
+    def _build(self, row):
+        """(Property, None) for a valid row, (None, errors) otherwise."""
+        if "__error__" in row:
+            return None, {"row": [row["__error__"]]}
+        # Empty CSV cells mean "not given", so model defaults apply.
+        data = {k: v for k, v in row.items() if k and v not in ("", None)}
+        try:
+            fields = self.serializer.run_validation(data)
+        except ValidationError as e:
+            return None, e.detail
+        name = fields.pop("location_name").strip()
+        city = (fields.pop("location_city", "") or "").strip() or DEFAULT_CITY
+        return Property(location_id=self._location_id(name, city), **fields), None
+
+    def _location_id(self, name, city):
+        key = (name, city)
+        if key not in self.locations:
+            self.new_locations += 1
+            if self.dry_run:
+                self.locations[key] = None
+            else:
+                self.locations[key] = Location.objects.get_or_create(name=name, city=city)[0].pk
+        return self.locations[key]
+
+    def _flush(self, batch):
+        if not batch:
+            return 0
+        if not self.dry_run:
+            with transaction.atomic():
+                Property.objects.bulk_create(batch)
+        return len(batch)
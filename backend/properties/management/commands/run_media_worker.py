@@ -0,0 +1,53 @@
+"""
+Process queued media uploads (MEDIA_ASYNC) and drain the asset deletion outbox.
+Run: python manage.py run_media_worker [--once] [--poll 2]
+
+Several workers can run at once on Postgres (jobs are claimed with
+SELECT ... FOR UPDATE SKIP LOCKED). Run with a shared cache (CACHE_BACKEND=db):
+the catalog-version bumps a finished job makes must reach the web processes.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from properties.jobs import claim_job, run_job
+from properties.outbox import drain_media_outbox
+
+
+class Command(BaseCommand):
+    help = "Run the background media worker (Cloudinary uploads and outbox deletes, with retries)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run the jobs that are due, then exit")
+        parser.add_argument("--poll", type=float, default=2.0, help="Seconds to sleep when the queue is empty")
+
+    def handle(self, *args, **options):
+        if isinstance(caches[getattr(settings, "CATALOG_CACHE_ALIAS", "default")], LocMemCache):
+            self.stderr.write(
+                self.style.WARNING(
+                    "The cache is per-process (CACHE_BACKEND=locmem): the web processes will not see this "
+                    "worker's catalog invalidations. Set CACHE_BACKEND=db for MEDIA_ASYNC."
+                )
+            )
+        ran = 0
+        while True:
+            close_old_connections()
+            job = claim_job()
+            if job is None:
+                deleted, failed = drain_media_outbox()
+                if deleted or failed:
+                    self.stdout.write(f"Outbox: {deleted} asset(s) deleted, {failed} to retry")
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["poll"])
+                continue
+            ok = run_job(job)
+            ran += 1
+            status = "done" if ok else f"{job.status} ({job.last_error})"
+            self.stdout.write(f"{job.get_kind_display()} job {job.pk}: {status}")
+        self.stdout.write(f"Processed {ran} job(s).")
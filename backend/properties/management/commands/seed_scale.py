@@ -0,0 +1,60 @@
+"""
+Fill the database with a large, realistic synthetic catalog (see properties/seed.py).
+Run: python manage.py seed_scale --properties 1000000 [--locations 300] [--seed 1] [--batch-size 2000]
+
+Rows are added, not replaced, and kept (unlike the bench_* commands): point
+it at a development or staging database only.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from properties.cache import bump_catalog_version
+from properties.seed import seed_scale
+
+
+class Command(BaseCommand):
+    help = "Generate deterministic synthetic locations, properties, gallery images, bookings and inquiries."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--properties", type=int, required=True)
+        parser.add_argument("--locations", type=int, default=300)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--batch-size", type=int, default=2000, help="Properties per transaction")
+        parser.add_argument("--images", type=float, default=8.0, help="Mean gallery size")
+        parser.add_argument("--bookings", type=float, default=0.3, help="Mean bookings per property")
+        parser.add_argument("--inquiries", type=float, default=0.5, help="Mean inquiries per property")
+
+    def handle(self, *args, **options):
+        if options["properties"] < 1 or options["locations"] < 1:
+            raise CommandError("--properties and --locations must be positive.")
+        started = time.monotonic()
+        report_every = max(1, 50_000 // max(1, options["batch_size"]))
+        batches = 0
+
+        def progress(result):
+            nonlocal batches
+            batches += 1
+            if batches % report_every == 0 or result.properties == options["properties"]:
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f"{result.properties}/{options['properties']} properties "
+                    f"({result.properties / elapsed:.0f}/s, {elapsed:.0f}s)"
+                )
+
+        result = seed_scale(
+            options["properties"],
+            locations=options["locations"],
+            seed=options["seed"],
+            batch_size=max(1, options["batch_size"]),
+            images=options["images"],
+            bookings=options["bookings"],
+            inquiries=options["inquiries"],
+            progress=progress,
+        )
+        transaction.on_commit(bump_catalog_version)  # bulk_create sends no signals
+        self.stdout.write(
+            f"Seeded {result.locations} locations, {result.properties} properties, {result.images} gallery images, "
+            f"{result.bookings} bookings and {result.inquiries} inquiries in {time.monotonic() - started:.1f}s."
+        )
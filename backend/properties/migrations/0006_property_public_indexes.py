@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0005_currency_choices'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('published', True)), fields=['-created_at', '-id'], name='prop_pub_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('published', True)), fields=['listing_type', '-created_at'], name='prop_pub_listing_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('published', True)), fields=['listing_type', 'availability', '-created_at'], name='prop_pub_listing_avail_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('published', True)), fields=['property_type', '-created_at'], name='prop_pub_type_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('published', True)), fields=['listing_type', 'currency', 'price'], name='prop_pub_listing_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('featured', True), ('published', True)), fields=['-created_at'], name='prop_pub_featured_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations
+
+
+def install(apps, schema_editor):
+    from properties.search import install_search_index
+
+    install_search_index(schema_editor.connection)
+
+
+def uninstall(apps, schema_editor):
+    from properties.search import uninstall_search_index
+
+    uninstall_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+    """
+    Full-text search index for properties (see properties/search.py):
+    tsvector column + GIN index + triggers on Postgres, FTS5 table + triggers on SQLite.
+    """
+
+    dependencies = [
+        ('locations', '0001_initial'),
+        ('properties', '0006_property_public_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
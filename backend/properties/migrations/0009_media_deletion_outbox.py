@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:28
+
+from django.db import migrations, models
+
+
+def move_delete_jobs(apps, schema_editor):
+    """Queued delete jobs become outbox rows."""
+    MediaJob = apps.get_model("properties", "MediaJob")
+    MediaDeletion = apps.get_model("properties", "MediaDeletion")
+    jobs = MediaJob.objects.filter(kind="delete")
+    MediaDeletion.objects.bulk_create(
+        MediaDeletion(public_id=public_id, resource_type=resource_type, run_after=job.run_after)
+        for job in jobs.exclude(status="done")
+        for public_id, resource_type in job.payload.get("assets", [])
+    )
+    jobs.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0008_media_jobs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='mediajob',
+            name='kind',
+            field=models.CharField(choices=[('upload', 'Upload')], max_length=10),
+        ),
+        migrations.CreateModel(
+            name='MediaDeletion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('public_id', models.CharField(max_length=255)),
+                ('resource_type', models.CharField(default='image', max_length=10)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('run_after', models.DateTimeField()),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ('run_after', 'id'),
+                'indexes': [models.Index(fields=['status', 'run_after'], name='mediadel_status_run_idx')],
+            },
+        ),
+        migrations.RunPython(move_delete_jobs, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,18 @@ from django.core.validators import MinValueValidator
 from django.db import models
 
 
+class PropertyQuerySet(models.QuerySet):
+    def with_visible_gallery(self):
+        """Prefetch visible gallery images, in slider order, into ``visible_gallery_images``."""
+        return self.prefetch_related(
+            models.Prefetch(
+                "gallery_images",
+                queryset=PropertyImage.objects.filter(visible=True).order_by("sort_order", "id"),
+                to_attr="visible_gallery_images",
+            )
+        )
+
+
 class Property(models.Model):
     class PropertyType(models.TextChoices):
         APARTMENT = "apartment", "Apartment"
@@ -22,6 +34,11 @@ class Property(models.Model):
         USD = "USD", "USD"
         TZS = "TZS", "TZS"
 
+    class MediaStatus(models.TextChoices):
+        READY = "ready", "Ready"
+        PENDING = "pending", "Processing"
+        FAILED = "failed", "Failed"
+
     title = models.CharField(max_length=255)
     description = models.TextField()
 
@@ -48,9 +65,15 @@ class Property(models.Model):
     # Media URLs only (stored from Cloudinary secure_url)
     main_image = models.URLField(max_length=1000, blank=True)
     main_image_public_id = models.CharField(max_length=255, blank=True)
+    # Set at ingest (placeholders.py): tiny base64 preview and pixel size.
+    main_image_placeholder = models.TextField(blank=True)
+    main_image_width = models.PositiveIntegerField(null=True, blank=True)
+    main_image_height = models.PositiveIntegerField(null=True, blank=True)
 
     video_url = models.URLField(max_length=1000, blank=True)
     video_public_id = models.CharField(max_length=255, blank=True)
+    # Background media jobs (MEDIA_ASYNC) set pending until the worker finishes.
+    media_status = models.CharField(max_length=10, choices=MediaStatus.choices, default=MediaStatus.READY)
 
     contact_phone = models.CharField(max_length=40, blank=True)
     contact_whatsapp = models.CharField(max_length=40, blank=True)
@@ -58,21 +81,72 @@ class Property(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PropertyQuerySet.as_manager()
+
     class Meta:
         ordering = ("-created_at",)
+        # Public queries always filter published=True, so the indexes are
+        # partial on it; columns follow PropertyFilter and ordering_fields.
+        indexes = [
+            models.Index(
+                fields=["-created_at", "-id"],
+                name="prop_pub_recent_idx",
+                condition=models.Q(published=True),
+            ),
+            models.Index(
+                fields=["listing_type", "-created_at"],
+                name="prop_pub_listing_recent_idx",
+                condition=models.Q(published=True),
+            ),
+            models.Index(
+                fields=["listing_type", "availability", "-created_at"],
+                name="prop_pub_listing_avail_idx",
+                condition=models.Q(published=True),
+            ),
+            models.Index(
+                fields=["property_type", "-created_at"],
+                name="prop_pub_type_recent_idx",
+                condition=models.Q(published=True),
+            ),
+            models.Index(
+                fields=["listing_type", "currency", "price"],
+                name="prop_pub_listing_price_idx",
+                condition=models.Q(published=True),
+            ),
+            models.Index(
+                fields=["-created_at"],
+                name="prop_pub_featured_idx",
+                condition=models.Q(published=True, featured=True),
+            ),
+            # The lora_admin list shows drafts too: full indexes for its sorts
+            # (config.admin_filters.PROPERTY_SORTS), with id as the keyset tiebreaker.
+            models.Index(fields=["-created_at", "-id"], name="prop_admin_recent_idx"),
+            models.Index(fields=["price", "id"], name="prop_admin_price_idx"),
+            models.Index(fields=["title", "id"], name="prop_admin_title_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.title
 
+    def get_visible_gallery(self) -> list["PropertyImage"]:
+        """Visible gallery images in slider order (uses with_visible_gallery() when prefetched)."""
+        prefetched = getattr(self, "visible_gallery_images", None)
+        if prefetched is not None:
+            return prefetched
+        return list(self.gallery_images.filter(visible=True).order_by("sort_order", "id"))
+
     @property
     def gallery_urls(self) -> list[str]:
-        return [img.url for img in self.gallery_images.filter(visible=True).order_by("sort_order", "id")]
+        return [img.url for img in self.get_visible_gallery()]
 
 
 class PropertyImage(models.Model):
     property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name="gallery_images")
     url = models.URLField(max_length=1000)
     public_id = models.CharField(max_length=255, blank=True)
+    placeholder = models.TextField(blank=True)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
     sort_order = models.PositiveIntegerField(default=0)
     visible = models.BooleanField(default=True)
 
@@ -83,3 +157,151 @@ class PropertyImage(models.Model):
 
     def __str__(self) -> str:
         return f"Image for {self.property_id}"
+
+
+class MediaJob(models.Model):
+    """
+    A queued Cloudinary upload, run by ``manage.py run_media_worker``.
+
+    Payload: spooled files ({"path", "name"}) under "main", "gallery", "video"
+    plus "append_gallery". Deletes go through MediaDeletion instead.
+    """
+
+    class Kind(models.TextChoices):
+        UPLOAD = "upload", "Upload"
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    property = models.ForeignKey(
+        Property, on_delete=models.SET_NULL, null=True, blank=True, related_name="media_jobs"
+    )
+    payload = models.JSONField(default=dict)
+
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField()
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("run_after", "id")
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="mediajob_status_run_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.get_kind_display()} job {self.pk} ({self.status})"
+
+
+class MediaDeletion(models.Model):
+    """
+    Outbox row: a Cloudinary asset to destroy once the transaction that
+    orphaned it commits. Drained in batches by properties.outbox; rows are
+    deleted when Cloudinary confirms, and kept as failed after max attempts.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        FAILED = "failed", "Failed"
+
+    public_id = models.CharField(max_length=255)
+    resource_type = models.CharField(max_length=10, default="image")
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField()
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("run_after", "id")
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="mediadel_status_run_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.resource_type}:{self.public_id} ({self.status})"
+
+
+class MediaAsset(models.Model):
+    """
+    Content-addressed registry of uploaded Cloudinary assets (properties.assets).
+    An upload whose sha256 is already registered reuses the asset instead of
+    uploading again; ref_count is the number of property/gallery fields that
+    point at it, and the asset is only destroyed when that drops to zero.
+    """
+
+    sha256 = models.CharField(max_length=64)
+    resource_type = models.CharField(max_length=10, default="image")
+    public_id = models.CharField(max_length=255, unique=True)
+    secure_url = models.URLField(max_length=1000)
+    bytes = models.BigIntegerField(default=0)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    placeholder = models.TextField(blank=True)
+    ref_count = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("-id",)
+        constraints = [
+            models.UniqueConstraint(fields=["sha256", "resource_type"], name="mediaasset_sha256_type_uniq"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.resource_type}:{self.public_id} ({self.ref_count} refs)"
+
+    def as_response(self) -> dict:
+        """The asset in upload-response form, as attach_property_media expects."""
+        response = {"secure_url": self.secure_url, "public_id": self.public_id, "bytes": self.bytes}
+        if self.placeholder:
+            response["placeholder"] = self.placeholder
+        if self.width and self.height:
+            response.update(width=self.width, height=self.height)
+        return response
+
+
+class UploadSession(models.Model):
+    """
+    Resume state of a chunked (upload_large-style) Cloudinary upload: the
+    X-Unique-Upload-Id and how many bytes Cloudinary has confirmed. A failed
+    upload of the same source (``key``, the spool file name for queued media)
+    continues from ``offset``.
+    """
+
+    class Status(models.TextChoices):
+        ACTIVE = "active", "In progress"
+        COMPLETE = "complete", "Complete"
+
+    key = models.CharField(max_length=64, unique=True)
+    upload_id = models.CharField(max_length=64)
+    resource_type = models.CharField(max_length=10)
+    folder = models.CharField(max_length=255)
+    filename = models.CharField(max_length=255, blank=True)
+
+    total_size = models.BigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    offset = models.BigIntegerField(default=0)
+    public_id = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.ACTIVE)
+    last_error = models.TextField(blank=True)
+    response = models.JSONField(null=True, blank=True)  # final upload response
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.filename or self.key}: {self.offset}/{self.total_size} bytes"
@@ -0,0 +1,136 @@
+"""
+Pre-upload image optimization (settings.MEDIA_OPTIMIZE_IMAGES).
+
+Phone photos arrive as 8-12 MB JPEGs with EXIF (GPS included). Before they
+are uploaded, each image is opened with Pillow to sniff its real format,
+rotated per its EXIF orientation, downscaled to fit MEDIA_IMAGE_MAX_DIMENSION
+and re-encoded as MEDIA_IMAGE_FORMAT (webp or jpeg) at MEDIA_IMAGE_QUALITY
+with no metadata. Encoding is CPU-bound, so it runs in a process pool of
+MEDIA_OPTIMIZE_PROCESSES; the pool is created on first use and reused. A file
+that is not a valid image is reported in its result (``error``) and does not
+stop the others.
+
+Pillow is optional: without it images are uploaded unchanged.
+"""
+from __future__ import annotations
+
+import io
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+try:
+    from PIL import Image, ImageOps, UnidentifiedImageError
+except ImportError:  # pragma: no cover - Pillow not installed
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+SOURCE_FORMATS = {"JPEG", "PNG", "WEBP", "MPO"}  # MPO: multi-picture JPEG from some phones
+
+_pool: ProcessPoolExecutor | None = None
+
+
+@dataclass
+class Optimized:
+    name: str
+    original_size: int
+    size: int
+    file: object
+    error: str = ""  # not a valid image; ``file`` is the original
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_size - self.size
+
+
+def enabled() -> bool:
+    if not getattr(settings, "MEDIA_OPTIMIZE_IMAGES", False):
+        return False
+    if Image is None:
+        logger.warning("MEDIA_OPTIMIZE_IMAGES is on but Pillow is not installed; uploading originals.")
+        return False
+    return True
+
+
+def optimize_image_bytes(data: bytes, max_dimension: int, quality: int, fmt: str) -> bytes:
+    """Re-encode one image; raises ValueError when the bytes are not a supported image."""
+    try:
+        img = Image.open(io.BytesIO(data))
+        source_format = img.format
+        img.load()
+    except (UnidentifiedImageError, OSError) as e:
+        raise ValueError("File is not a valid image.") from e
+    if source_format not in SOURCE_FORMATS:
+        raise ValueError(f"Image format {source_format} is not allowed.")
+
+    img = ImageOps.exif_transpose(img)
+    img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+    if fmt == "jpeg":
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        options = {"quality": quality, "optimize": True, "progressive": True}
+    else:
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+        options = {"quality": quality, "method": 4}
+    out = io.BytesIO()
+    # No exif/icc_profile arguments: the output carries no metadata.
+    img.save(out, format=fmt.upper(), **options)
+    return out.getvalue()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.MEDIA_OPTIMIZE_PROCESSES)
+    return _pool
+
+
+def _read(f) -> bytes:
+    if hasattr(f, "seek"):
+        f.seek(0)
+    data = f.read()
+    if hasattr(f, "seek"):
+        f.seek(0)
+    return data
+
+
+def _outcome(encode) -> tuple[bytes | None, str]:
+    try:
+        return encode(), ""
+    except ValueError as e:
+        return None, str(e)
+
+
+def optimize_images(files: list) -> list[Optimized]:
+    """
+    Optimize ``files`` (in order). Each result's ``file`` is a ContentFile with
+    the original name, ready to upload in place of the original, or the
+    original with ``error`` set when it is not a valid image.
+    """
+    if not files:
+        return []
+    fmt = settings.MEDIA_IMAGE_FORMAT
+    args = (settings.MEDIA_IMAGE_MAX_DIMENSION, settings.MEDIA_IMAGE_QUALITY, fmt)
+    originals = [_read(f) for f in files]
+    if settings.MEDIA_OPTIMIZE_PROCESSES > 1 and len(files) > 1:
+        futures = [_get_pool().submit(optimize_image_bytes, data, *args) for data in originals]
+        outcomes = [_outcome(future.result) for future in futures]
+    else:
+        outcomes = [_outcome(lambda data=data: optimize_image_bytes(data, *args)) for data in originals]
+
+    results = []
+    for f, data, (out, error) in zip(files, originals, outcomes):
+        # Keep the original name: upload results and job retries are keyed by it.
+        name = getattr(f, "name", "") or "image"
+        if error:
+            logger.warning("Not optimizing %s: %s", name, error)
+            results.append(Optimized(name=name, original_size=len(data), size=len(data), file=f, error=error))
+            continue
+        results.append(Optimized(name=name, original_size=len(data), size=len(out), file=ContentFile(out, name=name)))
+        logger.info("Optimized %s: %d -> %d bytes (%d saved)", name, len(data), len(out), len(data) - len(out))
+    return results
@@ -0,0 +1,111 @@
+"""
+Transactional outbox for Cloudinary asset deletion.
+
+Code that orphans an asset (property delete, media replaced or removed) calls
+record_media_deletions() inside its own transaction, so the MediaDeletion
+rows commit or roll back with the change. drain_media_outbox() then destroys
+them in batches through the media backend's bulk_destroy (Cloudinary's bulk
+delete API: up to 100 public_ids per call, one call per resource type) and
+retries failures with backoff.
+
+Draining happens right after commit when MEDIA_ASYNC is off, and in
+run_media_worker / ``manage.py drain_media_outbox`` otherwise.
+"""
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .backends import get_media_backend
+from .models import MediaDeletion
+
+logger = logging.getLogger(__name__)
+
+# Cloudinary's delete_resources accepts at most 100 public_ids per call.
+BULK_DELETE_LIMIT = 100
+
+
+def record_media_deletions(assets) -> list[int]:
+    """Add ``[(public_id, resource_type), ...]`` to the outbox; returns the new row ids."""
+    now = timezone.now()
+    rows = MediaDeletion.objects.bulk_create(
+        MediaDeletion(public_id=public_id, resource_type=resource_type, run_after=now)
+        for public_id, resource_type in dict.fromkeys(assets)
+        if public_id
+    )
+    return [row.pk for row in rows if row.pk is not None]
+
+
+def bulk_destroy(public_ids: list[str], resource_type: str) -> set[str]:
+    """Delete up to BULK_DELETE_LIMIT assets; returns the public_ids the backend confirmed gone."""
+    return get_media_backend().bulk_destroy(public_ids, resource_type)
+
+
+def _claim(ids=None, limit: int = 1000) -> list[MediaDeletion]:
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.MEDIA_JOB_LOCK_TIMEOUT)
+    with transaction.atomic():
+        qs = MediaDeletion.objects.select_for_update(skip_locked=True).filter(
+            Q(status=MediaDeletion.Status.PENDING, run_after__lte=now)
+            | Q(status=MediaDeletion.Status.RUNNING, locked_at__lt=stale)
+        )
+        if ids is not None:
+            qs = qs.filter(pk__in=ids)
+        rows = list(qs.order_by("run_after", "id")[:limit])
+        MediaDeletion.objects.filter(pk__in=[r.pk for r in rows]).update(
+            status=MediaDeletion.Status.RUNNING, locked_at=now
+        )
+    return rows
+
+
+def _failed(rows: list[MediaDeletion], error: str) -> None:
+    now = timezone.now()
+    for row in rows:
+        row.attempts += 1
+        row.last_error = error
+        row.locked_at = None
+        if row.attempts >= settings.MEDIA_JOB_MAX_ATTEMPTS:
+            row.status = MediaDeletion.Status.FAILED
+        else:
+            row.status = MediaDeletion.Status.PENDING
+            row.run_after = now + timedelta(
+                seconds=min(settings.MEDIA_JOB_BACKOFF_SECONDS * 2 ** (row.attempts - 1), 3600)
+            )
+    MediaDeletion.objects.bulk_update(rows, ["attempts", "last_error", "locked_at", "status", "run_after"])
+
+
+def drain_media_outbox(ids=None, limit: int = 1000) -> tuple[int, int]:
+    """Destroy due outbox rows (optionally only ``ids``); returns (deleted, failed)."""
+    rows = _claim(ids, limit)
+    if not rows:
+        return 0, 0
+
+    by_type: dict[str, list[MediaDeletion]] = defaultdict(list)
+    for row in rows:
+        by_type[row.resource_type].append(row)
+
+    deleted = failed = 0
+    for resource_type, group in by_type.items():
+        for start in range(0, len(group), BULK_DELETE_LIMIT):
+            batch = group[start:start + BULK_DELETE_LIMIT]
+            try:
+                gone = bulk_destroy([row.public_id for row in batch], resource_type)
+            except Exception as e:
+                logger.warning("Bulk delete of %d %s asset(s) failed: %s", len(batch), resource_type, e)
+                _failed(batch, str(e) or e.__class__.__name__)
+                failed += len(batch)
+                continue
+            done = [row.pk for row in batch if row.public_id in gone]
+            MediaDeletion.objects.filter(pk__in=done).delete()
+            deleted += len(done)
+            rest = [row for row in batch if row.public_id not in gone]
+            if rest:
+                _failed(rest, "Not confirmed deleted by Cloudinary")
+                failed += len(rest)
+    return deleted, failed
@@ -0,0 +1,197 @@
+"""
+Keyset (cursor) pagination.
+
+Instead of OFFSET/COUNT(*), each page is fetched with a WHERE clause on the
+ordering columns of the last row seen, plus ``id`` as a tiebreaker, e.g. for
+``-price``:
+
+    WHERE price < :p OR (price = :p AND id < :id) ORDER BY price DESC, id DESC
+
+so every page costs the same no matter how deep it is, and rows with equal
+prices are never skipped or repeated.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import datetime
+import decimal
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _with_tiebreaker(ordering) -> list[str]:
+    ordering = [o for o in ordering if isinstance(o, str)]
+    if not any(o.lstrip("-") in ("id", "pk") for o in ordering):
+        descending = bool(ordering) and ordering[0].startswith("-")
+        ordering.append("-id" if descending else "id")
+    return ordering
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
+
+
+def _row_value(obj, field: str):
+    value = obj
+    for part in field.split("__"):
+        value = getattr(value, part)
+    return value
+
+
+class Keyset:
+    """Ordering-aware helpers to fetch the rows before/after a keyset position."""
+
+    def __init__(self, ordering):
+        self.ordering = _with_tiebreaker(ordering)
+        self.fields = [o.lstrip("-") for o in self.ordering]
+
+    def values_for(self, obj) -> list:
+        return [_encode_value(_row_value(obj, f)) for f in self.fields]
+
+    def reversed_ordering(self) -> list[str]:
+        return [o[1:] if o.startswith("-") else "-" + o for o in self.ordering]
+
+    def seek(self, queryset, values, backwards: bool = False):
+        """Rows strictly after ``values`` (or strictly before when backwards)."""
+        clauses = []
+        for i, (order, field) in enumerate(zip(self.ordering, self.fields)):
+            descending = order.startswith("-") != backwards
+            lookup = f"{field}__lt" if descending else f"{field}__gt"
+            equal = {f: v for f, v in zip(self.fields[:i], values[:i])}
+            clauses.append(Q(**equal, **{lookup: values[i]}))
+        ordering = self.reversed_ordering() if backwards else self.ordering
+        return queryset.filter(reduce(or_, clauses)).order_by(*ordering)
+
+    def page(self, queryset, page_size: int, values=None, backwards: bool = False):
+        """
+        Return (rows, has_more). ``has_more`` is about the direction travelled:
+        more rows after the page going forwards, before it going backwards.
+        """
+        if values is None:
+            qs = queryset.order_by(*self.ordering)
+        else:
+            qs = self.seek(queryset, values, backwards=backwards)
+        rows = list(qs[: page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if backwards:
+            rows.reverse()
+        return rows, has_more
+
+
+def encode_cursor(values, backwards: bool = False) -> str:
+    payload = json.dumps({"v": values, "b": int(backwards)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Return (values, backwards); raises ValueError for a malformed cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = payload["v"]
+        if not isinstance(values, list):
+            raise ValueError("cursor values must be a list")
+        return values, bool(payload.get("b"))
+    except (TypeError, KeyError, UnicodeError, json.JSONDecodeError, binascii.Error) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def estimate_count(queryset) -> int | None:
+    """Row estimate from the Postgres planner (no COUNT(*)); None elsewhere."""
+    if connections[queryset.db].vendor != "postgresql":
+        return None
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination for any ordering applied by OrderingFilter, with ``id``
+    as tiebreaker. ``?estimate=1`` adds ``estimated_count`` from planner stats.
+    """
+
+    cursor_query_param = "cursor"
+    estimate_query_param = "estimate"
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.estimated_count = None
+        self.include_estimate = request.query_params.get(self.estimate_query_param) in ("1", "true")
+
+        ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+        keyset = Keyset(ordering)
+
+        raw = request.query_params.get(self.cursor_query_param)
+        values, backwards = None, False
+        if raw:
+            try:
+                values, backwards = decode_cursor(raw)
+            except ValueError:
+                raise NotFound(self.invalid_cursor_message)
+            if len(values) != len(keyset.fields):
+                raise NotFound(self.invalid_cursor_message)
+
+        try:
+            rows, has_more = keyset.page(queryset, self.page_size, values, backwards)
+        except (ValueError, TypeError, ValidationError):
+            # Cursor values that don't fit the ordering columns' types.
+            raise NotFound(self.invalid_cursor_message)
+
+        if self.include_estimate:
+            self.estimated_count = estimate_count(queryset)
+
+        self.next_cursor = self.previous_cursor = None
+        if rows:
+            if has_more or backwards:
+                self.next_cursor = encode_cursor(keyset.values_for(rows[-1]))
+            if values is not None and (has_more or not backwards):
+                self.previous_cursor = encode_cursor(keyset.values_for(rows[0]), backwards=True)
+        return rows
+
+    def _link(self, cursor):
+        if cursor is None:
+            return None
+        return replace_query_param(remove_query_param(self.base_url, "page"), self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        payload = {
+            "next": self._link(self.next_cursor),
+            "previous": self._link(self.previous_cursor),
+        }
+        if self.include_estimate:
+            payload["estimated_count"] = self.estimated_count
+        payload["results"] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "estimated_count": {"type": "integer", "nullable": True},
+                "results": schema,
+            },
+        }
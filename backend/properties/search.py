@@ -0,0 +1,290 @@
+"""
+Full-text search backends for property search: PropertyViewSet's ``?search=``
+and the lora_admin list / exports (config/admin_filters.py), both through
+search_properties().
+
+- Postgres: a ``search_vector`` tsvector column on properties_property, kept up
+  to date by triggers (title, location name/city, description weighted A/B/C)
+  and indexed with GIN; results are ranked with ts_rank.
+- SQLite: an FTS5 table (properties_property_fts) kept in sync by triggers;
+  results are ranked with bm25.
+- Anything else: DRF's icontains SearchFilter behaviour.
+
+The column/table and triggers live outside the Django models, so they are
+installed by migration 0007 and re-checked after every migrate (SQLite drops
+table triggers whenever a migration rebuilds properties_property). Such
+migrations must call drop_sqlite_search_triggers first: the trigger on
+locations_location names properties_property and breaks the rebuild.
+"""
+from __future__ import annotations
+
+import operator
+import re
+from functools import reduce
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from rest_framework.filters import OrderingFilter, SearchFilter
+
+PROPERTY_TABLE = "properties_property"
+LOCATION_TABLE = "locations_location"
+FTS_TABLE = "properties_property_fts"
+
+# What the icontains fallback searches; the full-text index covers the same columns.
+PROPERTY_SEARCH_FIELDS = ("title", "description", "location__name", "location__city")
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def search_tokens(terms) -> list[str]:
+    """Lowercased word tokens; anything else (quotes, operators) is dropped."""
+    return _TOKEN_RE.findall(" ".join(terms).lower())
+
+
+# --- Backends ---
+
+
+class IContainsSearchBackend:
+    """Unindexed fallback, as DRF's SearchFilter: every term icontains any of PROPERTY_SEARCH_FIELDS."""
+
+    ranked = False
+
+    def search(self, queryset, terms):
+        for term in terms:
+            queryset = queryset.filter(
+                reduce(operator.or_, (Q(**{f"{field}__icontains": term}) for field in PROPERTY_SEARCH_FIELDS))
+            )
+        return queryset
+
+
+class PostgresSearchBackend:
+    ranked = True
+    config = "simple"
+
+    def search(self, queryset, terms):
+        tokens = search_tokens(terms)
+        if not tokens:
+            return queryset
+        # Prefix match every token: "oyst bay" -> 'oyst':* & 'bay':*
+        tsquery = " & ".join(f"{t}:*" for t in tokens)
+        vector = f'"{PROPERTY_TABLE}"."search_vector"'
+        return queryset.filter(
+            RawSQL(f"{vector} @@ to_tsquery(%s, %s)", (self.config, tsquery), output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(f"ts_rank({vector}, to_tsquery(%s, %s))", (self.config, tsquery), output_field=FloatField())
+        )
+
+
+class SQLiteFTS5SearchBackend:
+    ranked = True
+    # bm25 column weights: title, location, description
+    weights = (10.0, 5.0, 1.0)
+
+    def search(self, queryset, terms):
+        tokens = search_tokens(terms)
+        if not tokens:
+            return queryset
+        match = " ".join(f'"{t}"*' for t in tokens)
+        weights = ", ".join(str(w) for w in self.weights)
+        # bm25() is lower-is-better, so negate it to sort like ts_rank.
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", (match,))
+        ).annotate(
+            search_rank=RawSQL(
+                f"SELECT -bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} "
+                f'WHERE {FTS_TABLE} MATCH %s AND rowid = "{PROPERTY_TABLE}"."id"',
+                (match,),
+                output_field=FloatField(),
+            )
+        )
+
+
+def get_search_backend(alias: str = "default"):
+    path = getattr(settings, "PROPERTY_SEARCH_BACKEND", "")
+    if path:
+        return import_string(path)()
+    vendor = connections[alias].vendor
+    if vendor == "postgresql":
+        return PostgresSearchBackend()
+    if vendor == "sqlite" and _sqlite_fts_installed(connections[alias]):
+        return SQLiteFTS5SearchBackend()
+    return IContainsSearchBackend()
+
+
+def search_properties(queryset, terms):
+    """
+    ``queryset`` narrowed to the properties matching every search term,
+    annotated with ``search_rank`` by the ranked backends.
+    """
+    if not terms:
+        return queryset
+    return get_search_backend(queryset.db).search(queryset, terms)
+
+
+# --- DRF filters ---
+
+
+class PropertySearchFilter(SearchFilter):
+    """``?search=`` through the configured full-text backend."""
+
+    def filter_queryset(self, request, queryset, view):
+        return search_properties(queryset, self.get_search_terms(request))
+
+
+class PropertyOrderingFilter(OrderingFilter):
+    """Order ranked search results by relevance unless ``?ordering=`` is given."""
+
+    def get_ordering(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param) and "search_rank" in queryset.query.annotations:
+            return ["-search_rank", *(self.get_default_ordering(view) or [])]
+        return super().get_ordering(request, queryset, view)
+
+
+# --- Schema (column/table + triggers) ---
+
+
+_POSTGRES_SQL = f"""
+ALTER TABLE {PROPERTY_TABLE} ADD COLUMN IF NOT EXISTS search_vector tsvector;
+CREATE INDEX IF NOT EXISTS prop_search_vector_idx ON {PROPERTY_TABLE} USING GIN (search_vector);
+
+CREATE OR REPLACE FUNCTION properties_property_search_update() RETURNS trigger AS $$
+BEGIN
+    SELECT setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(l.name, '') || ' ' || coalesce(l.city, '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'C')
+      INTO NEW.search_vector
+      FROM {LOCATION_TABLE} l WHERE l.id = NEW.location_id;
+    RETURN NEW;
+END $$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS properties_property_search_trg ON {PROPERTY_TABLE};
+CREATE TRIGGER properties_property_search_trg
+    BEFORE INSERT OR UPDATE OF title, description, location_id ON {PROPERTY_TABLE}
+    FOR EACH ROW EXECUTE FUNCTION properties_property_search_update();
+
+CREATE OR REPLACE FUNCTION locations_location_search_update() RETURNS trigger AS $$
+BEGIN
+    IF NEW.name IS DISTINCT FROM OLD.name OR NEW.city IS DISTINCT FROM OLD.city THEN
+        UPDATE {PROPERTY_TABLE} SET title = title WHERE location_id = NEW.id;
+    END IF;
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS locations_location_search_trg ON {LOCATION_TABLE};
+CREATE TRIGGER locations_location_search_trg
+    AFTER UPDATE ON {LOCATION_TABLE}
+    FOR EACH ROW EXECUTE FUNCTION locations_location_search_update();
+"""
+
+_POSTGRES_BACKFILL_SQL = f"UPDATE {PROPERTY_TABLE} SET title = title WHERE search_vector IS NULL"
+
+_POSTGRES_DROP_SQL = f"""
+DROP TRIGGER IF EXISTS locations_location_search_trg ON {LOCATION_TABLE};
+DROP TRIGGER IF EXISTS properties_property_search_trg ON {PROPERTY_TABLE};
+DROP FUNCTION IF EXISTS locations_location_search_update();
+DROP FUNCTION IF EXISTS properties_property_search_update();
+DROP INDEX IF EXISTS prop_search_vector_idx;
+ALTER TABLE {PROPERTY_TABLE} DROP COLUMN IF EXISTS search_vector;
+"""
+
+_SQLITE_FTS_ROW = (
+    "SELECT p.id, p.title, l.name || ' ' || l.city, p.description "
+    f"FROM {PROPERTY_TABLE} p JOIN {LOCATION_TABLE} l ON l.id = p.location_id"
+)
+
+_SQLITE_TRIGGERS = {
+    "properties_property_fts_ai": f"""
+        CREATE TRIGGER properties_property_fts_ai AFTER INSERT ON {PROPERTY_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, title, location, description)
+            {_SQLITE_FTS_ROW} WHERE p.id = NEW.id;
+        END""",
+    "properties_property_fts_au": f"""
+        CREATE TRIGGER properties_property_fts_au
+        AFTER UPDATE OF title, description, location_id ON {PROPERTY_TABLE} BEGIN
+            DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id;
+            INSERT INTO {FTS_TABLE}(rowid, title, location, description)
+            {_SQLITE_FTS_ROW} WHERE p.id = NEW.id;
+        END""",
+    "properties_property_fts_ad": f"""
+        CREATE TRIGGER properties_property_fts_ad AFTER DELETE ON {PROPERTY_TABLE} BEGIN
+            DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id;
+        END""",
+    "locations_location_fts_au": f"""
+        CREATE TRIGGER locations_location_fts_au AFTER UPDATE OF name, city ON {LOCATION_TABLE} BEGIN
+            DELETE FROM {FTS_TABLE}
+             WHERE rowid IN (SELECT id FROM {PROPERTY_TABLE} WHERE location_id = NEW.id);
+            INSERT INTO {FTS_TABLE}(rowid, title, location, description)
+            {_SQLITE_FTS_ROW} WHERE p.location_id = NEW.id;
+        END""",
+}
+
+
+_fts_installed_aliases: set[str] = set()
+
+
+def _sqlite_has_fts5(connection) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any("FTS5" in row[0] for row in cursor.fetchall())
+
+
+def _sqlite_fts_installed(connection) -> bool:
+    # Only a positive answer is remembered: the table can appear later in the
+    # process lifetime (migrate), but is never dropped outside a migration.
+    if connection.alias in _fts_installed_aliases:
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        found = cursor.fetchone() is not None
+    if found:
+        _fts_installed_aliases.add(connection.alias)
+    return found
+
+
+def install_search_index(connection) -> None:
+    """Create the search column/table and triggers if missing (idempotent)."""
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(_POSTGRES_SQL)
+            cursor.execute(_POSTGRES_BACKFILL_SQL)
+        return
+    if connection.vendor != "sqlite" or not _sqlite_has_fts5(connection):
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in _SQLITE_TRIGGERS if name not in existing]
+        if not missing and _sqlite_fts_installed(connection):
+            return
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "title, location, description, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        for name in missing:
+            cursor.execute(_SQLITE_TRIGGERS[name])
+        # Triggers were missing, so rows may have changed unseen: rebuild.
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(f"INSERT INTO {FTS_TABLE}(rowid, title, location, description) {_SQLITE_FTS_ROW}")
+
+
+def drop_sqlite_search_triggers(connection) -> None:
+    """Drop the SQLite triggers before a table rebuild; post_migrate reinstalls them."""
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            for name in _SQLITE_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def uninstall_search_index(connection) -> None:
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(_POSTGRES_DROP_SQL)
+    elif connection.vendor == "sqlite":
+        drop_sqlite_search_triggers(connection)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        _fts_installed_aliases.discard(connection.alias)
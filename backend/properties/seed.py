@@ -0,0 +1,289 @@
+"""
+Synthetic catalog generator for load and scale testing (``manage.py seed_scale``).
+
+Everything is drawn from one random.Random(seed), so the same arguments give
+the same data. Distributions are shaped like the real catalog rather than
+uniform:
+
+- location popularity is Zipf-like (a few areas hold most listings);
+- prices are log-normal around a median per currency, listing type and
+  property type, so there is a long tail of expensive listings;
+- gallery sizes are gamma-distributed (mostly 4-12 images, some empty,
+  a few large), capped at MAX_GALLERY;
+- listings, bookings and inquiries are denser in recent months.
+
+Rows are written with bulk_create, one transaction per batch of properties
+together with their gallery images, bookings and inquiries, so memory stays
+flat. Seeded media have no public_id: deleting seeded listings never calls
+the media backend.
+"""
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import dataclass
+from datetime import time, timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from bookings.models import Booking
+from inquiries.models import Inquiry
+from locations.models import Location
+
+from .bench import explicit_timestamps
+from .models import Property, PropertyImage
+
+AREAS = (
+    "Masaki", "Oyster Bay", "Msasani", "Mikocheni", "Mbezi Beach", "Kawe", "Regent Estate", "Upanga",
+    "Sinza", "Kinondoni", "Kijitonyama", "Mwenge", "Tegeta", "Bunju", "Goba", "Kimara", "Kigamboni",
+    "Ilala", "Kariakoo", "Temeke", "Mbagala", "Ada Estate", "Mwananyamala", "Tabata", "Ubungo",
+)
+# (city, share of locations)
+CITIES = (("Dar es Salaam", 0.7), ("Arusha", 0.12), ("Zanzibar", 0.08), ("Dodoma", 0.05), ("Mwanza", 0.05))
+ZIPF_EXPONENT = 1.1
+
+# Median prices: (currency, listing_type) -> amount; rent is per month.
+MEDIAN_PRICE = {
+    ("TZS", "rent"): 1_500_000,
+    ("TZS", "sale"): 250_000_000,
+    ("USD", "rent"): 1_200,
+    ("USD", "sale"): 180_000,
+}
+PROPERTY_TYPE_PRICE_FACTOR = {"apartment": 1.0, "house": 1.6, "land": 0.5, "commercial": 2.2}
+PROPERTY_TYPE_WEIGHTS = {"apartment": 45, "house": 35, "land": 12, "commercial": 8}
+PRICE_SIGMA = 0.7
+USD_SHARE = 0.3
+RENT_SHARE = 0.6
+
+MAX_GALLERY = 30
+HISTORY_DAYS = 730
+IMAGE_SIZE = (1280, 853)
+
+FEATURES = (
+    "secure parking", "a backup generator", "a borehole", "24-hour security", "a swimming pool",
+    "a rooftop terrace", "an ocean view", "a fitted kitchen", "air conditioning", "a large garden",
+    "staff quarters", "fibre internet", "a gym",
+)
+FIRST_NAMES = ("Amina", "Baraka", "Neema", "Juma", "Rehema", "Emmanuel", "Grace", "Hassan", "Zawadi", "David")
+LAST_NAMES = ("Mushi", "Mwakyusa", "Kimaro", "Said", "Njau", "Lyimo", "Omari", "Massawe", "Shayo", "Mrema")
+
+
+@dataclass
+class SeedResult:
+    locations: int = 0
+    properties: int = 0
+    images: int = 0
+    bookings: int = 0
+    inquiries: int = 0
+
+
+def _ago(rng: random.Random, now):
+    # sqrt skews towards recent: half of all rows fall in the last ~quarter of the history.
+    return now - timedelta(minutes=int(HISTORY_DAYS * 24 * 60 * (1 - math.sqrt(rng.random()))))
+
+
+def _count(rng: random.Random, mean: float) -> int:
+    """Poisson-like count with the given mean (exponential gaps), cheap for small means."""
+    n, total = 0, rng.expovariate(1.0)
+    while total < mean:
+        n += 1
+        total += rng.expovariate(1.0)
+    return n
+
+
+def _phone(rng: random.Random) -> str:
+    return f"+2557{rng.randint(10_000_000, 99_999_999)}"
+
+
+def seed_locations(rng: random.Random, count: int) -> tuple[list[int], list[float]]:
+    """Create (or reuse) ``count`` locations; returns their ids and cumulative Zipf weights."""
+    cities = [c for c, _ in CITIES]
+    shares = [s for _, s in CITIES]
+    wanted = []
+    for i in range(count):
+        area = AREAS[i % len(AREAS)]
+        name = area if i < len(AREAS) else f"{area} {i // len(AREAS) + 1}"
+        wanted.append((name, rng.choices(cities, shares)[0]))
+    Location.objects.bulk_create([Location(name=n, city=c) for n, c in wanted], ignore_conflicts=True)
+    by_key = {
+        (name, city): pk
+        for pk, name, city in Location.objects.filter(name__in={n for n, _ in wanted}).values_list("id", "name", "city")
+    }
+    ids = [by_key[key] for key in wanted]
+    rng.shuffle(ids)  # popularity rank independent of creation order
+    return ids, list(accumulate(1 / (rank ** ZIPF_EXPONENT) for rank in range(1, len(ids) + 1)))
+
+
+def _property(rng: random.Random, i: int, location_id: int, area_names: dict, now) -> Property:
+    property_type = rng.choices(list(PROPERTY_TYPE_WEIGHTS), list(PROPERTY_TYPE_WEIGHTS.values()))[0]
+    listing_type = "rent" if rng.random() < RENT_SHARE else "sale"
+    currency = "USD" if rng.random() < USD_SHARE else "TZS"
+    median = MEDIAN_PRICE[(currency, listing_type)] * PROPERTY_TYPE_PRICE_FACTOR[property_type]
+    step = 10_000 if currency == "TZS" else 50
+    price = max(step, round(median * rng.lognormvariate(0, PRICE_SIGMA) / step) * step)
+
+    residential = property_type in ("apartment", "house")
+    bedrooms = min(8, 1 + int(rng.expovariate(0.6))) if residential else None
+    area = area_names[location_id]
+    if residential:
+        title = f"{bedrooms}-bedroom {property_type} in {area}"
+    elif property_type == "land":
+        title = f"Plot for sale in {area}" if listing_type == "sale" else f"Land to let in {area}"
+    else:
+        title = f"Commercial space in {area}"
+    features = ", ".join(rng.sample(FEATURES, 3))
+    if listing_type == "rent":
+        availability = rng.choices(["available", "occupied", "booked"], [70, 20, 10])[0]
+    else:
+        availability = "available" if rng.random() < 0.9 else "occupied"
+    return Property(
+        title=title,
+        description=f"Listing #{i} in {area} with {features}.",
+        property_type=property_type,
+        listing_type=listing_type,
+        price=Decimal(price),
+        currency=currency,
+        location_id=location_id,
+        bedrooms=bedrooms,
+        bathrooms=max(1, bedrooms - rng.randint(0, 1)) if bedrooms else None,
+        area_size=Decimal(int(rng.lognormvariate(math.log(900 if property_type == "land" else 140), 0.5))),
+        featured=rng.random() < 0.04,
+        published=rng.random() < 0.92,
+        availability=availability,
+        contact_phone=_phone(rng),
+        created_at=_ago(rng, now),
+    )
+
+
+# Child rows are plain tuples in these column orders (see _insert).
+IMAGE_COLUMNS = ("property_id", "url", "width", "height", "sort_order", "visible", "created_at")
+BOOKING_COLUMNS = (
+    "property_id", "full_name", "email", "phone", "preferred_date", "preferred_time", "message", "status", "created_at",
+)
+INQUIRY_COLUMNS = ("property_id", "full_name", "email", "phone", "message", "created_at")
+
+
+def _insert(model, columns, rows) -> None:
+    """
+    executemany() INSERT of value tuples. Children need no pks back, and
+    skipping model instances and bulk_create's per-value SQL compilation
+    makes seeding several times faster. Fields left out get their defaults.
+    """
+    if not rows:
+        return
+    connection = connections[router.db_for_write(model)]
+    ops = connection.ops
+    fields = [model._meta.get_field(c) for c in columns]
+    defaults = [f for f in model._meta.concrete_fields if not f.primary_key and f.attname not in columns]
+    adapters = {
+        "DateTimeField": ops.adapt_datetimefield_value,
+        "DateField": ops.adapt_datefield_value,
+        "TimeField": ops.adapt_timefield_value,
+    }
+    adapt = [(i, adapters[f.get_internal_type()]) for i, f in enumerate(fields) if f.get_internal_type() in adapters]
+    default_values = tuple(f.get_db_prep_save(f.get_default(), connection) for f in defaults)
+    names = ", ".join(ops.quote_name(f.column) for f in fields + defaults)
+    placeholders = ", ".join(["%s"] * (len(fields) + len(defaults)))
+    sql = f"INSERT INTO {ops.quote_name(model._meta.db_table)} ({names}) VALUES ({placeholders})"
+    params = []
+    for row in rows:
+        row = list(row)
+        for i, fn in adapt:
+            row[i] = fn(row[i])
+        params.append((*row, *default_values))
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+
+
+def _image_url(property_index: int, n: int) -> str:
+    width, height = IMAGE_SIZE
+    return f"https://picsum.photos/seed/lora-{property_index}-{n}/{width}/{height}"
+
+
+def seed_scale(
+    properties: int,
+    *,
+    locations: int = 300,
+    seed: int = 1,
+    batch_size: int = 2000,
+    images: float = 8.0,
+    bookings: float = 0.3,
+    inquiries: float = 0.5,
+    progress=None,
+) -> SeedResult:
+    """
+    Add ``properties`` listings with galleries (mean ``images`` each), bookings
+    and inquiries (mean per listing). ``progress(result)`` is called after each batch.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    result = SeedResult()
+    location_ids, cum_weights = seed_locations(rng, locations)
+    result.locations = len(location_ids)
+    area_names = dict(Location.objects.filter(id__in=location_ids).values_list("id", "name"))
+    statuses = [c for c, _ in Booking.Status.choices]
+
+    with explicit_timestamps(Property):
+        for start in range(0, properties, batch_size):
+            count = min(batch_size, properties - start)
+            chosen = rng.choices(location_ids, cum_weights=cum_weights, k=count)
+            props = [_property(rng, start + k, loc, area_names, now) for k, loc in enumerate(chosen)]
+            sizes = [
+                0 if rng.random() < 0.08 else min(MAX_GALLERY, 1 + int(rng.gammavariate(2.0, max(images - 1, 0.1) / 2)))
+                for _ in props
+            ]
+            width, height = IMAGE_SIZE
+            for k, (prop, size) in enumerate(zip(props, sizes)):
+                if size:
+                    prop.main_image = _image_url(start + k, 0)
+                    prop.main_image_width, prop.main_image_height = width, height
+            with transaction.atomic():
+                Property.objects.bulk_create(props)  # sets pks on Postgres and SQLite >= 3.35
+                gallery, booking_rows, inquiry_rows = [], [], []
+                for k, (prop, size) in enumerate(zip(props, sizes)):
+                    for n in range(size):
+                        gallery.append(
+                            (prop.pk, _image_url(start + k, n + 1), width, height, n, rng.random() < 0.95, prop.created_at)
+                        )
+                    # Featured listings draw more interest.
+                    interest = 3 if prop.featured else 1
+                    for _ in range(_count(rng, bookings * interest)):
+                        created = prop.created_at + (now - prop.created_at) * rng.random()
+                        booking_rows.append(
+                            (
+                                prop.pk,
+                                f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                                f"guest{rng.randint(1, 10**6)}@example.com",
+                                _phone(rng),
+                                (created + timedelta(days=rng.randint(1, 21))).date(),
+                                time(rng.randint(8, 17), rng.choice((0, 30))),
+                                "",
+                                rng.choices(statuses, [35, 30, 25, 10])[0],
+                                created,
+                            )
+                        )
+                    for _ in range(_count(rng, inquiries * interest)):
+                        inquiry_rows.append(
+                            (
+                                # Some come from the general contact form.
+                                prop.pk if rng.random() < 0.9 else None,
+                                f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                                f"lead{rng.randint(1, 10**6)}@example.com",
+                                _phone(rng),
+                                f"Hello, is the listing \"{prop.title}\" still available?",
+                                prop.created_at + (now - prop.created_at) * rng.random(),
+                            )
+                        )
+                _insert(PropertyImage, IMAGE_COLUMNS, gallery)
+                _insert(Booking, BOOKING_COLUMNS, booking_rows)
+                _insert(Inquiry, INQUIRY_COLUMNS, inquiry_rows)
+            result.properties += count
+            result.images += len(gallery)
+            result.bookings += len(booking_rows)
+            result.inquiries += len(inquiry_rows)
+            if progress is not None:
+                progress(result)
+    return result
@@ -3,16 +3,42 @@ from rest_framework import serializers
 from locations.models import Location
 from locations.serializers import LocationSerializer
 
+from .images import build_srcset, image_variants
 from .models import Property, PropertyImage
 
 
+class MainImageVariantsMixin(serializers.Serializer):
+    """Resized main_image URLs by width, and the matching srcset string."""
+
+    main_image_variants = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
+
+    def _main_variants(self, obj):
+        # Both fields need the same dict; build it once per object.
+        cached = getattr(obj, "_main_image_variants", None)
+        if cached is None:
+            cached = obj._main_image_variants = image_variants(obj.main_image, obj.main_image_public_id)
+        return cached
+
+    def get_main_image_variants(self, obj):
+        return self._main_variants(obj)
+
+    def get_srcset(self, obj):
+        return build_srcset(self._main_variants(obj))
+
+
 class PropertyImageSerializer(serializers.ModelSerializer):
+    srcset = serializers.SerializerMethodField()
+
+    def get_srcset(self, obj):
+        return build_srcset(image_variants(obj.url, obj.public_id))
+
     class Meta:
         model = PropertyImage
-        fields = ("id", "url", "sort_order")
+        fields = ("id", "url", "srcset", "placeholder", "width", "height", "sort_order")
 
 
-class PropertyListSerializer(serializers.ModelSerializer):
+class PropertyListSerializer(MainImageVariantsMixin, serializers.ModelSerializer):
     location = LocationSerializer(read_only=True)
     main_image = serializers.URLField(allow_blank=True, required=False)
 
@@ -33,13 +59,19 @@ class PropertyListSerializer(serializers.ModelSerializer):
             "published",
             "availability",
             "main_image",
+            "main_image_variants",
+            "srcset",
+            "main_image_placeholder",
+            "main_image_width",
+            "main_image_height",
             "video_url",
+            "media_status",
             "created_at",
             "updated_at",
         )
 
 
-class PropertyDetailSerializer(serializers.ModelSerializer):
+class PropertyDetailSerializer(MainImageVariantsMixin, serializers.ModelSerializer):
     location = LocationSerializer(read_only=True)
     location_id = serializers.PrimaryKeyRelatedField(
         source="location", queryset=Location.objects.all(), write_only=True
@@ -47,8 +79,7 @@ class PropertyDetailSerializer(serializers.ModelSerializer):
     gallery_images = serializers.SerializerMethodField()
 
     def get_gallery_images(self, obj):
-        imgs = obj.gallery_images.filter(visible=True).order_by("sort_order", "id")
-        return PropertyImageSerializer(imgs, many=True).data
+        return PropertyImageSerializer(obj.get_visible_gallery(), many=True).data
 
     class Meta:
         model = Property
@@ -69,7 +100,13 @@ class PropertyDetailSerializer(serializers.ModelSerializer):
             "published",
             "availability",
             "main_image",
+            "main_image_variants",
+            "srcset",
+            "main_image_placeholder",
+            "main_image_width",
+            "main_image_height",
             "video_url",
+            "media_status",
             "gallery_images",
             "contact_phone",
             "contact_whatsapp",
@@ -95,6 +132,9 @@ class PropertyWriteSerializer(serializers.ModelSerializer):
         child=serializers.ImageField(), write_only=True, required=False, allow_empty=True
     )
     video_file = serializers.FileField(write_only=True, required=False, allow_null=True)
+    # "file name: error" for each file that failed to upload. The property and
+    # the rest of its media are saved regardless, so this is not a 400.
+    media_errors = serializers.SerializerMethodField()
 
     class Meta:
         model = Property
@@ -118,7 +158,13 @@ class PropertyWriteSerializer(serializers.ModelSerializer):
             "main_image_file",
             "gallery_files",
             "video_file",
+            "media_status",
+            "media_errors",
         )
+        read_only_fields = ("media_status",)
+
+    def get_media_errors(self, obj) -> list[str]:
+        return getattr(self, "_media_errors", [])
 
     def validate_video_file(self, f):
         if f is None:
@@ -129,18 +175,19 @@ class PropertyWriteSerializer(serializers.ModelSerializer):
         return f
 
     def create(self, validated_data):
-        from .services import upload_property_media
+        from .services import save_property_media
 
         main_image_file = validated_data.pop("main_image_file", None)
         gallery_files = validated_data.pop("gallery_files", [])
         video_file = validated_data.pop("video_file", None)
 
         prop = Property.objects.create(**validated_data)
-        upload_property_media(prop, main_image_file=main_image_file, gallery_files=gallery_files, video_file=video_file)
+        result = save_property_media(prop, main_image_file=main_image_file, gallery_files=gallery_files, video_file=video_file)
+        self._media_errors = [f"{name}: {error}" for name, error in result.failed]
         return prop
 
     def update(self, instance, validated_data):
-        from .services import upload_property_media
+        from .services import save_property_media
 
         main_image_file = validated_data.pop("main_image_file", None)
         gallery_files = validated_data.pop("gallery_files", None)
@@ -150,6 +197,97 @@ class PropertyWriteSerializer(serializers.ModelSerializer):
             setattr(instance, k, v)
         instance.save()
 
-        upload_property_media(instance, main_image_file=main_image_file, gallery_files=gallery_files, video_file=video_file)
+        result = save_property_media(instance, main_image_file=main_image_file, gallery_files=gallery_files, video_file=video_file)
+        self._media_errors = [f"{name}: {error}" for name, error in result.failed]
         return instance
 
+
+# PropertyWriteSerializer fields an imported row does not set: the id,
+# location_id (given by name/city instead), and media.
+_IMPORT_EXCLUDED_FIELDS = (
+    "id",
+    "location_id",
+    "media_status",
+    "media_errors",
+    "main_image_file",
+    "gallery_files",
+    "video_file",
+)
+
+
+class PropertyImportSerializer(PropertyWriteSerializer):
+    """
+    One row of ``manage.py import_properties``: PropertyWriteSerializer's field
+    rules, with the location given by name/city (resolved by the command
+    through a cache, not a query per row) and no media files.
+    """
+
+    location_id = None
+    main_image_file = None
+    gallery_files = None
+    video_file = None
+    media_errors = None
+    location_name = serializers.CharField(max_length=120)
+    location_city = serializers.CharField(max_length=120, required=False, allow_blank=True)
+
+    class Meta(PropertyWriteSerializer.Meta):
+        fields = tuple(f for f in PropertyWriteSerializer.Meta.fields if f not in _IMPORT_EXCLUDED_FIELDS) + (
+            "location_name",
+            "location_city",
+        )
+        read_only_fields = ()
+
+
+MEDIA_KINDS = ("main", "gallery", "video")
+
+
+class DirectUploadSignSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=MEDIA_KINDS)
+
+
+class UploadedAssetSerializer(serializers.Serializer):
+    """Fields of a Cloudinary upload response needed to verify it."""
+
+    public_id = serializers.CharField(max_length=255)
+    version = serializers.IntegerField(min_value=1)
+    signature = serializers.CharField(max_length=128)
+    format = serializers.CharField(max_length=10)
+    width = serializers.IntegerField(min_value=1, required=False)
+    height = serializers.IntegerField(min_value=1, required=False)
+
+
+class DirectUploadAttachSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=MEDIA_KINDS)
+    assets = UploadedAssetSerializer(many=True, allow_empty=False)
+    replace_gallery = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        if attrs["kind"] != "gallery" and len(attrs["assets"]) != 1:
+            raise serializers.ValidationError({"assets": "Exactly one asset for main/video."})
+        return attrs
+
+
+class GalleryImageEditSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    sort_order = serializers.IntegerField(min_value=0, required=False)
+    visible = serializers.BooleanField(required=False)
+
+
+class GalleryEditSerializer(serializers.Serializer):
+    """Batch gallery edit: per-image sort_order/visible changes and ids to delete."""
+
+    images = GalleryImageEditSerializer(many=True, required=False)
+    delete = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+    def edit_kwargs(self) -> dict:
+        images = self.validated_data.get("images", [])
+        return {
+            "order": {img["id"]: img["sort_order"] for img in images if "sort_order" in img},
+            "visible": {img["id"]: img["visible"] for img in images if "visible" in img},
+            "delete": self.validated_data.get("delete", []),
+        }
+
+
+class GalleryImageAdminSerializer(PropertyImageSerializer):
+    class Meta(PropertyImageSerializer.Meta):
+        fields = (*PropertyImageSerializer.Meta.fields, "visible")
@@ -1,19 +1,30 @@
 from __future__ import annotations
 
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 from typing import Iterable
 
-import cloudinary
-import cloudinary.uploader
-from django.db import transaction
+from django.conf import settings
+from django.db import connection, transaction
 
+from . import assets, optimize
+from .backends import _file_size, get_media_backend
 from .models import Property, PropertyImage
+from .placeholders import describe_image
 
-ALLOWED_IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".webp")
+logger = logging.getLogger(__name__)
 
+ALLOWED_IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".webp")
 
-def _cloudinary_configured() -> bool:
-    config = cloudinary.config()
-    return bool(config.cloud_name and config.api_key and config.api_secret)
+# Upload slot -> (resource_type, folder) on the media backend (backends.py)
+MEDIA_FOLDERS = {
+    "main": ("image", "lora/properties"),
+    "gallery": ("image", "lora/properties/gallery"),
+    "video": ("video", "lora/properties/videos"),
+}
 
 
 def _validate_image_file(f) -> None:
@@ -28,17 +39,169 @@ def _validate_video_file(f) -> None:
         raise ValueError("Video must be an mp4 file.")
 
 
-def destroy_cloudinary_asset(public_id: str, resource_type: str) -> None:
-    if not public_id:
+@dataclass
+class MediaUploadResult:
+    """What upload_property_media stored, and which files failed to upload."""
+
+    uploaded: list[str] = field(default_factory=list)
+    failed: list[tuple[str, str]] = field(default_factory=list)  # (file name, error)
+    queued: bool = False  # handed to the background worker (MEDIA_ASYNC)
+    optimized: list[tuple[str, int, int]] = field(default_factory=list)  # (file name, bytes before, after)
+    reused: list[str] = field(default_factory=list)  # identical content already uploaded; not uploaded again
+    invalid: list[str] = field(default_factory=list)  # in ``failed`` because the file itself is bad; retrying won't help
+
+    @property
+    def bytes_saved(self) -> int:
+        return sum(before - after for _, before, after in self.optimized)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    def error_message(self) -> str:
+        return "; ".join(f"{name}: {error}" for name, error in self.failed)
+
+
+@dataclass
+class _Upload:
+    kind: str  # "main" | "gallery" | "video"
+    file: object
+    resource_type: str
+    folder: str
+    response: dict | None = None
+    error: str = ""
+    sha256: str = ""
+    reused: bool = False  # response is an already-registered MediaAsset
+
+    @property
+    def name(self) -> str:
+        return getattr(self.file, "name", "") or self.kind
+
+
+def _upload_one(upload: _Upload, backend) -> dict:
+    """Single-shot upload, or upload_large (resumable chunks) for videos over MEDIA_CHUNKED_UPLOAD_THRESHOLD bytes."""
+    if upload.resource_type == "video" and _file_size(upload.file) > settings.MEDIA_CHUNKED_UPLOAD_THRESHOLD:
+        return backend.upload_large(
+            upload.file,
+            resource_type=upload.resource_type,
+            folder=upload.folder,
+            key=getattr(upload.file, "resume_key", ""),
+        )
+    return backend.upload(upload.file, resource_type=upload.resource_type, folder=upload.folder)
+
+
+def _run_uploads(uploads: list[_Upload], backend, workers: int) -> None:
+    def run(upload: _Upload) -> None:
+        try:
+            # Measured locally (after any EXIF rotation), so it wins over the response's size.
+            info = describe_image(upload.file) if upload.resource_type == "image" else {}
+            upload.response = {**_upload_one(upload, backend), **info}
+        except Exception as e:
+            logger.warning("Media upload failed for %s: %s", upload.name, e)
+            upload.error = str(e) or e.__class__.__name__
+
+    def run_pooled(upload: _Upload) -> None:
+        try:
+            run(upload)
+        finally:
+            # chunked_upload keeps its UploadSession in the database, which
+            # opens a connection for this pool thread; close it with the thread.
+            connection.close()
+
+    if workers <= 1 or len(uploads) <= 1:
+        for upload in uploads:
+            run(upload)
         return
-    try:
-        cloudinary.uploader.destroy(public_id, resource_type=resource_type, invalidate=True)
-    except Exception:
-        # Avoid breaking deletes/updates if Cloudinary cleanup fails.
-        pass
+    with ThreadPoolExecutor(max_workers=min(workers, len(uploads))) as pool:
+        list(pool.map(run_pooled, uploads))
+
+
+def destroy_media_assets(to_release) -> None:
+    """
+    Release one reference to each of ``[(public_id, resource_type), ...]`` and
+    record those no longer referenced (assets.release) in the deletion outbox,
+    as part of the current transaction. With MEDIA_ASYNC off they are
+    bulk-deleted right after commit; otherwise run_media_worker drains them.
+    """
+    from .outbox import drain_media_outbox, record_media_deletions
+
+    with transaction.atomic():
+        ids = record_media_deletions(assets.release(to_release))
+    if ids and not getattr(settings, "MEDIA_ASYNC", False):
+        transaction.on_commit(lambda: drain_media_outbox(ids))
+
+
+def attach_property_media(
+    prop: Property,
+    *,
+    main: dict | None = None,
+    gallery: list[dict] | None = None,
+    video: dict | None = None,
+    replace_gallery: bool = False,
+) -> None:
+    """
+    Store already-uploaded Cloudinary assets (upload responses with secure_url
+    and public_id; images may also carry placeholder, width and height) on
+    the property in one transaction. Replaced assets go to
+    the deletion outbox; gallery rows are appended (or replace the gallery).
+    """
+    gallery = gallery or []
+    replaced: list[tuple[str, str]] = []
+    with transaction.atomic():
+        # Acquire before releasing what is replaced: re-attaching the asset
+        # a field already holds must not destroy it.
+        assets.acquire(res.get("public_id", "") for res in [main, video, *gallery] if res)
+        update_fields = []
+        if main is not None:
+            replaced.append((prop.main_image_public_id, "image"))
+            prop.main_image = main.get("secure_url", "")
+            prop.main_image_public_id = main.get("public_id", "")
+            prop.main_image_placeholder = main.get("placeholder", "")
+            prop.main_image_width = main.get("width")
+            prop.main_image_height = main.get("height")
+            update_fields += [
+                "main_image",
+                "main_image_public_id",
+                "main_image_placeholder",
+                "main_image_width",
+                "main_image_height",
+            ]
+        if video is not None:
+            replaced.append((prop.video_public_id, "video"))
+            prop.video_url = video.get("secure_url", "")
+            prop.video_public_id = video.get("public_id", "")
+            update_fields += ["video_url", "video_public_id"]
+
+        if replace_gallery:
+            old = prop.gallery_images.all()
+            replaced += [(public_id, "image") for public_id in old.values_list("public_id", flat=True)]
+            with gallery_batch():
+                old.delete()
+            start_order = 0
+        else:
+            start_order = prop.gallery_images.count() if gallery else 0
+        if gallery:
+            PropertyImage.objects.bulk_create(
+                PropertyImage(
+                    property=prop,
+                    url=res.get("secure_url", ""),
+                    public_id=res.get("public_id", ""),
+                    placeholder=res.get("placeholder", ""),
+                    width=res.get("width"),
+                    height=res.get("height"),
+                    sort_order=start_order + i,
+                )
+                for i, res in enumerate(gallery)
+            )
+
+        if update_fields or gallery or replace_gallery:
+            # bulk_create sends no signals (and the replaced rows were deleted
+            # in a gallery_batch): this save bumps updated_at and the catalog
+            # version for the gallery changes too.
+            prop.save(update_fields=[*update_fields, "updated_at"])
+        destroy_media_assets(replaced)
 
 
-@transaction.atomic
 def upload_property_media(
     prop: Property,
     *,
@@ -46,7 +209,9 @@ def upload_property_media(
     gallery_files: Iterable | None = None,
     video_file=None,
     append_gallery: bool = False,
-) -> None:
+    backend=None,
+    workers: int | None = None,
+) -> MediaUploadResult:
     """
     Upload media to Cloudinary and store ONLY secure URLs in DB.
     Also stores Cloudinary public_id for later deletion.
@@ -54,46 +219,192 @@ def upload_property_media(
     - main_image_file: replaces existing main image if provided
     - gallery_files: if provided, replaces gallery (or appends when append_gallery=True)
     - video_file: replaces existing video if provided
+
+    All files are validated first (ValueError) and hashed: content already in
+    the asset registry (assets.py) is reused, not uploaded. New images are optimized when
+    settings.MEDIA_OPTIMIZE_IMAGES is on (optimize.py) and get a placeholder
+    (placeholders.py), then everything is uploaded concurrently on a
+    thread pool of settings.MEDIA_UPLOAD_WORKERS with no transaction open. The
+    results are written in one short transaction (gallery rows via bulk_create),
+    which locks the reused assets first and uploads any released meanwhile after
+    all, and replaced assets go to the deletion outbox (outbox.py). A failed upload
+    (or an image that fails optimization) does not abort the others: it is
+    reported in the returned result and the media it would have replaced is kept.
     """
 
+    gallery_files = list(gallery_files) if gallery_files is not None else None
+    backend = backend or get_media_backend()
+    if workers is None:
+        workers = getattr(settings, "MEDIA_UPLOAD_WORKERS", 4)
+
+    uploads: list[_Upload] = []
     if main_image_file:
-        if not _cloudinary_configured():
-            raise ValueError("Cloudinary not configured. Set CLOUDINARY_URL or CLOUDINARY_CLOUD_NAME, API_KEY, API_SECRET.")
         _validate_image_file(main_image_file)
-        destroy_cloudinary_asset(prop.main_image_public_id, "image")
-        res = cloudinary.uploader.upload(main_image_file, resource_type="image", folder="lora/properties")
-        prop.main_image = res.get("secure_url", "")
-        prop.main_image_public_id = res.get("public_id", "")
-        prop.save(update_fields=["main_image", "main_image_public_id", "updated_at"])
-
-    if gallery_files is not None:
-        if gallery_files and not _cloudinary_configured():
-            raise ValueError("Cloudinary not configured. Set CLOUDINARY_URL or CLOUDINARY_CLOUD_NAME, API_KEY, API_SECRET.")
-        if not append_gallery:
-            for img in prop.gallery_images.all():
-                destroy_cloudinary_asset(img.public_id, "image")
-            prop.gallery_images.all().delete()
-        start_order = prop.gallery_images.count() if append_gallery else 0
-
-        for i, f in enumerate(gallery_files):
-            _validate_image_file(f)
-            res = cloudinary.uploader.upload(f, resource_type="image", folder="lora/properties/gallery")
-            PropertyImage.objects.create(
-                property=prop,
-                url=res.get("secure_url", ""),
-                public_id=res.get("public_id", ""),
-                sort_order=start_order + i,
-            )
-
+        uploads.append(_Upload("main", main_image_file, *MEDIA_FOLDERS["main"]))
+    for f in gallery_files or ():
+        _validate_image_file(f)
+        uploads.append(_Upload("gallery", f, *MEDIA_FOLDERS["gallery"]))
     if video_file:
-        if not _cloudinary_configured():
-            raise ValueError("Cloudinary not configured. Set CLOUDINARY_URL or CLOUDINARY_CLOUD_NAME, API_KEY, API_SECRET.")
         _validate_video_file(video_file)
-        destroy_cloudinary_asset(prop.video_public_id, "video")
-        res = cloudinary.uploader.upload(video_file, resource_type="video", folder="lora/properties/videos")
-        prop.video_url = res.get("secure_url", "")
-        prop.video_public_id = res.get("public_id", "")
-        prop.save(update_fields=["video_url", "video_public_id", "updated_at"])
+        uploads.append(_Upload("video", video_file, *MEDIA_FOLDERS["video"]))
+    if uploads and not backend.is_configured():
+        raise ValueError(backend.not_configured_message)
+
+    result = MediaUploadResult()
+    for u in uploads:
+        u.sha256 = assets.file_digest(u.file)
+    known = assets.find_assets((u.sha256, u.resource_type) for u in uploads)
+    for u in uploads:
+        asset = known.get((u.sha256, u.resource_type))
+        if asset is not None:
+            u.response, u.reused = asset.as_response(), True
+            result.reused.append(u.name)
+    _upload_new([u for u in uploads if not u.reused], backend, workers, result)
+
+    # Replace the gallery only when something new arrived to replace it with.
+    replace_gallery = gallery_files is not None and not append_gallery
+    try:
+        while True:
+            with transaction.atomic():
+                # The registry was read without a lock: a reused asset may have
+                # been released and destroyed since. Lock the rows until the
+                # references are acquired, and upload the content again if not.
+                gone = assets.lock_assets(u.response.get("public_id", "") for u in uploads if u.reused)
+                if not gone:
+                    done = [u for u in uploads if u.response is not None]
+                    gallery = [u.response for u in done if u.kind == "gallery"]
+                    attach_property_media(
+                        prop,
+                        main=next((u.response for u in done if u.kind == "main"), None),
+                        gallery=gallery,
+                        video=next((u.response for u in done if u.kind == "video"), None),
+                        replace_gallery=replace_gallery and bool(gallery or not gallery_files),
+                    )
+                    break
+            stale = [u for u in uploads if u.reused and u.response.get("public_id") in gone]
+            for u in stale:
+                u.response, u.reused = None, False
+                result.reused.remove(u.name)
+            _upload_new(stale, backend, workers, result)
+    except Exception:
+        destroy_media_assets(
+            [(u.response.get("public_id", ""), u.resource_type) for u in uploads if u.response and not u.reused]
+        )
+        raise
+    result.uploaded = [u.name for u in done]
+    result.failed = [(u.name, u.error) for u in uploads if u.response is None]
+    return result
+
+
+def _upload_new(pending: list[_Upload], backend, workers: int, result: MediaUploadResult) -> None:
+    """
+    Optimize (images), upload and register files that are not in the asset
+    registry. Images that fail optimization are reported and not uploaded.
+    """
+    images = [u for u in pending if u.resource_type == "image"]
+    if images and optimize.enabled():
+        for upload, optimized in zip(images, optimize.optimize_images([u.file for u in images])):
+            if optimized.error:
+                upload.error = optimized.error
+                result.invalid.append(upload.name)
+                continue
+            upload.file = optimized.file
+            result.optimized.append((optimized.name, optimized.original_size, optimized.size))
+        pending = [u for u in pending if not u.error]
+
+    _run_uploads(pending, backend, workers)
+    _register_uploads(pending)
+
+
+def _register_uploads(uploads: list[_Upload]) -> None:
+    """Add fresh uploads to the asset registry; a concurrent twin wins and ours is discarded."""
+    duplicates = []
+    for u in uploads:
+        if u.response is None:
+            continue
+        asset = assets.register_asset(u.sha256, u.resource_type, u.response)
+        if asset.public_id != u.response.get("public_id"):
+            duplicates.append((u.response.get("public_id", ""), u.resource_type))
+            u.response, u.reused = asset.as_response(), True
+    if duplicates:
+        destroy_media_assets(duplicates)
+
+
+_gallery_batch = ContextVar("gallery_batch", default=False)
+
+
+@contextmanager
+def gallery_batch():
+    """
+    Within the block, the PropertyImage save/delete receivers (signals.py)
+    leave updated_at, the catalog version and the release of deleted images'
+    assets to the caller, which must save the property once afterwards and
+    pass the deleted rows to destroy_media_assets.
+    """
+    token = _gallery_batch.set(True)
+    try:
+        yield
+    finally:
+        _gallery_batch.reset(token)
+
+
+def in_gallery_batch() -> bool:
+    return _gallery_batch.get()
+
+
+@dataclass
+class GalleryEdit:
+    updated: int = 0
+    deleted: int = 0
+    missing: list[int] = field(default_factory=list)  # ids not in this property's gallery (ignored)
+
+
+def edit_gallery(
+    prop: Property,
+    *,
+    order: dict[int, int] | None = None,
+    visible: dict[int, bool] | None = None,
+    delete: Iterable[int] = (),
+    strict: bool = False,
+) -> GalleryEdit:
+    """
+    Apply gallery reorder (id -> sort_order), visibility (id -> bool) and
+    deletes in one transaction: one fetch, one bulk_update, one DELETE and
+    one batch of deletion-outbox rows, whatever the gallery size. Unknown
+    ids are skipped, or with ``strict`` raise ValueError before any change.
+    """
+    order, visible, delete = order or {}, visible or {}, set(delete)
+    ids = set(order) | set(visible) | delete
+    result = GalleryEdit()
+    if not ids:
+        return result
+    with transaction.atomic():
+        images = {img.pk: img for img in prop.gallery_images.select_for_update().filter(pk__in=ids)}
+        result.missing = sorted(ids - images.keys())
+        if strict and result.missing:
+            raise ValueError(f"Not in this property's gallery: {', '.join(map(str, result.missing))}")
+
+        changed = []
+        for pk, img in images.items():
+            if pk in delete:
+                continue
+            new_order, new_visible = order.get(pk, img.sort_order), visible.get(pk, img.visible)
+            if (new_order, new_visible) != (img.sort_order, img.visible):
+                img.sort_order, img.visible = new_order, new_visible
+                changed.append(img)
+        if changed:
+            PropertyImage.objects.bulk_update(changed, ["sort_order", "visible"])
+        removed = [images[pk] for pk in delete if pk in images]
+        if removed:
+            # The per-row post_delete receivers stand down (gallery_batch):
+            # the save below moves updated_at and the catalog version once.
+            with gallery_batch():
+                PropertyImage.objects.filter(pk__in=[img.pk for img in removed]).delete()
+            destroy_media_assets([(img.public_id, "image") for img in removed if img.public_id])
+        if changed or removed:
+            prop.save(update_fields=["updated_at"])
+        result.updated, result.deleted = len(changed), len(removed)
+    return result
 
 
 @transaction.atomic
@@ -102,8 +413,26 @@ def delete_property_media(prop: Property) -> None:
     Called when a Property is deleted: destroy associated Cloudinary assets.
     """
 
-    destroy_cloudinary_asset(prop.main_image_public_id, "image")
-    destroy_cloudinary_asset(prop.video_public_id, "video")
-    for img in prop.gallery_images.all():
-        destroy_cloudinary_asset(img.public_id, "image")
+    held = [(prop.main_image_public_id, "image"), (prop.video_public_id, "video")]
+    held += [(public_id, "image") for public_id in prop.gallery_images.values_list("public_id", flat=True)]
+    destroy_media_assets([a for a in held if a[0]])
+
+
+def save_property_media(prop: Property, **files) -> MediaUploadResult:
+    """
+    upload_property_media, or with MEDIA_ASYNC on, spool the files and queue a
+    MediaJob for run_media_worker (the result then has ``queued=True``).
+    """
+    if not getattr(settings, "MEDIA_ASYNC", False):
+        return upload_property_media(prop, **files)
+
+    from .jobs import enqueue_media_upload
+
+    for f in [files.get("main_image_file"), *(files.get("gallery_files") or [])]:
+        if f:
+            _validate_image_file(f)
+    if files.get("video_file"):
+        _validate_video_file(files["video_file"])
+    job = enqueue_media_upload(prop, **files)
+    return MediaUploadResult(queued=job is not None)
 
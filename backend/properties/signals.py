@@ -1,11 +1,55 @@
-from django.db.models.signals import pre_delete
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
+from django.utils import timezone
 
-from .models import Property
-from .services import delete_property_media
+from locations.models import Location
+
+from .cache import bump_catalog_version
+from .models import Property, PropertyImage
+from .services import delete_property_media, destroy_media_assets, in_gallery_batch
+
+
+def _deleting_property(kwargs) -> bool:
+    """True for an image deleted by its property's cascade (the property's own signals cover it)."""
+    origin = kwargs.get("origin")
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is Property
 
 
 @receiver(pre_delete, sender=Property)
 def _property_pre_delete(sender, instance: Property, **kwargs):
     delete_property_media(instance)
 
+
+@receiver(post_save, sender=PropertyImage)
+@receiver(post_delete, sender=PropertyImage)
+def _property_image_changed(sender, instance: PropertyImage, **kwargs):
+    if in_gallery_batch() or _deleting_property(kwargs):
+        return
+    # Gallery edits change the property's representation; move its
+    # updated_at so ETag/Last-Modified validators see the change.
+    Property.objects.filter(pk=instance.property_id).update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=PropertyImage)
+def _property_image_deleted(sender, instance: PropertyImage, **kwargs):
+    # Single-image deletes (the admin gallery inline, instance.delete()).
+    # Batches and the property's cascade release their images in bulk.
+    if instance.public_id and not (in_gallery_batch() or _deleting_property(kwargs)):
+        destroy_media_assets([(instance.public_id, "image")])
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+@receiver(post_save, sender=PropertyImage)
+@receiver(post_delete, sender=PropertyImage)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def _catalog_changed(sender, **kwargs):
+    if sender is PropertyImage and (in_gallery_batch() or _deleting_property(kwargs)):
+        return
+    # Bump after commit so a concurrent reader can't cache pre-commit rows
+    # under the new version.
+    transaction.on_commit(bump_catalog_version)
@@ -0,0 +1,96 @@
+"""
+Typeahead suggestions from a per-process prefix index.
+
+The index is a sorted array of folded keys, one per word start of every label
+("Oyster Bay, Dar es Salaam" is reachable from "oys", "bay" and "dar"), so a
+lookup is a bisect plus a short scan and never touches the database. It is
+rebuilt lazily when the catalog version (see cache.py) changes.
+"""
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+
+from django.conf import settings
+
+from config.text import fold
+from locations.models import Location
+
+from .cache import CatalogLocal
+from .models import Property
+
+_WORD_RE = re.compile(r"\S+")
+
+# Suggestion kinds in display order.
+KIND_ORDER = {"city": 0, "location": 1, "property": 2}
+
+
+class PrefixIndex:
+    def __init__(self, entries: list[dict]):
+        self.entries = entries
+        pairs = []
+        for i, entry in enumerate(entries):
+            folded = fold(entry["label"])
+            for match in _WORD_RE.finditer(folded):
+                pairs.append((folded[match.start():], i, match.start() == 0))
+        pairs.sort()
+        self._keys = [k for k, _, _ in pairs]
+        self._ids = [i for _, i, _ in pairs]
+        self._label_start = [start for _, _, start in pairs]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, prefix: str, limit: int = 10) -> list[dict]:
+        q = fold(prefix)
+        if not q:
+            return []
+        keys, ids, label_start = self._keys, self._ids, self._label_start
+        # Scan a bounded number of candidates, then rank them.
+        budget = limit * 10
+        seen = {}
+        i = bisect_left(keys, q)
+        while i < len(keys) and keys[i].startswith(q) and len(seen) < budget:
+            idx = ids[i]
+            # Prefer matches at the start of the label over mid-label words.
+            seen[idx] = seen.get(idx, False) or label_start[i]
+            i += 1
+        ranked = sorted(
+            seen,
+            key=lambda idx: (
+                KIND_ORDER.get(self.entries[idx]["type"], 99),
+                not seen[idx],
+                self.entries[idx]["label"],
+            ),
+        )
+        return [self.entries[idx] for idx in ranked[:limit]]
+
+
+def build_index() -> PrefixIndex:
+    entries = []
+    cities = set()
+    for loc_id, name, city in Location.objects.values_list("id", "name", "city"):
+        label = f"{name}, {city}" if city else name
+        entries.append({"type": "location", "label": label, "value": name, "id": loc_id})
+        if city:
+            cities.add(city)
+    for city in sorted(cities):
+        entries.append({"type": "city", "label": city, "value": city})
+    for prop_id, title in Property.objects.filter(published=True).values_list("id", "title"):
+        entries.append({"type": "property", "label": title, "value": title, "id": prop_id})
+    return PrefixIndex(entries)
+
+
+_index = CatalogLocal(
+    build_index,
+    check_seconds=getattr(settings, "SUGGEST_VERSION_CHECK_SECONDS", 2),
+    max_age=getattr(settings, "SUGGEST_INDEX_MAX_AGE", None),
+)
+
+
+def get_index() -> PrefixIndex:
+    return _index.get()
+
+
+def suggest(query: str, limit: int = 10) -> list[dict]:
+    return get_index().lookup(query, limit=limit)
@@ -1,3 +1,883 @@
-from django.test import TestCase
+"""
+Behaviour tests for the properties app: shared media assets (assets.py) and
+conditional GET on the API (config/conditional.py), location filters
+(location_index.py), partial media failures on the write API and in the
+worker, the media backends (backends.py), direct uploads (direct_upload.py),
+media saved from the Django admin,
+the deletion outbox (outbox.py), import_properties, responsive image variants in the
+serializers (images.py), image placeholders (placeholders.py), keyset pagination, the catalog
+response cache (cache.py), full-text search (search.py) and typeahead
+suggestions (suggest.py).
+"""
+import base64
+import io
+import json
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.http import Http404
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+import cloudinary
+import cloudinary.utils
+from PIL import Image
+
+from locations.models import Location
+
+from . import assets
+from .backends import LocalMediaBackend, MediaBackend
+from .bench import FakeMediaBackend
+from .cache import bump_catalog_version
+from .direct_upload import MAX_UPLOAD_AGE, DirectUploadError, verify_uploaded_asset
+from .location_index import filter_by_location
+from .jobs import claim_job, enqueue_media_upload, run_job
+from .models import MediaAsset, MediaDeletion, MediaJob, Property, UploadSession
+from .outbox import drain_media_outbox, record_media_deletions
+from .pagination import KeysetPagination, encode_cursor
+from .placeholders import describe_image
+from .serializers import PropertyImageSerializer, PropertyListSerializer
+from .search import IContainsSearchBackend, PostgresSearchBackend, SQLiteFTS5SearchBackend, get_search_backend
+from .services import attach_property_media, save_property_media, upload_property_media
+from .suggest import build_index
+from .views import local_media
+
+User = get_user_model()
+
+
+class ReleasingBackend(FakeMediaBackend):
+    """Releases ``asset`` while the first upload is in flight, as a concurrent delete would."""
+
+    def __init__(self, asset):
+        super().__init__(latency=0, jitter=0)
+        self.asset = asset
+
+    def upload(self, file, **kwargs):
+        if self.calls == 0:
+            MediaAsset.objects.filter(pk=self.asset.pk).delete()
+        return super().upload(file, **kwargs)
+
+
+class InstantBackend(FakeMediaBackend):
+    def __init__(self):
+        super().__init__(latency=0, jitter=0)
+
+
+class FlakyBackend(FakeMediaBackend):
+    """Every second upload fails."""
+
+    def __init__(self):
+        super().__init__(latency=0, jitter=0, fail_every=2)
+
+
+class DownBackend(FakeMediaBackend):
+    """Cloudinary's delete API is unreachable."""
+
+    def __init__(self):
+        super().__init__(latency=0, jitter=0)
+
+    def bulk_destroy(self, public_ids, resource_type):
+        raise ConnectionError("Cloudinary is down")
+
+
+def png(name: str) -> SimpleUploadedFile:
+    out = io.BytesIO()
+    Image.new("RGB", (8, 8), "teal").save(out, format="PNG")
+    return SimpleUploadedFile(name, out.getvalue(), content_type="image/png")
+
+
+def make_property(title: str, location: Location, **fields) -> Property:
+    defaults = {
+        "description": "Sea view villa with garden",
+        "property_type": "house",
+        "listing_type": "sale",
+        "price": 1000,
+    }
+    return Property.objects.create(title=title, location=location, **{**defaults, **fields})
+
+
+# MEDIA_ASYNC keeps orphaned assets in the outbox instead of draining them on commit.
+@override_settings(MEDIA_ASYNC=True)
+class SharedAssetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(name="Masaki", city="Dar es Salaam")
+        cls.staff = User.objects.create_superuser("media", "media@example.com", "media-pass-123")
+        cls.asset = MediaAsset.objects.create(
+            sha256="a" * 64,
+            public_id="lora/properties/shared",
+            secure_url="https://res.cloudinary.com/demo/shared.jpg",
+            ref_count=0,
+        )
+
+    def attach_shared(self, title: str) -> Property:
+        prop = make_property(title, self.location)
+        attach_property_media(prop, main=self.asset.as_response())
+        return prop
+
+    def test_delete_releases_each_reference_once(self):
+        first, second = self.attach_shared("First"), self.attach_shared("Second")
+        self.asset.refresh_from_db()
+        self.assertEqual(self.asset.ref_count, 2)
+
+        self.client.force_login(self.staff)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("lora_admin:property_delete", args=[first.pk]))
+        self.assertEqual(response.status_code, 302)
+        self.asset.refresh_from_db()
+        self.assertEqual(self.asset.ref_count, 1)
+        self.assertFalse(MediaDeletion.objects.exists())
+
+        # Re-attaching after the delete counts a new reference.
+        third = self.attach_shared("Third")
+        self.asset.refresh_from_db()
+        self.assertEqual(self.asset.ref_count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+            third.delete()
+        self.assertFalse(MediaAsset.objects.filter(pk=self.asset.pk).exists())
+        self.assertEqual(list(MediaDeletion.objects.values_list("public_id", flat=True)), [self.asset.public_id])
+
+    def test_reattach_to_the_same_field_keeps_the_asset(self):
+        prop = self.attach_shared("Same")
+        attach_property_media(prop, main=self.asset.as_response())
+        self.asset.refresh_from_db()
+        self.assertEqual(self.asset.ref_count, 1)
+        self.assertFalse(MediaDeletion.objects.exists())
+
+    @override_settings(MEDIA_OPTIMIZE_IMAGES=False)
+    def test_asset_released_before_attach_is_uploaded_again(self):
+        main = SimpleUploadedFile("main.jpg", b"shared content")
+        self.asset.sha256 = assets.file_digest(main)
+        self.asset.save(update_fields=["sha256"])
+        prop = make_property("Racing", self.location)
+        backend = ReleasingBackend(self.asset)
+
+        result = upload_property_media(
+            prop, main_image_file=main, gallery_files=[SimpleUploadedFile("g.jpg", b"new")], backend=backend
+        )
+        self.assertEqual(backend.calls, 2)
+        self.assertEqual(result.reused, [])
+        self.assertEqual(result.uploaded, ["main.jpg", "g.jpg"])
+        prop.refresh_from_db()
+        self.assertNotEqual(prop.main_image_public_id, self.asset.public_id)
+        self.assertEqual(MediaAsset.objects.get(public_id=prop.main_image_public_id).ref_count, 1)
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        location = Location.objects.create(name="Oyster Bay", city="Dar es Salaam")
+        cls.props = [make_property(f"Villa {i}", location, published=True) for i in range(2)]
+        cls.staff = User.objects.create_superuser("etag", "etag@example.com", "etag-pass-123")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_admin_bulk_action_changes_the_etag(self):
+        url = "/api/properties/"
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.client.force_login(self.staff)
+        # The action bumps the catalog version once its transaction commits.
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.client.post(
+                "/django-admin/properties/property/",
+                {"action": "make_featured", "_selected_action": [self.props[0].pk]},
+            )
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(bump_catalog_version, callbacks)
+        self.client.logout()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertTrue(any(p["featured"] for p in response.json()["results"]))
+
+
+class LocationFilterTests(TestCase):
+    def test_location_missing_from_the_index_still_matches(self):
+        location = Location.objects.create(name="Mbezi Beach", city="Dar es Salaam")
+        prop = make_property("Beach house", location)
+        # As when another process added the location and this one's index predates it.
+        with mock.patch("properties.location_index.resolve_location_ids", return_value=frozenset()):
+            self.assertEqual(list(filter_by_location(Property.objects.all(), "mbezi")), [prop])
+            self.assertFalse(filter_by_location(Property.objects.all(), "Kariakoo").exists())
+
+
+@override_settings(MEDIA_BACKEND="properties.tests.FlakyBackend", MEDIA_ASYNC=False, MEDIA_OPTIMIZE_IMAGES=False)
+class PartialMediaFailureTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(name="Kigamboni", city="Dar es Salaam")
+        cls.staff = User.objects.create_superuser("writer", "writer@example.com", "writer-pass-123")
+
+    def test_create_reports_failed_files_without_failing(self):
+        self.client.force_login(self.staff)
+        response = self.client.post(
+            "/api/properties/",
+            {
+                "title": "Beach plot",
+                "description": "Near the ferry",
+                "property_type": "land",
+                "listing_type": "sale",
+                "price": "25000",
+                "location_id": self.location.pk,
+                "gallery_files": [png("a.png"), png("b.png")],
+            },
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()["media_errors"]), 1)
+        prop = Property.objects.get(title="Beach plot")
+        self.assertEqual(prop.gallery_images.count(), 1)
+
+
+@override_settings(MEDIA_CHUNK_RETRIES=0, MEDIA_UPLOAD_CHUNK_SIZE=4)
+class ChunkedUploadTests(TestCase):
+    def upload(self, backend, key=""):
+        return backend.upload_large(io.BytesIO(b"0123456789"), resource_type="video", folder="v", key=key)
+
+    def test_failed_unkeyed_upload_leaves_no_session(self):
+        with self.assertRaises(RuntimeError):
+            self.upload(FakeMediaBackend(latency=0, jitter=0, fail_every=1))
+        self.assertFalse(UploadSession.objects.exists())
+
+    def test_failed_keyed_upload_resumes(self):
+        backend = FakeMediaBackend(latency=0, jitter=0, fail_every=3)
+        with self.assertRaises(RuntimeError):
+            self.upload(backend, key="spool-1")
+        self.assertEqual(UploadSession.objects.get(key="spool-1").offset, 8)
+        self.assertEqual(self.upload(backend, key="spool-1")["bytes"], 10)
+        self.assertEqual(backend.calls, 4)  # confirmed chunks are not sent again
+
+
+class LocalMediaTests(TestCase):
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        self.root = Path(root.name)
+        override = override_settings(MEDIA_ROOT=root.name, IMAGE_VARIANT_WIDTHS=[320])
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def get(self, path, **params):
+        return local_media(RequestFactory().get(f"/media/{path}", params), path)
+
+    def test_variant_of_an_image(self):
+        Image.new("RGB", (640, 480), "teal").save(self.root / "a.png")
+        response = self.get("a.png", w="320")
+        self.assertEqual(response.status_code, 200)
+        body = b"".join(response.streaming_content)
+        response.close()
+        with Image.open(io.BytesIO(body)) as img:
+            self.assertEqual(img.size, (320, 240))
+
+    def test_variant_of_a_non_image_is_404(self):
+        (self.root / "clip.mp4").write_bytes(b"not an image")
+        (self.root / "broken.jpg").write_bytes(b"\xff\xd8\xff truncated")
+        for path in ("clip.mp4", "broken.jpg"):
+            with self.assertRaises(Http404):
+                self.get(path, w="320")
+        response = self.get("clip.mp4")  # the original is still served
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+    def test_backend_interface_is_abstract(self):
+        with self.assertRaises(TypeError):
+            MediaBackend()
+        self.assertTrue(LocalMediaBackend().is_configured())
+
+
+@override_settings(
+    MEDIA_BACKEND="properties.tests.InstantBackend", MEDIA_OPTIMIZE_IMAGES=True, MEDIA_OPTIMIZE_PROCESSES=1
+)
+class InvalidImageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(name="Mbezi", city="Dar es Salaam")
+
+    def setUp(self):
+        self.prop = make_property("Garden flat", self.location)
+
+    def test_bad_image_does_not_stop_the_others(self):
+        result = upload_property_media(
+            self.prop, gallery_files=[SimpleUploadedFile("bad.jpg", b"not an image"), png("good.png")]
+        )
+        self.assertEqual(result.invalid, ["bad.jpg"])
+        self.assertEqual([name for name, _ in result.failed], ["bad.jpg"])
+        self.assertEqual(result.uploaded, ["good.png"])
+        self.assertEqual(self.prop.gallery_images.count(), 1)
+
+    def test_worker_does_not_retry_invalid_images(self):
+        spool = tempfile.TemporaryDirectory()
+        self.addCleanup(spool.cleanup)
+        with override_settings(MEDIA_SPOOL_DIR=spool.name, MEDIA_JOB_MAX_ATTEMPTS=5):
+            enqueue_media_upload(self.prop, main_image_file=SimpleUploadedFile("bad.jpg", b"not an image"))
+            self.assertFalse(run_job(claim_job()))
+        job = MediaJob.objects.get()
+        self.assertEqual((job.status, job.attempts), (MediaJob.Status.FAILED, 1))
+        self.assertIn("bad.jpg", job.last_error)
+        self.prop.refresh_from_db()
+        self.assertEqual(self.prop.media_status, Property.MediaStatus.FAILED)
+        self.assertEqual(list(Path(spool.name).iterdir()), [])
+
+
+@override_settings(MEDIA_BACKEND="cloudinary", MEDIA_ASYNC=True)
+class DirectUploadTests(TestCase):
+    secret = "direct-upload-secret"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(name="Oyster Bay", city="Dar es Salaam")
+        cls.staff = User.objects.create_superuser("direct", "direct@example.com", "direct-pass-123")
+
+    def setUp(self):
+        config = cloudinary.config()
+        saved = {key: getattr(config, key) for key in ("cloud_name", "api_key", "api_secret")}
+        self.addCleanup(cloudinary.config, **saved)
+        cloudinary.config(cloud_name="demo", api_key="123", api_secret=self.secret)
+
+    def upload_response(self, public_id: str, *, version: int | None = None, fmt: str = "jpg") -> dict:
+        version = version or int(time.time())
+        signature = cloudinary.utils.api_sign_request(
+            {"public_id": public_id, "version": version}, self.secret, signature_version=1
+        )
+        return {"public_id": public_id, "version": version, "signature": signature, "format": fmt}
+
+    def assertRejected(self, kind: str, asset: dict, reason: str):
+        with self.assertRaisesMessage(DirectUploadError, reason):
+            verify_uploaded_asset(kind, asset)
+
+    def test_rejects_a_forged_signature(self):
+        asset = self.upload_response("lora/properties/villa")
+        asset["signature"] = "0" * 40
+        self.assertRejected("main", asset, "signature does not match")
+
+    def test_rejects_an_asset_from_another_folder(self):
+        self.assertRejected("main", self.upload_response("lora/properties/gallery/villa"), "not in lora/properties/")
+        self.assertRejected("main", self.upload_response("villa"), "not in lora/properties/")
+
+    def test_rejects_a_disallowed_format(self):
+        self.assertRejected("main", self.upload_response("lora/properties/villa", fmt="svg"), "format svg")
+
+    def test_rejects_a_stale_upload(self):
+        stale = int(time.time()) - MAX_UPLOAD_AGE - 60
+        self.assertRejected("main", self.upload_response("lora/properties/villa", version=stale), "too old")
+
+    def attach(self, prop: Property, kind: str, *public_ids: str):
+        self.client.force_login(self.staff)
+        return self.client.post(
+            reverse("property-media-attach", args=[prop.pk]),
+            {"kind": kind, "assets": [self.upload_response(public_id) for public_id in public_ids]},
+            content_type="application/json",
+        )
+
+    def test_attach_registers_and_counts_the_asset(self):
+        first, second = make_property("First", self.location), make_property("Second", self.location)
+        response = self.attach(first, "main", "lora/properties/villa")
+        self.assertEqual(response.status_code, 200, response.content)
+        first.refresh_from_db()
+        self.assertEqual(first.main_image_public_id, "lora/properties/villa")
+        self.assertTrue(first.main_image.startswith("https://res.cloudinary.com/demo/image/upload/"))
+        self.assertEqual(MediaAsset.objects.get(public_id="lora/properties/villa").ref_count, 1)
+
+        # The same upload attached to a second listing is one shared asset.
+        self.assertEqual(self.attach(second, "main", "lora/properties/villa").status_code, 200)
+        asset = MediaAsset.objects.get(public_id="lora/properties/villa")
+        self.assertEqual(asset.ref_count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        asset.refresh_from_db()
+        self.assertEqual(asset.ref_count, 1)
+        self.assertFalse(MediaDeletion.objects.exists())
+
+    def test_attach_rejects_the_whole_gallery_on_one_bad_asset(self):
+        prop = make_property("Gallery", self.location)
+        response = self.attach(prop, "gallery", "lora/properties/gallery/a", "lora/properties/b")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(prop.gallery_images.count(), 0)
+        self.assertFalse(MediaAsset.objects.exists())
+
+
+@override_settings(MEDIA_BACKEND="properties.tests.InstantBackend", MEDIA_ASYNC=False, MEDIA_OPTIMIZE_IMAGES=False)
+class DjangoAdminMediaTests(TransactionTestCase):
+    """TransactionTestCase: the admin's transaction really commits, running its on_commit callbacks."""
+
+    def setUp(self):
+        self.location = Location.objects.create(name="Mikocheni", city="Dar es Salaam")
+        self.staff = User.objects.create_superuser("djadmin", "djadmin@example.com", "djadmin-pass-123")
+        self.client.force_login(self.staff)
+
+    def form_data(self, prop: Property | None = None, images=(), **extra) -> dict:
+        """POST data for the Property change form, with one inline row per image."""
+        data = {
+            "listing_type": "sale",
+            "property_type": "house",
+            "title": prop.title if prop else "Admin villa",
+            "description": "Sea view villa with garden",
+            "price": "1000",
+            "currency": "TZS",
+            "location": self.location.pk,
+            "availability": "available",
+            "published": "on",
+            "gallery_images-TOTAL_FORMS": len(images),
+            "gallery_images-INITIAL_FORMS": len(images),
+            "gallery_images-MIN_NUM_FORMS": 0,
+            "gallery_images-MAX_NUM_FORMS": 1000,
+        }
+        for i, image in enumerate(images):
+            data.update(
+                {
+                    f"gallery_images-{i}-id": image.pk,
+                    f"gallery_images-{i}-property": prop.pk,
+                    f"gallery_images-{i}-url": image.url,
+                    f"gallery_images-{i}-public_id": image.public_id,
+                    f"gallery_images-{i}-sort_order": image.sort_order,
+                    f"gallery_images-{i}-visible": "on",
+                }
+            )
+        data.update(extra)
+        return data
+
+    def test_uploads_after_the_admin_transaction_commits(self):
+        in_transaction = []
+
+        def save_media(prop, **files):
+            in_transaction.append(connection.in_atomic_block)
+            return save_property_media(prop, **files)
+
+        with mock.patch("properties.admin.save_property_media", side_effect=save_media):
+            response = self.client.post(
+                reverse("admin:properties_property_add"), self.form_data(main_image_upload=png("main.png"))
+            )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(in_transaction, [False])
+        prop = Property.objects.get(title="Admin villa")
+        self.assertTrue(prop.main_image_public_id.startswith("lora/properties/"))
+        self.assertEqual(MediaAsset.objects.get(public_id=prop.main_image_public_id).ref_count, 1)
+
+
+    def delete_inline_image(self, prop: Property):
+        data = self.form_data(prop, list(prop.gallery_images.all()), **{"gallery_images-0-DELETE": "on"})
+        response = self.client.post(reverse("admin:properties_property_change", args=[prop.pk]), data)
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(prop.gallery_images.exists())
+
+    def test_inline_delete_releases_the_image(self):
+        asset = MediaAsset.objects.create(
+            sha256="b" * 64,
+            public_id="lora/properties/gallery/shared",
+            secure_url="https://res.cloudinary.com/demo/shared.jpg",
+        )
+        first, second = make_property("First", self.location), make_property("Second", self.location)
+        for prop in (first, second):
+            attach_property_media(prop, gallery=[asset.as_response()])
+        asset.refresh_from_db()
+        self.assertEqual(asset.ref_count, 2)
+
+        self.delete_inline_image(first)
+        asset.refresh_from_db()
+        self.assertEqual(asset.ref_count, 1)
+        self.assertFalse(MediaDeletion.objects.exists())
+
+        # The last reference: the asset is destroyed (outbox drained) and unregistered.
+        self.delete_inline_image(second)
+        self.assertFalse(MediaAsset.objects.exists())
+        self.assertFalse(MediaDeletion.objects.exists())
+
+@override_settings(MEDIA_BACKEND="properties.tests.InstantBackend", MEDIA_JOB_BACKOFF_SECONDS=0)
+class MediaOutboxTests(TestCase):
+    def setUp(self):
+        record_media_deletions([("lora/properties/a", "image"), ("lora/properties/b", "image"), ("v", "video")])
+
+    def drain_command(self, *args) -> str:
+        out = io.StringIO()
+        call_command("drain_media_outbox", *args, stdout=out)
+        return out.getvalue()
+
+    def test_drains_the_outbox(self):
+        self.assertIn("Deleted 3 asset(s); 0 failed attempt(s); 0 still queued.", self.drain_command())
+        self.assertFalse(MediaDeletion.objects.exists())
+
+    @override_settings(MEDIA_BACKEND="properties.tests.DownBackend", MEDIA_JOB_BACKOFF_SECONDS=30)
+    def test_failures_back_off(self):
+        self.assertEqual(drain_media_outbox(), (0, 3))
+        row = MediaDeletion.objects.get(public_id="v")
+        self.assertEqual((row.status, row.attempts, row.last_error), (MediaDeletion.Status.PENDING, 1, "Cloudinary is down"))
+        self.assertGreater(row.run_after, timezone.now() + timedelta(seconds=25))
+        # Not due yet.
+        self.assertEqual(drain_media_outbox(), (0, 0))
+
+    @override_settings(MEDIA_BACKEND="properties.tests.DownBackend", MEDIA_JOB_MAX_ATTEMPTS=1000)
+    def test_command_stops_when_nothing_is_deleted(self):
+        # No backoff: the failed rows are due again at once, but the command
+        # makes one pass that deletes nothing and stops.
+        self.assertIn("Deleted 0 asset(s); 3 failed attempt(s); 3 still queued.", self.drain_command())
+        self.assertEqual(set(MediaDeletion.objects.values_list("attempts", flat=True)), {1})
+
+    def test_retry_failed_requeues_rows_out_of_attempts(self):
+        MediaDeletion.objects.update(status=MediaDeletion.Status.FAILED, attempts=5)
+        self.assertIn("Deleted 0 asset(s)", self.drain_command())
+        self.assertEqual(MediaDeletion.objects.count(), 3)
+
+        output = self.drain_command("--retry-failed")
+        self.assertIn("Requeued 3 failed row(s).", output)
+        self.assertIn("Deleted 3 asset(s)", output)
+        self.assertFalse(MediaDeletion.objects.exists())
+
+
+class ImportPropertiesTests(TestCase):
+    header = "title,description,property_type,listing_type,price,location_name,location_city\n"
+    rows = (
+        "Sea villa,Four bedrooms,house,sale,250000,Masaki,\n"
+        "Bad price,Studio,apartment,rent,-5,Masaki,\n"
+        "Beach plot,Half an acre,land,sale,90000,Kigamboni,Dar es Salaam\n"
+        "Ferry flat,Two bedrooms,apartment,rent,800,Kigamboni,\n"
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.masaki = Location.objects.create(name="Masaki", city="Dar es Salaam")
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.csv = self.dir / "listings.csv"
+        self.csv.write_text(self.header + self.rows, encoding="utf-8")
+
+    def run_import(self, *args) -> tuple[str, list[dict]]:
+        out, errors = io.StringIO(), self.dir / "errors.jsonl"
+        call_command("import_properties", str(self.csv), "--errors", str(errors), *args, stdout=out)
+        return out.getvalue(), [json.loads(line) for line in errors.read_text(encoding="utf-8").splitlines()]
+
+    def test_imports_valid_rows_and_reports_the_rest(self):
+        output, errors = self.run_import("--batch-size", "2")
+        self.assertIn("4 rows read, 3 imported, 1 failed, 1 new locations", output)
+        self.assertEqual([e["row"] for e in errors], [3])  # the header is line 1
+        self.assertIn("price", errors[0]["errors"])
+        self.assertEqual(
+            sorted(Property.objects.values_list("title", "location__name")),
+            [("Beach plot", "Kigamboni"), ("Ferry flat", "Kigamboni"), ("Sea villa", "Masaki")],
+        )
+
+    def test_reuses_locations(self):
+        self.run_import()
+        # Masaki existed; Kigamboni was created once for both of its rows.
+        self.assertEqual(Property.objects.get(title="Sea villa").location_id, self.masaki.pk)
+        self.assertEqual(Location.objects.filter(name="Kigamboni", city="Dar es Salaam").count(), 1)
+        self.assertEqual(Location.objects.count(), 2)
+
+    def test_dry_run_writes_nothing(self):
+        output, errors = self.run_import("--dry-run")
+        self.assertIn("4 rows read, 3 would import, 1 failed, 1 new locations", output)
+        self.assertEqual(len(errors), 1)
+        self.assertFalse(Property.objects.exists())
+        self.assertEqual(list(Location.objects.all()), [self.masaki])
+
+    def test_reports_malformed_json_lines(self):
+        self.csv = self.dir / "listings.jsonl"
+        row = {"title": "Sea villa", "description": "Four bedrooms", "property_type": "house"}
+        row.update({"listing_type": "sale", "price": 250000, "location_name": "Masaki"})
+        self.csv.write_text(json.dumps(row) + "\n{not json\n[1, 2]\n", encoding="utf-8")
+        output, errors = self.run_import()
+        self.assertIn("3 rows read, 1 imported, 2 failed", output)
+        self.assertEqual([e["row"] for e in errors], [2, 3])
+        self.assertEqual(errors[1]["errors"], {"row": ["Expected a JSON object."]})
+
+
+@override_settings(MEDIA_BACKEND="cloudinary", IMAGE_VARIANT_WIDTHS=[320, 640])
+class ImageVariantTests(TestCase):
+    url = "https://res.cloudinary.com/demo/image/upload/v17/lora/properties/villa.jpg"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(name="Msasani", city="Dar es Salaam")
+
+    def setUp(self):
+        config = cloudinary.config()
+        self.addCleanup(cloudinary.config, cloud_name=config.cloud_name)
+        cloudinary.config(cloud_name="demo")
+
+    def serialize(self, **fields) -> dict:
+        return PropertyListSerializer(make_property("Villa", self.location, **fields)).data
+
+    def test_cloudinary_url_gets_resized_variants(self):
+        data = self.serialize(main_image=self.url, main_image_public_id="lora/properties/villa")
+        w320 = "https://res.cloudinary.com/demo/image/upload/c_limit,w_320,f_auto,q_auto/v17/lora/properties/villa.jpg"
+        w640 = "https://res.cloudinary.com/demo/image/upload/c_limit,w_640,f_auto,q_auto/v17/lora/properties/villa.jpg"
+        self.assertEqual(data["main_image_variants"], {"320": w320, "640": w640})
+        self.assertEqual(data["srcset"], f"{w320} 320w, {w640} 640w")
+
+    def test_public_id_alone_builds_variants(self):
+        data = self.serialize(main_image_public_id="lora/properties/villa")
+        self.assertEqual(
+            data["main_image_variants"]["320"],
+            "https://res.cloudinary.com/demo/image/upload/c_limit,f_auto,q_auto,w_320/v1/lora/properties/villa",
+        )
+
+    def test_empty_image_has_no_variants(self):
+        data = self.serialize()
+        self.assertEqual((data["main_image_variants"], data["srcset"]), ({}, ""))
+
+    def test_image_hosted_elsewhere_has_no_variants(self):
+        data = self.serialize(main_image="https://example.com/photos/villa.jpg")
+        self.assertEqual((data["main_image_variants"], data["srcset"]), ({}, ""))
+
+    def test_gallery_image_srcset(self):
+        prop = make_property("Villa", self.location)
+        image = prop.gallery_images.create(url=self.url, public_id="lora/properties/villa")
+        srcset = PropertyImageSerializer(image).data["srcset"]
+        self.assertEqual(srcset.count("c_limit,w_"), 2)
+        self.assertTrue(srcset.endswith("/v17/lora/properties/villa.jpg 640w"))
+
+
+class PlaceholderTests(TestCase):
+    @staticmethod
+    def image_bytes(size=(64, 32)) -> bytes:
+        out = io.BytesIO()
+        Image.new("RGB", size, "orange").save(out, format="PNG")
+        return out.getvalue()
+
+    def test_describes_an_image(self):
+        f = io.BytesIO(self.image_bytes())
+        info = describe_image(f)
+        self.assertEqual((info["width"], info["height"]), (64, 32))
+        self.assertEqual(f.tell(), 0)
+        prefix = "data:image/webp;base64,"
+        self.assertTrue(info["placeholder"].startswith(prefix))
+        thumb = Image.open(io.BytesIO(base64.b64decode(info["placeholder"][len(prefix):])))
+        self.assertEqual(thumb.size, (20, 10))
+
+    def test_unreadable_image_is_not_described(self):
+        self.assertEqual(describe_image(b"not an image"), {})
+
+    def test_backfill_fills_only_empty_rows(self):
+        location = Location.objects.create(name="Upanga", city="Dar es Salaam")
+        empty = make_property("Empty", location, main_image="https://example.com/empty.png")
+        done = make_property(
+            "Done", location, main_image="https://example.com/done.png", main_image_placeholder="data:kept"
+        )
+        make_property("No image", location)
+        image = done.gallery_images.create(url="https://example.com/gallery.png")
+        fetched = []
+
+        def fetch(url):
+            fetched.append(url)
+            return describe_image(self.image_bytes())
+
+        with mock.patch("properties.management.commands.backfill_image_placeholders.fetch_and_describe", fetch):
+            call_command("backfill_image_placeholders", "--concurrency", "1", stdout=io.StringIO())
+        self.assertEqual(sorted(fetched), ["https://example.com/empty.png", "https://example.com/gallery.png"])
+        empty.refresh_from_db()
+        self.assertEqual((empty.main_image_width, empty.main_image_height), (64, 32))
+        self.assertTrue(empty.main_image_placeholder.startswith("data:image/webp;base64,"))
+        done.refresh_from_db()
+        self.assertEqual((done.main_image_placeholder, done.main_image_width), ("data:kept", None))
+        image.refresh_from_db()
+        self.assertEqual((image.width, image.height), (64, 32))
+
+
+@mock.patch.object(KeysetPagination, "page_size", 3)
+class KeysetPaginationTests(TestCase):
+    url = "/api/properties/?pagination=cursor&ordering=price"
+
+    @classmethod
+    def setUpTestData(cls):
+        location = Location.objects.create(name="Sinza", city="Dar es Salaam")
+        # Repeated prices: pages must split ties by id, without skipping or repeating rows.
+        prices = [300, 100, 200, 100, 300, 100, 200]
+        cls.props = [make_property(f"Flat {i}", location, price=price) for i, price in enumerate(prices)]
+        make_property("Draft", location, price=150, published=False)
+        cls.expected = [p.pk for p in sorted(cls.props, key=lambda p: (p.price, p.pk))]
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return response.json()
+
+    def test_next_and_previous_walk_every_row_once(self):
+        pages, url = [], self.url
+        while url:
+            body = self.get(url)
+            pages.append([row["id"] for row in body["results"]])
+            url = body["next"]
+        self.assertEqual([pk for page in pages for pk in page], self.expected)
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertIsNone(self.get(self.url)["previous"])
+
+        # Back from the last page through the previous links.
+        body = self.get(self.url)
+        body = self.get(self.get(body["next"])["next"])
+        back = []
+        while body["previous"]:
+            body = self.get(body["previous"])
+            back.append([row["id"] for row in body["results"]])
+        self.assertEqual(back, [pages[1], pages[0]])
+
+    def test_descending_order(self):
+        body = self.get("/api/properties/?pagination=cursor&ordering=-price")
+        body = self.get(body["next"])
+        expected = [p.pk for p in sorted(self.props, key=lambda p: (-p.price, -p.pk))]
+        self.assertEqual([row["id"] for row in body["results"]], expected[3:6])
+
+    def test_bad_cursors_are_404(self):
+        for cursor in ("not-base64!", encode_cursor([100]), encode_cursor(["cheap", 1]), "bm90IGpzb24"):
+            response = self.client.get(f"{self.url}&cursor={cursor}")
+            self.assertEqual(response.status_code, 404, cursor)
+
+    def test_estimate(self):
+        body = self.get(f"{self.url}&estimate=1")
+        self.assertIn("estimated_count", body)
+        if connection.vendor == "postgresql":
+            self.assertIsInstance(body["estimated_count"], int)
+        else:
+            self.assertIsNone(body["estimated_count"])
+        self.assertNotIn("estimated_count", self.get(self.url))
+
+
+class CatalogCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(name="Upanga", city="Dar es Salaam")
+        cls.prop = make_property("Corner flat", cls.location)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_hit_then_invalidated_by_a_change(self):
+        for url in ("/api/properties/", f"/api/properties/{self.prop.pk}/"):
+            self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+            with self.assertNumQueries(0):
+                self.assertEqual(self.client.get(url)["X-Cache"], "HIT")
+
+        # The catalog version moves when the save commits.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.prop.title = "Corner flat, renovated"
+            self.prop.save()
+        response = self.client.get(f"/api/properties/{self.prop.pk}/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["title"], "Corner flat, renovated")
+        self.assertEqual(self.client.get("/api/properties/")["X-Cache"], "MISS")
+
+    def test_query_string_order_does_not_split_entries(self):
+        self.client.get("/api/properties/?listing_type=sale&ordering=price")
+        response = self.client.get("/api/properties/?ordering=price&listing_type=sale&search=")
+        self.assertEqual(response["X-Cache"], "HIT")
+
+    def test_bulk_update_with_manual_bump(self):
+        self.client.get("/api/properties/")
+        # queryset.update() sends no signals, so bulk writers bump the version themselves.
+        Property.objects.filter(pk=self.prop.pk).update(published=False)
+        bump_catalog_version()
+        self.assertEqual(self.client.get("/api/properties/").json()["results"], [])
+
+
+class SearchTests(TestCase):
+    """Runs on the database's own backend: FTS5 on SQLite, tsvector on Postgres."""
+
+    @classmethod
+    def setUpTestData(cls):
+        masaki = Location.objects.create(name="Masaki", city="Dar es Salaam")
+        oyster_bay = Location.objects.create(name="Oyster Bay", city="Dar es Salaam")
+        sinza = Location.objects.create(name="Sinza", city="Dar es Salaam")
+        # Title (heaviest), location, then description (lightest) matches.
+        cls.in_title = make_property("Oyster Bay penthouse", masaki, description="Modern finishes")
+        cls.in_location = make_property("Family house", oyster_bay, description="Large garden")
+        cls.in_description = make_property("Studio", sinza, description="A short walk to the oyster bay beach")
+        make_property("Kigamboni plot", sinza, description="Quiet and green")
+        cls.sinza = sinza
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, q, **params):
+        response = self.client.get("/api/properties/", {"search": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.json()["results"]]
+
+    def test_backend_matches_the_database(self):
+        expected = {"postgresql": PostgresSearchBackend, "sqlite": SQLiteFTS5SearchBackend}
+        self.assertIsInstance(get_search_backend(), expected.get(connection.vendor, IContainsSearchBackend))
+
+    def test_ranked_by_where_the_words_match(self):
+        ranked = [self.in_title.pk, self.in_location.pk, self.in_description.pk]
+        self.assertEqual(self.search("oyster bay"), ranked)
+        self.assertEqual(self.search("OYST"), ranked)  # prefix, any case
+        self.assertEqual(self.search("\"oyster\" -bay*"), ranked)  # quotes and operators are dropped
+
+    def test_explicit_ordering_wins_over_rank(self):
+        newest_first = [self.in_description.pk, self.in_location.pk, self.in_title.pk]
+        self.assertEqual(self.search("oyster", ordering="-created_at"), newest_first)
+
+    def test_location_rename_is_searchable(self):
+        self.sinza.name = "Mwenge"
+        self.sinza.save()
+        self.assertEqual(set(self.search("mwenge")), {self.in_description.pk, *self.search("kigamboni")})
+
+    @override_settings(PROPERTY_SEARCH_BACKEND="properties.search.IContainsSearchBackend")
+    def test_icontains_fallback(self):
+        self.assertEqual(
+            set(self.search("oyster bay")), {self.in_title.pk, self.in_location.pk, self.in_description.pk}
+        )
+
+
+class SuggestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        oyster_bay = Location.objects.create(name="Oyster Bay", city="Dar es Salaam")
+        bay_view = Location.objects.create(name="Bay View", city="Bagamoyo")
+        make_property("Oyster Bay penthouse", oyster_bay)
+        make_property("Villa Éden", bay_view)
+        make_property("Oyster draft", oyster_bay, published=False)
+
+    def labels(self, q, limit=10):
+        return [(e["type"], e["label"]) for e in build_index().lookup(q, limit=limit)]
+
+    def test_kinds_in_order_and_label_starts_first(self):
+        self.assertEqual(
+            self.labels("ba"),
+            [
+                ("city", "Bagamoyo"),
+                ("location", "Bay View, Bagamoyo"),  # label start beats a later word
+                ("location", "Oyster Bay, Dar es Salaam"),
+                ("property", "Oyster Bay penthouse"),
+            ],
+        )
+
+    def test_folded_and_published_only(self):
+        self.assertEqual(self.labels("EDEN"), [("property", "Villa Éden")])
+        self.assertEqual(self.labels("bay, dar"), [("location", "Oyster Bay, Dar es Salaam")])
+        self.assertNotIn(("property", "Oyster draft"), self.labels("oyster"))
+        self.assertEqual(self.labels("  "), [])
+
+    def test_limit(self):
+        self.assertEqual(len(self.labels("b", limit=2)), 2)
+
+    def test_api(self):
+        with mock.patch("properties.suggest.get_index", build_index):
+            body = self.client.get("/api/suggest/", {"q": "oys", "limit": "1"}).json()
+            self.assertEqual(body["query"], "oys")
+            location = Location.objects.get(name="Oyster Bay")
+            self.assertEqual(
+                body["results"],
+                [{"type": "location", "label": "Oyster Bay, Dar es Salaam", "value": "Oyster Bay", "id": location.pk}],
+            )
+            # A bad limit falls back to the default (10) rather than failing.
+            body = self.client.get("/api/suggest/", {"q": "b", "limit": "x"}).json()
+            self.assertEqual(len(body["results"]), 4)
@@ -1,30 +1,86 @@
+import os
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import transaction
+from django.http import FileResponse, Http404
+from django.utils._os import safe_join
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from accounts.permissions import IsAdminUserForUnsafeMethods
+from config.conditional import ConditionalGetMixin
+from config.query_budget import query_budget
 
+from .backends import LOCAL_VARIANT_DIR, render_local_variant
+from .cache import CatalogCacheMixin, cache_stats
 from .filters import PropertyFilter
 from .models import Property
-from .serializers import PropertyDetailSerializer, PropertyListSerializer, PropertyWriteSerializer
+from .direct_upload import DirectUploadError, register_uploaded_assets, signed_upload_params, verify_uploaded_asset
+from .pagination import KeysetPagination
+from .search import PROPERTY_SEARCH_FIELDS, PropertyOrderingFilter, PropertySearchFilter
+from .serializers import (
+    DirectUploadAttachSerializer,
+    DirectUploadSignSerializer,
+    GalleryEditSerializer,
+    GalleryImageAdminSerializer,
+    PropertyDetailSerializer,
+    PropertyListSerializer,
+    PropertyWriteSerializer,
+)
+from .services import attach_property_media, edit_gallery
+from .suggest import suggest
 
 
-class PropertyViewSet(viewsets.ModelViewSet):
+class PropertyViewSet(ConditionalGetMixin, CatalogCacheMixin, viewsets.ModelViewSet):
     """
     Public:
     - GET /api/properties/
+    - GET /api/properties/?pagination=cursor[&estimate=1]  (keyset pages, no COUNT/OFFSET)
     - GET /api/properties/{id}/
+    - ?search= is full-text and relevance-ranked (see search.py)
 
     Admin (JWT):
     - POST/PUT/PATCH/DELETE
+    - GET /api/properties/cache-stats/
+    - POST /api/properties/{id}/media/sign/    {"kind": "main"|"gallery"|"video"}
+    - POST /api/properties/{id}/media/attach/  {"kind", "assets": [upload responses]}
+      (direct-to-Cloudinary uploads, see direct_upload.py)
+
+    list/retrieve responses are cached per catalog version (see cache.py) and
+    answer conditional requests (ETag / Last-Modified) with 304.
     """
 
+    filter_backends = (DjangoFilterBackend, PropertySearchFilter, PropertyOrderingFilter)
     filterset_class = PropertyFilter
-    search_fields = ("title", "description", "location__name", "location__city")
+    search_fields = PROPERTY_SEARCH_FIELDS
     ordering_fields = ("created_at", "price", "featured")
     ordering = ("-created_at",)
     permission_classes = (IsAdminUserForUnsafeMethods,)
+    conditional_max_fields = ("updated_at", "location__updated_at")
+    query_budget = {
+        "list": 6,
+        "retrieve": 5,
+        # Media uploaded in the request (MEDIA_ASYNC off) costs a fixed ~10 more.
+        "create": 24,
+        "update": 24,
+        "partial_update": 24,
+        "destroy": 18,
+        "cache_stats": 6,
+        "media_sign": 8,
+        "media_attach": 16,
+        "gallery": 16,
+    }
 
     def get_queryset(self):
-        qs = Property.objects.select_related("location").prefetch_related("gallery_images")
+        qs = Property.objects.select_related("location")
+        if self.action == "retrieve":
+            qs = qs.with_visible_gallery()
         if self.request.method in ("GET", "HEAD", "OPTIONS"):
             return qs.filter(published=True)
         return qs
@@ -35,3 +91,131 @@ class PropertyViewSet(viewsets.ModelViewSet):
         if self.action == "retrieve":
             return PropertyDetailSerializer
         return PropertyListSerializer
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            params = self.request.query_params
+            if params.get("pagination") == "cursor" or params.get(KeysetPagination.cursor_query_param):
+                self._paginator = KeysetPagination()
+            else:
+                return super().paginator
+        return self._paginator
+
+    def get_validators(self, request, *args, **kwargs):
+        return self.cached_for_version(
+            request, "validators", lambda: self.compute_validators(request, *args, **kwargs), **kwargs
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+    @action(detail=False, methods=["get"], url_path="cache-stats", permission_classes=[IsAdminUser])
+    def cache_stats(self, request):
+        return Response(cache_stats())
+
+    @action(detail=True, methods=["post"], url_path="media/sign", permission_classes=[IsAdminUser])
+    def media_sign(self, request, pk=None):
+        self.get_object()
+        serializer = DirectUploadSignSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            return Response(signed_upload_params(serializer.validated_data["kind"]))
+        except DirectUploadError as e:
+            raise ValidationError({"detail": str(e)})
+
+    @action(detail=True, methods=["post"], url_path="media/attach", permission_classes=[IsAdminUser])
+    def media_attach(self, request, pk=None):
+        prop = self.get_object()
+        serializer = DirectUploadAttachSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        kind = serializer.validated_data["kind"]
+        try:
+            assets = [verify_uploaded_asset(kind, asset) for asset in serializer.validated_data["assets"]]
+        except DirectUploadError as e:
+            raise ValidationError({"assets": [str(e)]})
+
+        with transaction.atomic():
+            register_uploaded_assets(kind, assets)
+            if kind == "gallery":
+                attach_property_media(
+                    prop, gallery=assets, replace_gallery=serializer.validated_data["replace_gallery"]
+                )
+            else:
+                attach_property_media(prop, **{kind: assets[0]})
+        return Response(PropertyDetailSerializer(prop).data)
+
+    @action(detail=True, methods=["patch"], url_path="gallery", permission_classes=[IsAdminUser])
+    def gallery(self, request, pk=None):
+        """
+        PATCH {"images": [{"id": 3, "sort_order": 0, "visible": false}, ...], "delete": [7, 8]}
+        applies the whole edit in one transaction (services.edit_gallery) and
+        returns the resulting gallery, hidden images included.
+        """
+        prop = self.get_object()
+        serializer = GalleryEditSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            edit = edit_gallery(prop, strict=True, **serializer.edit_kwargs())
+        except ValueError as e:
+            raise ValidationError({"detail": str(e)})
+        images = prop.gallery_images.order_by("sort_order", "id")
+        return Response(
+            {
+                "updated": edit.updated,
+                "deleted": edit.deleted,
+                "gallery_images": GalleryImageAdminSerializer(images, many=True).data,
+            }
+        )
+
+
+class SuggestView(APIView):
+    """
+    GET /api/suggest/?q=oys[&limit=10]
+
+    Typeahead over location names, cities and published property titles,
+    answered from an in-memory prefix index (see suggest.py).
+    """
+
+    permission_classes = (AllowAny,)
+    query_budget = 3
+    max_limit = 20
+
+    def get(self, request):
+        q = (request.query_params.get("q") or "").strip()
+        try:
+            limit = min(max(int(request.query_params.get("limit", 10)), 1), self.max_limit)
+        except ValueError:
+            limit = 10
+        return Response({"query": q, "results": suggest(q, limit=limit)})
+
+
+@query_budget(0)
+def local_media(request, path):
+    """
+    Files stored by LocalMediaBackend (MEDIA_BACKEND=local). ``?w=<width>``
+    (one of IMAGE_VARIANT_WIDTHS) serves a resized copy, rendered on first
+    request (404 for files Pillow cannot read). FileResponse lets the WSGI
+    server use sendfile.
+    """
+    try:
+        source = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if LOCAL_VARIANT_DIR in path.split("/") or not os.path.isfile(source):
+        raise Http404
+    width = request.GET.get("w")
+    if width is not None:
+        if not width.isdigit() or int(width) not in settings.IMAGE_VARIANT_WIDTHS:
+            raise Http404
+        try:
+            source = render_local_variant(source, int(width))
+        except ValueError:
+            raise Http404  # a video, or not a readable image
+    response = FileResponse(open(source, "rb"))
+    # public_ids are never reused, so a URL's content never changes.
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
@@ -158,7 +158,7 @@ function createPropertyCard(property) {
     : '';
 
   const imageHtml = property.main_image
-    ? `<img src="${property.main_image}" alt="${property.title}" loading="lazy">`
+    ? `<img src="${property.main_image}"${property.srcset ? ` srcset="${property.srcset}" sizes="(max-width: 640px) 100vw, 400px"` : ''}${imageSizeAttrs(property.main_image_width, property.main_image_height, property.main_image_placeholder)} alt="${property.title}" loading="lazy">`
     : `<div class="property-card-noimage" aria-label="No image available">No image</div>`;
 
   return `
@@ -178,6 +178,15 @@ function createPropertyCard(property) {
   `;
 }
 
+/**
+ * width/height (reserves the box) and a blurred placeholder painted until the image loads
+ */
+function imageSizeAttrs(width, height, placeholder) {
+  let attrs = width && height ? ` width="${width}" height="${height}"` : '';
+  if (placeholder) attrs += ` style="background: center / cover no-repeat url('${placeholder}')"`;
+  return attrs;
+}
+
 /**
  * Render property grid
  */